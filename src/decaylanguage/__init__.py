@@ -5,21 +5,54 @@
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
+from ._lazy import lazy_getattr
+
 # Convenient access to the version number
 from ._version import version as __version__
 
-# Direct access to decay file parsing tools
-from .dec import DecFileParser
+if TYPE_CHECKING:
+    # Direct access to decay file parsing tools
+    from .dec import DecFileParser
 
-# Direct access to decay chain representation classes and visualization tools
-from .decay import DaughtersDict, DecayChain, DecayChainViewer, DecayMode
+    # Direct access to decay chain representation classes and visualization tools
+    from .decay import (
+        DaughtersDict,
+        DecayChain,
+        DecayChainCollection,
+        DecayChainViewer,
+        DecayMode,
+        FrozenDaughters,
+    )
+
+# The subpackages and classes are only imported when first used
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "DaughtersDict": ".decay",
+        "DecFileParser": ".dec",
+        "DecayChain": ".decay",
+        "DecayChainCollection": ".decay",
+        "DecayChainViewer": ".decay",
+        "DecayMode": ".decay",
+        "FrozenDaughters": ".decay",
+        "data": ".data",
+        "dec": ".dec",
+        "decay": ".decay",
+        "modeling": ".modeling",
+        "utils": ".utils",
+    },
+)
 
 __all__ = (
     "DaughtersDict",
     "DecFileParser",
     "DecayChain",
+    "DecayChainCollection",
     "DecayChainViewer",
     "DecayMode",
+    "FrozenDaughters",
     "__version__",
 )
 
@@ -4,39 +4,103 @@
 # Distributed under the 3-clause BSD license, see accompanying file LICENSE
 # or https://github.com/scikit-hep/decaylanguage for details.
 
+"""
+Command-line interface of decaylanguage, with the subcommands
+
+- ``convert``: convert an AmpGen options file to GooFit C++ code or a Python script,
+- ``validate``: validate EvtGen decay files, as ``decaylanguage-validate``.
+
+The modules running a subcommand, and their dependencies, are only imported
+when the subcommand runs, hence e.g. ``--help`` is fast.
+For backward compatibility, a command line without subcommand, e.g.
+``python -m decaylanguage -G goofit myinput.opts`` or
+``python -m decaylanguage myinput.opts -G goofit``, runs the ``convert`` subcommand.
+"""
 
 from __future__ import annotations
 
-try:
-    from plumbum import cli
+import argparse
+import sys
+from collections.abc import Sequence
+
+from ._version import version
+
 
-    from decaylanguage.modeling.ampgen2goofit import ampgen2goofit, ampgen2goofitpy
-except ModuleNotFoundError as err:
-    if err.name in {"numpy", "pandas", "plumbum"}:
-        msg = (
-            "The decaylanguage command-line interface requires extra dependencies; "
-            "install them with `pip install decaylanguage[modeling]`."
+def _convert(args: argparse.Namespace, extra: Sequence[str]) -> int:
+    del extra
+    try:
+        from decaylanguage.modeling.ampgen2goofit import (  # noqa: PLC0415
+            ampgen2goofit,
+            ampgen2goofitpy,
         )
-        raise ModuleNotFoundError(msg) from err
-    raise
+    except ModuleNotFoundError as err:
+        if err.name in {"numpy", "pandas", "plumbum"}:
+            msg = (
+                "The AmpGen to GooFit conversion requires extra dependencies; "
+                "install them with `pip install decaylanguage[modeling]`."
+            )
+            raise ModuleNotFoundError(msg) from err
+        raise
+
+    if args.generator == "goofit":
+        ampgen2goofit(args.filename)
+    else:
+        ampgen2goofitpy(args.filename)
+    return 0
+
+
+def _validate(args: argparse.Namespace, extra: Sequence[str]) -> int:
+    del args
+    from decaylanguage.dec.validate import main  # noqa: PLC0415
 
+    return main(extra, prog="decaylanguage validate")
+
+
+def parse_args(argv: Sequence[str]) -> tuple[argparse.Namespace, list[str]]:
+    parser = argparse.ArgumentParser(
+        prog="decaylanguage",
+        description="Command-line tools of decaylanguage.",
+    )
+    parser.add_argument("--version", action="version", version=version)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert = subparsers.add_parser(
+        "convert",
+        help="convert an AmpGen options file to GooFit",
+        description="Convert an AmpGen options file to GooFit C++ code "
+        "or to a GooFit Python script, printed out.",
+    )
+    convert.add_argument(
+        "-G",
+        "--generator",
+        choices=("goofit", "goofitpy"),
+        required=True,
+        help="output GooFit C++ code (goofit) or a Python script (goofitpy)",
+    )
+    convert.add_argument("filename", help="AmpGen options file")
+    convert.set_defaults(run=_convert)
 
-class DecayLanguageDecay(cli.Application):
-    generator = cli.SwitchAttr(
-        ["-G", "--generator"], cli.Set("goofit", "goofitpy"), mandatory=True
+    # The options of the validation are parsed by decaylanguage.dec.validate
+    validate = subparsers.add_parser(
+        "validate",
+        help="validate EvtGen decay files, see 'decaylanguage validate --help'",
+        add_help=False,
     )
+    validate.set_defaults(run=_validate)
 
-    # pylint: disable-next=arguments-differ
-    def main(self, filename):
-        if self.generator == "goofit":
-            ampgen2goofit(filename)
-        elif self.generator == "goofitpy":
-            ampgen2goofitpy(filename)
+    # Former command line, without subcommand
+    if argv and argv[0] not in {*subparsers.choices, "-h", "--help", "--version"}:
+        argv = ["convert", *argv]
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command != "validate":
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return args, extra
 
 
-def main():
-    DecayLanguageDecay.run()
+def main(argv: Sequence[str] | None = None) -> int:
+    args, extra = parse_args(sys.argv[1:] if argv is None else argv)
+    return int(args.run(args, extra))
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
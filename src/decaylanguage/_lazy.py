@@ -0,0 +1,43 @@
+# Copyright (c) 2018-2026, Eduardo Rodrigues and Henry Schreiner.
+#
+# Distributed under the 3-clause BSD license, see accompanying file LICENSE
+# or https://github.com/scikit-hep/decaylanguage for details.
+
+"""
+Lazy loading of the attributes of the package and subpackages, so that importing
+``decaylanguage`` does not import the parser (lark), the particle tables
+or the viewer (graphviz) until first used.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from collections.abc import Callable
+from typing import Any
+
+
+def lazy_getattr(package: str, attributes: dict[str, str]) -> Callable[[str], Any]:
+    """
+    Module ``__getattr__`` of a package importing its attributes on first access.
+
+    Parameters
+    ----------
+    package: str
+        Name of the package, i.e. ``__name__``.
+    attributes: dict
+        Relative name of the module defining each attribute, e.g.
+        ``{"DecFileParser": ".dec"}``. An attribute mapped to itself is a submodule,
+        e.g. ``{"dec": ".dec"}``.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name not in attributes:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module = importlib.import_module(attributes[name], package)
+        value = module if attributes[name] == f".{name}" else getattr(module, name)
+        # Later accesses do not go through __getattr__
+        setattr(sys.modules[package], name, value)
+        return value
+
+    return __getattr__
@@ -5,8 +5,17 @@
 
 from __future__ import annotations
 
-from .dec import DecFileParser
-from .enums import known_decay_models
+from typing import TYPE_CHECKING
+
+from .._lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from .dec import DecFileParser
+    from .enums import known_decay_models
+
+__getattr__ = lazy_getattr(
+    __name__, {"DecFileParser": ".dec", "known_decay_models": ".enums"}
+)
 
 __all__ = ("DecFileParser", "known_decay_models")
 
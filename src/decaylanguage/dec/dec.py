@@ -39,27 +39,35 @@ Basic assumptions
 from __future__ import annotations
 
 import copy
+import hashlib
+import json
 import os
 import re
 import warnings
+from array import array
+from bisect import bisect_right
 from collections import Counter
 from collections.abc import Callable, Iterable
 from functools import cache
 from io import StringIO
-from itertools import chain, zip_longest
+from itertools import chain, pairwise, zip_longest
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
 from hepunits import GeV
 from lark import Lark, Token, Transformer, Tree, Visitor
+from lark import __version__ as lark_version
+from lark.exceptions import UnexpectedInput
 from lark.lexer import TerminalDef
 from particle import Particle
+from particle import __version__ as particle_version
 from particle.converters import PDG2EvtGenNameMap
 
 from .. import data
 from .._compat.typing import Self
+from .._version import version
 from ..decay.decay import DecayModeDict, _expand_decay_modes
-from ..utils import charge_conjugate_name
+from ..utils import DescriptorFormatter, charge_conjugate_name
 from .enums import PhotosEnum, known_decay_models
 
 
@@ -101,6 +109,32 @@ class MissingCopyDecaySourceWarning(DecFileWarning):
     code = "DLW006"
 
 
+class DecFileSyntaxWarning(DecFileWarning):
+    code = "DLP001"
+
+
+class DecFileDiagnostic(NamedTuple):
+    """
+    Structured record of an issue found while interpreting a parsed decay file,
+    collected in place of a warning when a diagnostics sink is given to
+    ``DecFileParser.parse``.
+
+    The file, line and column, if known, locate the offending statement.
+    """
+
+    category: type[Warning]
+    message: str
+    particles: tuple[str, ...] = ()
+    line: int | None = None
+    column: int | None = None
+    file: str | None = None
+
+    @property
+    def code(self) -> str | None:
+        """Diagnostic code of the warning category, if any, e.g. 'DLW001'."""
+        return getattr(self.category, "code", None)
+
+
 @cache
 def _build_lark_parser(
     grammar: str,
@@ -135,6 +169,216 @@ def _build_lark_parser(
     )
 
 
+class SourceSpan(NamedTuple):
+    """
+    Location of a statement of the decay file(s) given to a ``DecFileParser``:
+    its file, first and last lines in that file (1-based, inclusive),
+    and start and end offsets in the concatenated input.
+    """
+
+    file: str
+    line: int
+    end_line: int
+    start: int
+    end: int
+
+
+class SourceIndex:
+    """
+    Index of the concatenated content of the decay file(s) given to a
+    ``DecFileParser``, mapping offsets and lines in the concatenated input
+    to files and lines in them.
+
+    Only the first line of every file and the few lines filtered out of it
+    (intermediate "End" lines) are stored; the offsets of the lines of the
+    concatenated input are only computed, compactly, if offsets are looked up.
+
+    Examples
+    --------
+    >>> index = SourceIndex("Alias MyD0 D0\\n\\nDecay MyD0\\n")
+    >>> index.add_file("a.dec", 1, [2])
+    >>> index.add_file("b.dec", 3, [])
+    >>> index.locate_line(2)
+    ('a.dec', 3)
+    >>> index.locate(16)
+    ('b.dec', 1)
+    """
+
+    __slots__ = ("_files", "_first_lines", "_line_starts", "_removed", "_text")
+
+    def __init__(self, text: str) -> None:
+        self._text = text
+        self._files: list[str] = []
+        self._first_lines: list[int] = []  # In the concatenated input
+        self._removed: list[list[int]] = []  # Lines filtered out of every file
+        self._line_starts: array[int] | None = None
+
+    def add_file(self, name: str, first_line: int, removed: list[int]) -> None:
+        """
+        Register the next file of the concatenated input, with its first line
+        in the concatenated input and the (sorted) numbers of the lines
+        filtered out of it.
+        """
+        self._files.append(name)
+        self._first_lines.append(first_line)
+        self._removed.append(removed)
+
+    @property
+    def files(self) -> list[str]:
+        """Names of the indexed files, in order."""
+        return list(self._files)
+
+    @property
+    def line_starts(self) -> array[int]:
+        """Offsets of the lines of the concatenated input."""
+        if self._line_starts is None:
+            self._line_starts = array(
+                "q", [0, *(m.end() for m in re.finditer("\n", self._text))]
+            )
+        return self._line_starts
+
+    def line_of(self, offset: int) -> int:
+        """Line (1-based) of the concatenated input at the given offset."""
+        return bisect_right(self.line_starts, offset)
+
+    def line_text(self, line: int) -> str:
+        """Text of the given line (1-based) of the concatenated input."""
+        starts = self.line_starts
+        end = starts[line] if line < len(starts) else len(self._text)
+        return self._text[starts[line - 1] : end].rstrip("\r\n")
+
+    def source_line(self, file: str, line: int) -> str | None:
+        """
+        Text of the given line (1-based) of the given file,
+        None if unknown or filtered out of the concatenated input.
+        """
+        try:
+            i = self._files.index(file)
+        except ValueError:
+            return None
+        removed = self._removed[i]
+        if line < 1 or line in removed:
+            return None
+        line = self._first_lines[i] + line - 1 - sum(r < line for r in removed)
+        end = (
+            self._first_lines[i + 1]
+            if i + 1 < len(self._files)
+            else len(self.line_starts) + 1
+        )
+        return self.line_text(line) if line < end else None
+
+    def locate(self, offset: int) -> tuple[str, int]:
+        """File and line in it at the given offset of the concatenated input."""
+        return self.locate_line(self.line_of(offset))
+
+    def locate_line(self, line: int) -> tuple[str, int]:
+        """File and line in it of the given line (1-based) of the concatenated input."""
+        i = max(bisect_right(self._first_lines, line) - 1, 0)
+        local = line - self._first_lines[i] + 1
+        for removed in self._removed[i]:
+            if removed <= local:
+                local += 1
+        return self._files[i], local
+
+
+# Keywords starting the statements of a decay file, see the grammar
+_STATEMENT_KEYWORDS = frozenset(
+    (
+        "Alias",
+        "BlattWeisskopf",
+        "CDecay",
+        "ChangeMassMax",
+        "ChangeMassMin",
+        "ChargeConj",
+        "CopyDecay",
+        "Decay",
+        "Define",
+        "End",
+        "IncludeBirthFactor",
+        "IncludeDecayFactor",
+        "JetSetPar",
+        "LSFLAT",
+        "LSMANYDELTAFUNC",
+        "LSNONRELBW",
+        "ModelAlias",
+        "Particle",
+        "PythiaAliasParam",
+        "PythiaBothParam",
+        "PythiaGenericParam",
+        "SetLineshapePW",
+        "noPhotos",
+        "yesPhotos",
+    )
+)
+
+
+def _split_statements(text: str) -> list[tuple[int, str]]:
+    """
+    Split the content of a decay file into chunks of whole statements,
+    each with the number of lines preceding it, at the statement boundaries
+    that can be told without parsing: a Decay block extends up to its Enddecay
+    or the next statement keyword, and (multi-line) model aliases up to their
+    semicolon; any other line starts a new chunk unless blank or a comment.
+
+    Examples
+    --------
+    >>> _split_statements("Alias MyD0 D0\\nDecay MyD0\\n1.0 K- pi+ PHSP;\\nEnddecay\\n")
+    [(0, 'Alias MyD0 D0\\n'), (1, 'Decay MyD0\\n1.0 K- pi+ PHSP;\\nEnddecay\\n')]
+    """
+    lines = text.splitlines(keepends=True)
+    starts = [0]
+    block = None  # Statement possibly continued on the next lines
+    for i, line in enumerate(lines):
+        words = line.split("#", 1)[0].split(None, 1)
+        if not words:
+            continue
+        if words[0] == "Enddecay" and block == "Decay":
+            block = None
+            continue
+        if words[0] in _STATEMENT_KEYWORDS or block is None:
+            if i:
+                starts.append(i)
+            block = words[0] if words[0] in ("Decay", "ModelAlias") else None
+        if block == "ModelAlias" and ";" in line:
+            block = None
+    starts.append(len(lines))
+    return [
+        (begin, "".join(lines[begin:end]))
+        for begin, end in pairwise(starts)
+        if begin < end
+    ]
+
+
+def _shifted_copy(tree: Tree[Any], lines: int, chars: int) -> Tree[Any]:
+    """
+    Copy a parsed tree, down to its tokens, shifting the positions of the tokens
+    by the given numbers of lines and characters.
+    """
+    children: list[Any] = []
+    for child in tree.children:
+        if isinstance(child, Tree):
+            children.append(_shifted_copy(child, lines, chars))
+        else:
+            children.append(
+                Token(
+                    child.type,
+                    child.value,
+                    None if child.start_pos is None else child.start_pos + chars,
+                    None if child.line is None else child.line + lines,
+                    child.column,
+                    None if child.end_line is None else child.end_line + lines,
+                    child.end_column,
+                    None if child.end_pos is None else child.end_pos + chars,
+                )
+            )
+    return Tree(tree.data, children)
+
+
+def _first_token(tree: Tree[Any]) -> Token:
+    token: Token = next(tree.scan_values(lambda v: isinstance(v, Token)))
+    return token
+
+
 class DecFileParser:
     """
     The class to parse a .dec decay file.
@@ -147,17 +391,24 @@ class DecFileParser:
 
     __slots__ = (
         "_additional_decay_models",
+        "_base",
         "_dec_file",
         "_dec_file_names",
         "_decay_modes_index",
+        "_diagnostics",
         "_grammar",
         "_grammar_info",
         "_include_ccdecays",
         "_parsed_dec_file",
         "_parsed_decays",
+        "_source_index",
+        "_statement_cache",
+        "_tables",
     )
 
-    def __init__(self, *filenames: str | os.PathLike[str]) -> None:
+    def __init__(
+        self, *filenames: str | os.PathLike[str], base: DecFileParser | None = None
+    ) -> None:
         """
         Default constructor. Parse one or more .dec decay files.
 
@@ -165,7 +416,18 @@ class DecFileParser:
         ----------
         filenames: non-keyworded variable length argument
             Input .dec decay file name(s).
-        """
+        base: DecFileParser, optional, default=None
+            Parsed decay file(s) the input file(s) are layered on, such as
+            the generic DECAY.DEC for user decay files. Only the input file(s)
+            are then parsed, the definitions and decays of the base being
+            looked up when not overridden by the input file(s), as in EvtGen.
+            The base is shared, not copied, and must not be parsed again.
+            The definitions tables merged with those of the base are then built
+            once per parse and shared between calls, and must not be modified.
+        """
+        if base is not None:
+            base._check_parsing()
+        self._base: DecFileParser | _DecFileSnapshot | None = base
         self._grammar: str | None = None  # Loaded Lark grammar definition file
         self._grammar_info: dict[str, Any] | None = (
             None  # Name of Lark grammar definition file
@@ -177,19 +439,29 @@ class DecFileParser:
             self._dec_file_names = list(filenames)
 
             stream = StringIO()
+            files = []
+            first_line = 1
             for filename in map(Path, self._dec_file_names):
                 # Check input file
                 if not filename.is_file():
                     raise FileNotFoundError(f"{str(filename)!r}!")
 
+                removed: list[int] = []
                 with filename.open(encoding="utf_8") as file:
-                    stream.write(self._filter_lines(file))
-                    stream.write("\n")
+                    content = self._filter_lines(file, removed)
+                stream.write(content)
+                stream.write("\n")
+                files.append((str(filename), first_line, removed))
+                first_line += content.count("\n") + 1
 
             stream.seek(0)
             self._dec_file = stream.read()
+            self._source_index: SourceIndex | None = SourceIndex(self._dec_file)
+            for file_info in files:
+                self._source_index.add_file(*file_info)
         else:
             self._dec_file_names = []
+            self._source_index = None
 
         self._parsed_dec_file: Tree | None = None  # Parsed decay file
         # Particle decays found in the decay file
@@ -202,27 +474,45 @@ class DecFileParser:
         self._additional_decay_models: Iterable[str] | None = (
             None  # Additional decay models not (yet) known to DecayLanguage
         )
+        if base is not None and base._additional_decay_models is not None:
+            self._additional_decay_models = list(base._additional_decay_models)
+
+        # Tables computed once per parse, for the decay files layered on this one
+        # and, if layered on a base, merged with those of the base
+        self._tables: dict[str, Any] = {}
 
         # By default, consider charge-conjugate decays when parsing
         self._include_ccdecays = True
 
+        # Sink collecting the issues found while parsing, if not warning about them
+        self._diagnostics: list[DecFileDiagnostic] | None = None
+
+        # Statements parsed previously, keyed on their text, see _parse_recovering.
+        # Set by long-lived callers re-parsing edited files, e.g. validation watch mode.
+        self._statement_cache: dict[str, list[Any]] | None = None
+
     @staticmethod
-    def _filter_lines(lines: Iterable[str]) -> str:
+    def _filter_lines(lines: Iterable[str], removed: list[int] | None = None) -> str:
         """
         Filter out intermediate "End" lines (but not "Enddecay" lines),
         which are present in intermediate decay files and would otherwise
         cause a parsing error. The unicode byte-order mark is stripped before
         the check, if present.
+        The numbers of the lines filtered out are appended to ``removed``, if given.
         """
         stream = StringIO()
-        for line in lines:
+        for number, line in enumerate(lines, 1):
             beg = line.lstrip("﻿").lstrip()
             if not (beg.startswith("End") and not beg.startswith("Enddecay")):
                 stream.write(line)
+            elif removed is not None:
+                removed.append(number)
         return stream.getvalue()
 
     @classmethod
-    def from_string(cls, filecontent: str) -> Self:
+    def from_string(
+        cls, filecontent: str, *, base: DecFileParser | None = None
+    ) -> Self:
         """
         Constructor from a .dec decay file provided as a multi-line string.
 
@@ -230,16 +520,101 @@ class DecFileParser:
         ----------
         filecontent: str
             Input .dec decay file content.
-        """
-        _cls = cls()
-        _cls._dec_file_names = ["<dec file input as a string>"]
+        base: DecFileParser, optional, default=None
+            Parsed decay file(s) the input is layered on, see the default constructor.
+
+        Examples
+        --------
+        >>> base = DecFileParser.from_string('''
+        ... Alias MyD0 D0
+        ... Decay MyD0
+        ... 1.0 K- pi+ PHSP;
+        ... Enddecay
+        ... Decay pi0
+        ... 1.0 gamma gamma PHSP;
+        ... Enddecay
+        ... ''')
+        >>> base.parse()
+        >>> user = DecFileParser.from_string('''
+        ... Decay MyD0
+        ... 1.0 K- pi+ pi0 PHSP;
+        ... Enddecay
+        ... ''', base=base)
+        >>> user.parse()
+        >>> user.list_decay_modes('MyD0'), user.list_decay_modes('pi0')
+        ([['K-', 'pi+', 'pi0']], [['gamma', 'gamma']])
+        >>> user.dict_aliases()
+        {'MyD0': 'D0'}
+        """
+        _cls = cls(base=base)
+        name = "<dec file input as a string>"
+        _cls._dec_file_names = [name]
         # Apply the same intermediate-"End"-line filtering as the file-based
         # constructor, so identical content parses the same way either way.
-        _cls._dec_file = _cls._filter_lines(StringIO(filecontent))
+        removed: list[int] = []
+        _cls._dec_file = _cls._filter_lines(StringIO(filecontent), removed)
+        _cls._source_index = SourceIndex(_cls._dec_file)
+        _cls._source_index.add_file(name, 1, removed)
 
         return _cls
 
-    def parse(self, include_ccdecays: bool = True) -> None:
+    @classmethod
+    def from_bundled(
+        cls, name: str, *, cache_dir: str | os.PathLike[str] | None = None
+    ) -> Self:
+        """
+        Constructor of a parsed decay file from a decay file bundled with the package,
+        DECAY_LHCB.DEC or DECAY_BELLE2.DEC, loaded from a pre-parsed snapshot.
+
+        The snapshot is created when first used and saved, as JSON, in the cache
+        directory, by default "decaylanguage" in ``$XDG_CACHE_HOME`` or ``~/.cache``,
+        hence the first call writes to the home directory unless ``cache_dir`` is given.
+        Snapshots are specific to the installed version of the package and shared
+        within the process. Their decays are only loaded when first used, hence the
+        parser is available within milliseconds.
+
+        The returned parser is already parsed: calling ``.parse()`` on it is not
+        needed, and re-parses it, with a warning. The parser can be used as the base
+        of user decay files.
+
+        Parameters
+        ----------
+        name: str
+            Name of the bundled decay file, "LHCB" or "BELLE2".
+        cache_dir: str or os.PathLike, optional, default=None
+            Directory of the snapshots, if not the default.
+
+        Examples
+        --------
+        >>> dfp = DecFileParser.from_bundled("LHCB")    # doctest: +SKIP
+        >>> dfp.list_decay_modes("D*+")    # doctest: +SKIP
+        [['D0', 'pi+'], ['D+', 'pi0'], ['D+', 'gamma']]
+        """
+        filename = _BUNDLED_DEC_FILES.get(name.upper())
+        if filename is None:
+            raise ValueError(
+                f"Unknown bundled decay file {name!r}, "
+                f"use one of {', '.join(map(repr, _BUNDLED_DEC_FILES))}!"
+            )
+        snapshot = _DecFileSnapshot.load(
+            filename, _snapshot_directory(cache_dir), _snapshot_key(filename)
+        )
+        _cls = cls()
+        _cls._base = snapshot
+        _cls._dec_file_names = [filename]
+        _cls._dec_file = ""
+        # Nothing to parse on top of the snapshot
+        _cls._parsed_dec_file = Tree("start", [])
+        _cls._parsed_decays = []
+        return _cls
+
+    def parse(
+        self,
+        include_ccdecays: bool = True,
+        *,
+        diagnostics: list[DecFileDiagnostic] | None = None,
+        recover: bool = False,
+    ) -> None:
         """
         Parse the given .dec decay file(s) according to the default Lark parser
         and specified options.
@@ -254,13 +629,43 @@ class DecFileParser:
             which are specified via "CDecay <MOTHER>".
             Make sure you understand the consequences of ignoring
             charge conjugate decays - you won't have a complete picture otherwise!
-        """
+        diagnostics: list, optional, default=None
+            Sink collecting the issues found in the decay file(s), e.g. duplicate
+            decays, as ``DecFileDiagnostic`` records rather than issuing warnings.
+            Unlike catching warnings, this is safe for concurrent parsing.
+        recover: boolean, optional, default=False
+            Rather than failing at the first syntax error, report every syntax error
+            (see ``diagnostics``) and carry on with the statements parsed correctly.
+            The parsing resumes at the next statement after each error,
+            e.g. after the ``Enddecay`` of a Decay block with a faulty decay line.
+
+        Examples
+        --------
+        >>> dfp = DecFileParser.from_string('''
+        ... Decay pi0
+        ... 1.0 gamma gamma PHSP;
+        ... Enddecay
+        ... CDecay pi0
+        ... ''')
+        >>> issues = []
+        >>> dfp.parse(diagnostics=issues)
+        >>> issues[0].code, issues[0].particles, issues[0].line
+        ('DLW003', ('pi0',), 5)
+        """
+        self._diagnostics = diagnostics
+        try:
+            self._parse(include_ccdecays, recover)
+        finally:
+            self._diagnostics = None
+
+    def _parse(self, include_ccdecays: bool, recover: bool) -> None:
         # Has a file been parsed already?
         if self._parsed_decays is not None:
-            warnings.warn("Input file being re-parsed ...", stacklevel=2)
+            self._report(UserWarning, "Input file being re-parsed ...", stacklevel=3)
 
         # Override the parsing settings for charge conjugate decays
         self._include_ccdecays = include_ccdecays or False
+        self._tables = {}
 
         # Retrieve all info on the default Lark grammar and its default options,
         # effectively loading it
@@ -290,7 +695,10 @@ class DecFileParser:
                 opts["lexer"],
                 self._decay_models_tuple(),
             )
-        self._parsed_dec_file = parser.parse(self._dec_file)
+        if recover:
+            self._parsed_dec_file = self._parse_recovering(parser)
+        else:
+            self._parsed_dec_file = parser.parse(self._dec_file)
 
         # At last, find all particle decays defined in the .dec decay file ...
         self._find_parsed_decays()
@@ -316,13 +724,233 @@ class DecFileParser:
         for tree in self._parsed_decays:
             DecayModelParamValueReplacement(define_defs=dict_define_defs).visit(tree)
         # Create on the fly the decays to be copied, if requested
-        if self.dict_decays2copy():
+        if get_decays2copy_statements(self._parsed_dec_file):
             self._add_decays_to_be_copied()
 
         # Create on the fly the charge conjugate decays, if requested
         if self._include_ccdecays:
             self._add_charge_conjugate_decays()
 
+    def _parse_recovering(self, parser: Lark) -> Tree[Any]:
+        """
+        Parse the decay file(s), reporting all syntax errors rather than failing,
+        and keeping only the statements parsed correctly.
+
+        With a statement cache, the input is parsed statement by statement,
+        see _split_statements, and only the statements not parsed previously
+        are parsed, the cache being left with the statements of the input.
+        """
+        assert self._dec_file is not None
+        cache = self._statement_cache
+        if cache is None:
+            try:
+                return parser.parse(self._dec_file)
+            except UnexpectedInput:
+                pass
+
+        # Parse statement by statement, shifting the positions of the tokens
+        # to the whole input, statements being cached with their own positions
+        statements: list[Any] = []
+        parsed: dict[str, list[Any]] = {}
+        errors: list[tuple[str, int, int | None]] = []
+        chars = 0
+        for offset, chunk in _split_statements(self._dec_file):
+            chunk_statements: list[Any] | None = parsed.get(chunk)
+            if chunk_statements is None and cache is not None:
+                chunk_statements = cache.get(chunk)
+            if chunk_statements is None:
+                try:
+                    new_statements: list[Any] = parser.parse(chunk).children
+                except UnexpectedInput as exc:
+                    errors.append(self._syntax_error(exc, offset, chunk))
+                    new_statements = []
+                chunk_statements = new_statements
+            parsed[chunk] = chunk_statements
+            statements += [
+                _shifted_copy(statement, offset, chars)
+                for statement in chunk_statements
+            ]
+            chars += len(chunk)
+
+        if cache is not None:
+            if errors:
+                # Make sure the errors are not due to splitting the input wrongly
+                try:
+                    return parser.parse(self._dec_file)
+                except UnexpectedInput:
+                    pass
+            cache.clear()
+            cache.update(parsed)
+        for message, line, column in errors:
+            self._report(
+                DecFileSyntaxWarning, message, line=line, column=column, stacklevel=4
+            )
+        return Tree("start", statements)
+
+    def _syntax_error(
+        self, exc: UnexpectedInput, offset: int, chunk: str
+    ) -> tuple[str, int, int | None]:
+        """
+        Message, line and column in the whole input of a syntax error
+        in a chunk of the input starting after ``offset`` lines.
+        The message quotes the line in the input file.
+        """
+        line, column = getattr(exc, "line", None), getattr(exc, "column", None)
+        chunk_lines = chunk.rstrip().splitlines() or [""]
+        if isinstance(line, int) and 0 < line <= len(chunk_lines):
+            line += offset
+        else:
+            # Unexpected end of the chunk, e.g. a missing Enddecay,
+            # located right after the last character of the chunk
+            line, column = offset + len(chunk_lines), len(chunk_lines[-1]) + 1
+        # Report the position in the input file
+        exc.line = line
+        if isinstance(column, int):
+            exc.column = column
+        if self._source_index is not None:
+            exc.line = self._source_index.locate_line(line)[1]
+        lines = str(exc).strip().splitlines()
+        message = exc.__class__.__name__
+        if lines:
+            message += f": {lines[0]}"
+        return message, line, column if isinstance(column, int) else None
+
+    def _report(
+        self,
+        category: type[Warning],
+        message: str,
+        particles: Iterable[str] = (),
+        token: Token | None = None,
+        *,
+        line: int | None = None,
+        column: int | None = None,
+        stacklevel: int = 2,
+    ) -> None:
+        """
+        Report an issue found while parsing, to the diagnostics sink if any,
+        else as a warning.
+        The issue is located by the given token or line and column, if any.
+        As for ``warnings.warn``, ``stacklevel`` is relative to the caller.
+        """
+        if self._diagnostics is None:
+            warnings.warn(message, category, stacklevel=stacklevel + 1)
+            return
+        if token is not None:
+            line, column = token.line, token.column
+        file = None
+        if line is not None and self._source_index is not None:
+            file, line = self._source_index.locate_line(line)
+        self._diagnostics.append(
+            DecFileDiagnostic(category, message, tuple(particles), line, column, file)
+        )
+
+    @property
+    def source_index(self) -> SourceIndex | None:
+        """
+        Index mapping positions in the concatenated input decay file(s)
+        to files and lines, None if no input was given.
+        """
+        return self._source_index
+
+    def _span(self, start: int, end: int) -> SourceSpan:
+        assert self._source_index is not None
+        file, line = self._source_index.locate(start)
+        end_line = self._source_index.locate(max(end - 1, start))[1]
+        return SourceSpan(file, line, end_line, start, end)
+
+    def decay_span(self, mother: str) -> SourceSpan:
+        """
+        Return the location of the Decay block of the given mother particle,
+        from 'Decay' to 'Enddecay', as used by the parser.
+
+        Decays created from 'CDecay' or 'CopyDecay' statements are located
+        at the Decay block they are created from.
+
+        Parameters
+        ----------
+        mother: str
+            Input mother particle name.
+
+        Examples
+        --------
+        >>> dfp = DecFileParser.from_string('''
+        ... Decay D0
+        ... 1.0 K- pi+ PHSP;
+        ... Enddecay
+        ... ''')
+        >>> dfp.parse()
+        >>> dfp.decay_span('D0')
+        SourceSpan(file='<dec file input as a string>', line=2, end_line=4, start=1, end=35)
+        """
+        if self._base is not None and mother not in self._decay_index():
+            return self._base.decay_span(mother)
+        decay = self._find_decay(mother)
+        text = self._dec_file
+        assert text is not None
+        # Positions are taken from the tokens, not from the (costly) tree metadata
+        mother_token = _first_token(decay)
+        start = text.rfind("Decay", 0, mother_token.start_pos)
+        lines = decay.children[1:]
+        after = self._decay_mode_start(lines[-1]) if lines else mother_token.end_pos
+        end = text.find("Enddecay", after) + len("Enddecay")
+        return self._span(start, end)
+
+    def decay_mode_spans(self, mother: str) -> list[SourceSpan]:
+        """
+        Return the locations of the decay modes of the given mother particle,
+        from the branching fraction to the terminating semicolon,
+        in the order of ``list_decay_modes``.
+
+        Parameters
+        ----------
+        mother: str
+            Input mother particle name.
+        """
+        if self._base is not None and mother not in self._decay_index():
+            return self._base.decay_mode_spans(mother)
+        text = self._dec_file
+        assert text is not None
+        spans = []
+        for decay_mode in self._find_decay_modes(mother):
+            start = self._decay_mode_start(decay_mode)
+            spans.append(self._span(start, text.find(";", start) + 1))
+        return spans
+
+    @staticmethod
+    def _decay_mode_start(decay_mode: Tree[Any]) -> int:
+        # The branching fraction token, the model tokens may come from a ModelAlias
+        return _first_token(decay_mode).start_pos or 0
+
+    def _find_decay(self, mother: str) -> Tree[Any]:
+        self._check_parsing()
+        assert self._parsed_decays is not None
+        for decay in self._parsed_decays:
+            if get_decay_mother_name(decay) == mother:
+                return decay
+        if self._base is not None:
+            return self._base._find_decay(mother)
+        raise DecayNotFound(f"Decays of particle '{mother}' not found in .dec file!")
+
+    def _statement_tokens(self, statement: str, name: str) -> list[Token]:
+        """
+        Tokens of the given statements, e.g. 'cdecay', whose first argument
+        is the given particle, in file order.
+        """
+        assert self._parsed_dec_file is not None
+        tokens = [
+            _first_token(tree) for tree in self._parsed_dec_file.find_data(statement)
+        ]
+        return sorted(
+            (token for token in tokens if token == name),
+            key=lambda t: (t.line or 0, t.column or 0),
+        )
+
+    def _first_statement_token(
+        self, statement: str, name: str, index: int = 0
+    ) -> Token | None:
+        tokens = self._statement_tokens(statement, name)
+        return tokens[index] if len(tokens) > index else None
+
     def grammar(self) -> str:
         """
         Access the internal Lark grammar definition file,
@@ -477,7 +1105,9 @@ class DecFileParser:
         as {'NAME1': DECAY_TO_COPY1, 'NAME2': DECAY_TO_COPY2, ...}.
         """
         self._check_parsing()
-        return get_decays2copy_statements(self._parsed_dec_file)
+        return self._layered(
+            "dict_decays2copy", get_decays2copy_statements(self._parsed_dec_file)
+        )
 
     def dict_definitions(self) -> dict[str, float]:
         """
@@ -486,7 +1116,7 @@ class DecFileParser:
         as {'NAME1': VALUE1, 'NAME2': VALUE2, ...}.
         """
         self._check_parsing()
-        return get_definitions(self._parsed_dec_file)
+        return self._layered("dict_definitions", get_definitions(self._parsed_dec_file))
 
     def dict_model_aliases(self) -> dict[str, list[str]]:
         """
@@ -495,7 +1125,9 @@ class DecFileParser:
         as as {'NAME1': [MODEL_NAME, MODEL_OPTION1, MODEL_OPTION2,...],}.
         """
         self._check_parsing()
-        return get_model_aliases(self._parsed_dec_file)
+        return self._layered(
+            "dict_model_aliases", get_model_aliases(self._parsed_dec_file)
+        )
 
     def _dict_raw_model_aliases(self) -> dict[str, list[Token | Tree]]:
         """
@@ -505,10 +1137,15 @@ class DecFileParser:
         """
         self._check_parsing()
         assert self._parsed_dec_file is not None
-        return {
-            tree.children[0].children[0].value: copy.deepcopy(tree.children[1].children)
-            for tree in self._parsed_dec_file.find_data("model_alias")
-        }
+        return self._layered(
+            "_dict_raw_model_aliases",
+            {
+                tree.children[0].children[0].value: copy.deepcopy(
+                    tree.children[1].children
+                )
+                for tree in self._parsed_dec_file.find_data("model_alias")
+            },
+        )
 
     def dict_aliases(self) -> dict[str, str]:
         """
@@ -517,7 +1154,7 @@ class DecFileParser:
         as {'NAME1': ALIAS1, 'NAME2': ALIAS2, ...}.
         """
         self._check_parsing()
-        return get_aliases(self._parsed_dec_file)
+        return self._layered("dict_aliases", get_aliases(self._parsed_dec_file))
 
     def dict_charge_conjugates(self) -> dict[str, str]:
         """
@@ -527,7 +1164,9 @@ class DecFileParser:
         {'PARTICLE1': CC_PARTICLE1, 'PARTICLE2': CC_PARTICLE2, ...}.
         """
         self._check_parsing()
-        return get_charge_conjugate_defs(self._parsed_dec_file)
+        return self._layered(
+            "dict_charge_conjugates", get_charge_conjugate_defs(self._parsed_dec_file)
+        )
 
     def get_particle_property_definitions(self) -> dict[str, dict[str, float]]:
         """
@@ -551,7 +1190,10 @@ class DecFileParser:
            When not specified, the width is taken from the particle or alias.
         """
         self._check_parsing()
-        return get_particle_property_definitions(self._parsed_dec_file)
+        return self._layered(
+            "get_particle_property_definitions",
+            get_particle_property_definitions(self._parsed_dec_file),
+        )
 
     def dict_pythia_definitions(self) -> dict[str, dict[str, str | float]]:
         """
@@ -568,7 +1210,9 @@ class DecFileParser:
              "PythiaGenericParam": {'<MODULE4>:<PARAM5>': 'LABEL5', '<MODULE5>:<PARAM6>': VALUE6, ...}}.
         """
         self._check_parsing()
-        return get_pythia_definitions(self._parsed_dec_file)
+        return self._layered(
+            "dict_pythia_definitions", get_pythia_definitions(self._parsed_dec_file)
+        )
 
     def dict_jetset_definitions(self) -> dict[str, dict[int, int | float | str]]:
         """
@@ -582,18 +1226,30 @@ class DecFileParser:
              ...}.
         """
         self._check_parsing()
-        return get_jetset_definitions(self._parsed_dec_file)
+        return self._layered(
+            "dict_jetset_definitions", get_jetset_definitions(self._parsed_dec_file)
+        )
 
-    def expand_decay_modes(self, particle: str) -> list[str]:
+    def expand_decay_modes(
+        self, particle: str, formatter: DescriptorFormatter | None = None
+    ) -> list[str]:
         """
         Return a list of expanded decay descriptors for the given (mother) particle.
         The set of decay final states is effectively split and returned as a list.
         NB: this implicitly reverts aliases back to the original (EvtGen) names.
+
+        Parameters
+        ----------
+        particle: str
+            Input (mother) particle name.
+        formatter: DescriptorFormatter, optional, default=None
+            Formatter of the decay descriptors.
+            Default is the formatter of the current context, see ``DescriptorFormat``.
         """
         self._check_parsing()
         decay_chains = self.build_decay_chains(particle)
         aliases = self.dict_aliases()
-        return _expand_decay_modes(decay_chains, aliases=aliases)
+        return _expand_decay_modes(decay_chains, aliases=aliases, formatter=formatter)
 
     def dict_lineshape_settings(self) -> dict[str, dict[str, str | float]]:
         """
@@ -616,7 +1272,9 @@ class DecFileParser:
         where not all "sub-dictionaries" may contain all and/or the same keys.
         """
         self._check_parsing()
-        return get_lineshape_settings(self._parsed_dec_file)
+        return self._layered(
+            "dict_lineshape_settings", get_lineshape_settings(self._parsed_dec_file)
+        )
 
     def list_lineshapePW_definitions(self) -> list[tuple[list[str], int]]:
         """
@@ -630,7 +1288,15 @@ class DecFileParser:
              ...]
         """
         self._check_parsing()
-        return get_lineshapePW_definitions(self._parsed_dec_file)
+        definitions = get_lineshapePW_definitions(self._parsed_dec_file)
+        if self._base is None:
+            return definitions
+        if "list_lineshapePW_definitions" not in self._tables:
+            self._tables["list_lineshapePW_definitions"] = [
+                *self._base._table("list_lineshapePW_definitions"),
+                *definitions,
+            ]
+        return list(self._tables["list_lineshapePW_definitions"])
 
     def global_photos_flag(self) -> int:
         """
@@ -646,6 +1312,12 @@ class DecFileParser:
             PhotosEnum.yes / PhotosEnum.no if PHOTOS enabled / disabled
         """
         self._check_parsing()
+        assert self._parsed_dec_file is not None
+        if self._base is not None and not any(
+            statement.data == "global_photos"
+            for statement in self._parsed_dec_file.children
+        ):
+            return self._base.global_photos_flag()
         return get_global_photos_flag(self._parsed_dec_file)
 
     def list_charge_conjugate_decays(self) -> list[str]:
@@ -655,7 +1327,10 @@ class DecFileParser:
         ['MOTHER1', 'MOTHER2', ...].
         """
         self._check_parsing()
-        return get_charge_conjugate_decays(self._parsed_dec_file)
+        mothers = get_charge_conjugate_decays(self._parsed_dec_file)
+        if self._base is None:
+            return mothers
+        return sorted([*self._base._table("list_charge_conjugate_decays"), *mothers])
 
     def _find_parsed_decays(self) -> None:
         """
@@ -694,7 +1369,8 @@ class DecFileParser:
            In other terms, only explicit copies are performed.
         2) Method not meant to be used directly!
         """
-        decays2copy = self.dict_decays2copy()
+        assert self._parsed_dec_file is not None
+        decays2copy = get_decays2copy_statements(self._parsed_dec_file)
         assert self._parsed_decays is not None
 
         # match name -> position in list self._parsed_decays
@@ -708,7 +1384,7 @@ class DecFileParser:
         misses = []
         for decay2copy, decay2becopied in decays2copy.items():
             try:
-                match = self._parsed_decays[name2treepos[decay2becopied]]
+                match = self._source_decay(decay2becopied, name2treepos)
                 copied_decay = copy.deepcopy(match)
                 copied_decay.children[0].children[0].value = decay2copy
                 copied_decays.append(copied_decay)
@@ -718,7 +1394,12 @@ class DecFileParser:
             msg = """\nCorresponding 'Decay' statement for 'CopyDecay' statement(s) of following particle(s) not found:\n{}.
 Skipping creation of these copied decay trees.""".format("\n".join(misses))
 
-            warnings.warn(msg, MissingCopyDecaySourceWarning, stacklevel=2)
+            self._report(
+                MissingCopyDecaySourceWarning,
+                msg,
+                misses,
+                self._first_statement_token("copydecay", misses[0]),
+            )
 
         # Actually add all these copied decays to the list of decays!
         self._parsed_decays.extend(copied_decays)
@@ -747,7 +1428,8 @@ Skipping creation of these copied decay trees.""".format("\n".join(misses))
 
         # Do not add any charge conjugate decays if the input parsed file
         # does not define any!
-        mother_names_ccdecays = self.list_charge_conjugate_decays()
+        assert self._parsed_dec_file is not None
+        mother_names_ccdecays = get_charge_conjugate_decays(self._parsed_dec_file)
         if len(mother_names_ccdecays) == 0:
             return
 
@@ -762,7 +1444,12 @@ Skipping creation of these copied decay trees.""".format("\n".join(misses))
 All but the first occurrence(s) will be discarded/removed ...""".format(
                 ", ".join(duplicate_cdecays)
             )
-            warnings.warn(msg, DuplicateCDecayWarning, stacklevel=2)
+            self._report(
+                DuplicateCDecayWarning,
+                msg,
+                duplicate_cdecays,
+                self._first_statement_token("cdecay", duplicate_cdecays[0], 1),
+            )
             mother_names_ccdecays = list(dict.fromkeys(mother_names_ccdecays))
 
         # Cross-check - make sure charge conjugate decays are not defined
@@ -776,7 +1463,12 @@ All but the first occurrence(s) will be discarded/removed ...""".format(
             str_duplicates = ", ".join(d for d in duplicates)
             msg = f"""The following particles are defined in the input .dec file with both 'Decay' and 'CDecay': {str_duplicates}!
 The 'CDecay' definition(s) will be ignored ..."""
-            warnings.warn(msg, DecayAndCDecayWarning, stacklevel=2)
+            self._report(
+                DecayAndCDecayWarning,
+                msg,
+                duplicates,
+                self._first_statement_token("cdecay", duplicates[0]),
+            )
 
         # If that's the case, proceed using the decay definitions specified
         # via the 'Decay' statement, hence discard/remove the definition
@@ -806,7 +1498,7 @@ The 'CDecay' definition(s) will be ignored ..."""
         for ccname in mother_names_ccdecays:
             name = find_charge_conjugate_match(ccname, dict_cc_names)
             try:
-                match = self._parsed_decays[name2treepos[name]]
+                match = self._source_decay(name, name2treepos)
                 trees_to_conjugate.append(match)
             except Exception:  # noqa: BLE001
                 misses.append(ccname)
@@ -815,7 +1507,12 @@ The 'CDecay' definition(s) will be ignored ..."""
 Skipping creation of these charge-conjugate decay trees.""".format(
                 "\n".join(m for m in misses)
             )
-            warnings.warn(msg, MissingCDecaySourceWarning, stacklevel=2)
+            self._report(
+                MissingCDecaySourceWarning,
+                msg,
+                misses,
+                self._first_statement_token("cdecay", misses[0]),
+            )
 
         cdecays = [copy.deepcopy(tree) for tree in trees_to_conjugate]
 
@@ -828,7 +1525,12 @@ Skipping creation of these charge-conjugate decay trees.""".format(
                 if Particle.from_evtgen_name(mname).is_self_conjugate:
                     msg = f"""Found 'CDecay' statement for self-conjugate particle {mname}. This is a bug!
 Skipping creation of charge-conjugate decay Tree."""
-                    warnings.warn(msg, SelfConjugateCDecayWarning, stacklevel=2)
+                    self._report(
+                        SelfConjugateCDecayWarning,
+                        msg,
+                        [mname],
+                        self._first_statement_token("cdecay", mname),
+                    )
                     return False
                 return True
             except Exception:  # noqa: BLE001
@@ -842,6 +1544,38 @@ Skipping creation of charge-conjugate decay Tree."""
         self._parsed_decays.extend(cdecays)
         self._decay_modes_index = None
 
+    def _source_decay(self, mother: str, name2treepos: dict[str, int]) -> Tree[Any]:
+        """
+        Decay of the mother particle to create decays from, with CDecay
+        or CopyDecay statements, from the input file(s) else the base.
+        """
+        assert self._parsed_decays is not None
+        if mother in name2treepos or self._base is None:
+            return self._parsed_decays[name2treepos[mother]]
+        return self._base._find_decay(mother)
+
+    def _table(self, method: str) -> Any:
+        """
+        Result of the given method, e.g. 'dict_aliases', computed once per parse
+        for the decay files layered on this one. Not to be modified.
+        """
+        if method not in self._tables:
+            # Layered tables are cached by the method itself, which returns a copy
+            self._tables.setdefault(method, getattr(self, method)())
+        return self._tables[method]
+
+    def _layered(self, method: str, table: dict[str, Any]) -> dict[str, Any]:
+        """
+        The given table of the input file(s) merged over the table of the base,
+        if any, as returned by the given method. The merged table is built once
+        per parse, sharing the values of the base table, and a shallow copy is returned.
+        """
+        if self._base is None:
+            return table
+        if method not in self._tables:
+            self._tables[method] = {**self._base._table(method), **table}
+        return dict(self._tables[method])
+
     def _check_parsing(self) -> None:
         """Has the .parse() method been called already?"""
         if self._parsed_dec_file is None:
@@ -855,19 +1589,18 @@ Skipping creation of charge-conjugate decay Tree."""
         Duplicates are removed, starting from the second occurrence.
         """
         # Count occurrences of each decay mother name in a single pass
-        lmn = self.list_decay_mother_names()
+        assert self._parsed_decays is not None
+        lmn = [get_decay_mother_name(d) for d in self._parsed_decays]
         counts = Counter(lmn)
         duplicates = {n for n, c in counts.items() if c > 1}
 
-        # Issue a helpful warning if duplicates are found
+        # Report the duplicates, if any
         if duplicates:
             msg = """The following particle(s) is(are) redefined in the input .dec file with 'Decay': {}!
 All but the first occurrence(s) will be discarded/removed ...""".format(
                 ", ".join(duplicates)
             )
 
-            warnings.warn(msg, DuplicateDecayWarning, stacklevel=2)
-
             # Rebuild the list keeping only the first occurrence of each name
             assert self._parsed_decays is not None
             seen: set[str] = set()
@@ -878,6 +1611,13 @@ All but the first occurrence(s) will be discarded/removed ...""".format(
                     continue
                 seen.add(val)
                 kept.append(tree)
+
+            # Point at the first redefinition in the file
+            redefinition = min(
+                (self._statement_tokens("decay", name)[1] for name in duplicates),
+                key=lambda t: (t.line or 0, t.column or 0),
+            )
+            self._report(DuplicateDecayWarning, msg, sorted(duplicates), redefinition)
             self._parsed_decays = kept
             self._decay_modes_index = None
 
@@ -887,6 +1627,8 @@ All but the first occurrence(s) will be discarded/removed ...""".format(
         self._check_parsing()
         assert self._parsed_decays is not None
 
+        if self._base is not None:
+            return len(self.list_decay_mother_names())
         return len(self._parsed_decays)
 
     def list_decay_mother_names(self) -> list[str | Any]:
@@ -896,7 +1638,16 @@ All but the first occurrence(s) will be discarded/removed ...""".format(
         self._check_parsing()
         assert self._parsed_decays is not None
 
-        return [get_decay_mother_name(d) for d in self._parsed_decays]
+        mothers = [get_decay_mother_name(d) for d in self._parsed_decays]
+        if self._base is None:
+            return mothers
+        # Decays of the base not overridden come first, as in EvtGen
+        overridden = set(mothers)
+        return [
+            mother
+            for mother in self._base._table("list_decay_mother_names")
+            if mother not in overridden
+        ] + mothers
 
     def _find_decay_modes(self, mother: str) -> tuple[Any, ...]:
         """
@@ -908,6 +1659,18 @@ All but the first occurrence(s) will be discarded/removed ...""".format(
         mother: str
             Input mother particle name.
         """
+        index = self._decay_index()
+        if mother in index:
+            return index[mother]
+        if self._base is not None:
+            return self._base._find_decay_modes(mother)
+        raise DecayNotFound(f"Decays of particle '{mother}' not found in .dec file!")
+
+    def _decay_index(self) -> dict[str, tuple[Any, ...]]:
+        """
+        Index of the decay modes of the decays of the input file(s), not the base,
+        by mother particle name.
+        """
         self._check_parsing()
         assert self._parsed_decays is not None
 
@@ -922,13 +1685,7 @@ All but the first occurrence(s) will be discarded/removed ...""".format(
                 if name not in index:
                     index[name] = tuple(decay_Tree.find_data("decayline"))
             self._decay_modes_index = index
-
-        try:
-            return self._decay_modes_index[mother]
-        except KeyError:
-            raise DecayNotFound(
-                f"Decays of particle '{mother}' not found in .dec file!"
-            ) from None
+        return self._decay_modes_index
 
     def list_decay_modes(self, mother: str, pdg_name: bool = False) -> list[list[str]]:
         """
@@ -1292,6 +2049,235 @@ All but the first occurrence(s) will be discarded/removed ...""".format(
         return repr(self)
 
 
+_BUNDLED_DEC_FILES = {"LHCB": "DECAY_LHCB.DEC", "BELLE2": "DECAY_BELLE2.DEC"}
+
+# Version of the snapshot format, to be changed with the snapshot content
+_SNAPSHOT_FORMAT = 2
+
+# Methods of DecFileParser returning the tables stored in snapshots
+_SNAPSHOT_TABLES = (
+    "_dict_raw_model_aliases",
+    "dict_aliases",
+    "dict_charge_conjugates",
+    "dict_decays2copy",
+    "dict_definitions",
+    "dict_jetset_definitions",
+    "dict_lineshape_settings",
+    "dict_model_aliases",
+    "dict_pythia_definitions",
+    "get_particle_property_definitions",
+    "list_charge_conjugate_decays",
+    "list_decay_mother_names",
+    "list_lineshapePW_definitions",
+)
+
+
+def _snapshot_directory(cache_dir: str | os.PathLike[str] | None) -> Path:
+    if cache_dir is not None:
+        return Path(cache_dir)
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "decaylanguage"
+
+
+def _snapshot_key(filename: str) -> str:
+    """
+    Key of the snapshot of a bundled decay file, changing with the package
+    version, the versions of the dependencies whose objects are stored,
+    the decay file and the grammar.
+    """
+    versions = (_SNAPSHOT_FORMAT, version, lark_version, particle_version)
+    digest = hashlib.sha256("\0".join(map(str, (*versions, ""))).encode())
+    digest.update(data.basepath.joinpath(filename).read_bytes())
+    digest.update(data.basepath.joinpath("decfile.lark").read_bytes())
+    return digest.hexdigest()
+
+
+def _snapshot_encode(obj: Any) -> Any:
+    """
+    JSON-compatible form of a value stored in snapshots, tagging the values
+    JSON has no type for: trees, tokens, spans, tuples and dictionaries
+    (whose keys are not all strings).
+    """
+    if isinstance(obj, Tree):
+        return {"tree": [_snapshot_encode(obj.data), _snapshot_encode(obj.children)]}
+    if isinstance(obj, Token):
+        return {
+            "token": [
+                obj.type,
+                obj.value,
+                obj.start_pos,
+                obj.line,
+                obj.column,
+                obj.end_line,
+                obj.end_column,
+                obj.end_pos,
+            ]
+        }
+    if isinstance(obj, SourceSpan):
+        return {"span": list(obj)}
+    if isinstance(obj, tuple):
+        return {"tuple": _snapshot_encode(list(obj))}
+    if isinstance(obj, dict):
+        return {
+            "dict": [[_snapshot_encode(k), _snapshot_encode(v)] for k, v in obj.items()]
+        }
+    if isinstance(obj, list):
+        return [_snapshot_encode(item) for item in obj]
+    if obj is None or isinstance(obj, (str, int, float)):
+        return obj
+    raise TypeError(f"Cannot store a {type(obj).__name__} in a snapshot!")
+
+
+def _snapshot_decode(obj: Any) -> Any:
+    """Value stored in a snapshot, from its JSON-compatible form."""
+    if isinstance(obj, list):
+        return [_snapshot_decode(item) for item in obj]
+    if not isinstance(obj, dict):
+        return obj
+    ((tag, value),) = obj.items()
+    if tag == "tree":
+        return Tree(_snapshot_decode(value[0]), _snapshot_decode(value[1]))
+    if tag == "token":
+        return Token(*value)
+    if tag == "span":
+        return SourceSpan(*value)
+    if tag == "tuple":
+        return tuple(_snapshot_decode(value))
+    if tag == "dict":
+        return {_snapshot_decode(k): _snapshot_decode(v) for k, v in value}
+    raise ValueError(f"Unknown value {tag!r} in snapshot!")
+
+
+class _DecFileSnapshot:
+    """
+    Pre-parsed decay file, holding the tables and decays of a parsed
+    ``DecFileParser``, used as the base of parsers, see ``DecFileParser.from_bundled``.
+
+    Snapshots are stored as JSON rather than pickled, so that loading a snapshot
+    from the cache directory, possibly written by others, cannot execute code.
+    The decays are stored encoded, one by one, and only decoded when used.
+    A snapshot failing to decode, e.g. a partial file, is dropped and replaced
+    by the decay file parsed anew.
+    """
+
+    __slots__ = ("_decays", "_encoded", "_filename", "_path", "_photos", "_tables")
+
+    _additional_decay_models = None
+
+    def __init__(self, filename: str, path: Path) -> None:
+        """
+        Snapshot of a bundled decay file, loaded from the given path if saved,
+        else from the parsed file, saving it.
+        """
+        self._filename = filename
+        self._path = path
+        # Encoded decay Tree, decay span and decay mode spans, by mother particle
+        self._encoded: dict[str, str] = {}
+        self._decays: dict[str, tuple[Tree[Any], SourceSpan, list[SourceSpan]]] = {}
+        try:
+            with path.open(encoding="utf-8") as file:
+                state = json.load(file)
+            self._tables = _snapshot_decode(state["tables"])
+            self._photos = PhotosEnum(state["photos"])
+            self._encoded = state["decays"]
+        except Exception:  # noqa: BLE001
+            # Missing, partial or otherwise unreadable snapshot
+            self._reparse()
+
+    def _reparse(self) -> None:
+        """Replace the content of the snapshot with the decay file parsed anew."""
+        parser = DecFileParser(str(data.basepath / self._filename))
+        parser.parse(diagnostics=[])
+        self._tables = {
+            method: getattr(parser, method)() for method in _SNAPSHOT_TABLES
+        }
+        self._photos = PhotosEnum(parser.global_photos_flag())
+        self._encoded = {
+            mother: json.dumps(
+                _snapshot_encode(
+                    (
+                        parser._find_decay(mother),
+                        parser.decay_span(mother),
+                        parser.decay_mode_spans(mother),
+                    )
+                )
+            )
+            for mother in self._tables["list_decay_mother_names"]
+        }
+        self._decays.clear()
+
+        state = {
+            "tables": _snapshot_encode(self._tables),
+            "photos": int(self._photos),
+            "decays": self._encoded,
+        }
+        # Write then rename, so that concurrent processes never read partial files
+        path = self._path
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp.open("w", encoding="utf-8") as file:
+                json.dump(state, file)
+            tmp.replace(path)
+        except OSError:
+            # Read-only cache directory, the snapshot is only kept in memory
+            tmp.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, filename: str, directory: Path, key: str) -> _DecFileSnapshot:
+        """
+        Load the snapshot of a bundled decay file with the given key,
+        shared within the process.
+        """
+        if key not in _SNAPSHOTS:
+            path = directory / f"{Path(filename).stem}-{key[:16]}.json"
+            _SNAPSHOTS[key] = cls(filename, path)
+        return _SNAPSHOTS[key]
+
+    def _check_parsing(self) -> None:
+        """A snapshot is always parsed."""
+
+    def _table(self, method: str) -> Any:
+        return self._tables[method]
+
+    def _decay(self, mother: str) -> tuple[Tree[Any], SourceSpan, list[SourceSpan]]:
+        if mother not in self._decays:
+            if mother not in self._encoded:
+                raise DecayNotFound(
+                    f"Decays of particle '{mother}' not found in .dec file!"
+                )
+            try:
+                self._decays[mother] = _snapshot_decode(
+                    json.loads(self._encoded[mother])
+                )
+            except Exception:  # noqa: BLE001
+                # Corrupted snapshot, freshly encoded decays do decode
+                self._reparse()
+                self._decays[mother] = _snapshot_decode(
+                    json.loads(self._encoded[mother])
+                )
+        return self._decays[mother]
+
+    def _find_decay(self, mother: str) -> Tree[Any]:
+        return self._decay(mother)[0]
+
+    def _find_decay_modes(self, mother: str) -> tuple[Any, ...]:
+        return tuple(self._decay(mother)[0].find_data("decayline"))
+
+    def decay_span(self, mother: str) -> SourceSpan:
+        return self._decay(mother)[1]
+
+    def decay_mode_spans(self, mother: str) -> list[SourceSpan]:
+        return list(self._decay(mother)[2])
+
+    def global_photos_flag(self) -> int:
+        return self._photos
+
+
+# Snapshots loaded in this process, by key
+_SNAPSHOTS: dict[str, _DecFileSnapshot] = {}
+
+
 class DecayModelAliasReplacement(Transformer):  # type: ignore[misc]
     """
     Lark Transformer implementing the replacement of decay model aliases
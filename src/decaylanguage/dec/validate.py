@@ -7,17 +7,33 @@
 
 from __future__ import annotations
 
+import abc
 import argparse
+import contextlib
+import functools
+import hashlib
+import json
 import os
-import re
 import sys
-import warnings
+import time
+import tracemalloc
+import typing
 from collections import Counter
-from collections.abc import Iterable, Sequence
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+from fractions import Fraction
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from .dec import DecFileParser, DecFileWarning
+from .. import data
+from .._version import version
+
+# The parser and the particle tables are only imported when validating files,
+# as importing them is costly, hence e.g. --help is fast
+if TYPE_CHECKING:
+    from .dec import DecFileDiagnostic, DecFileParser, SourceIndex
 
 
 @dataclass(frozen=True)
@@ -50,6 +66,26 @@ class Diagnostic:
     source_line: str | None = None
 
 
+@dataclass(frozen=True)
+class FileResult:
+    """
+    Outcome of the validation of one EvtGen ``.dec`` decay file:
+    its diagnostics, the validation wall time in seconds and peak memory in bytes,
+    if traced, and the numbers of decays and decay modes, if parsed.
+    Results served from cache only hold diagnostics.
+
+    Helper class meant for internal use.
+    """
+
+    path: Path
+    diagnostics: list[Diagnostic]
+    time: float | None = None
+    decays: int | None = None
+    modes: int | None = None
+    peak_memory: int | None = None
+    cached: bool = False
+
+
 # The available validation diagnostic rules
 
 DLP001 = DiagnosticRule(
@@ -93,6 +129,32 @@ DLW999 = DiagnosticRule(
     "An otherwise unclassified warning emitted by DecFileParser.",
 )
 
+DLS001 = DiagnosticRule(
+    "DLS001",
+    "bf-sum",
+    "The branching fractions of a Decay block do not sum to 1 (within 1%).",
+)
+DLS002 = DiagnosticRule(
+    "DLS002",
+    "undefined-daughter",
+    "A daughter particle has no Decay block and is not stable.",
+)
+DLS003 = DiagnosticRule(
+    "DLS003",
+    "unused-alias",
+    "An alias is never used in decays.",
+)
+DLS004 = DiagnosticRule(
+    "DLS004",
+    "charge-violation",
+    "A decay mode does not conserve electric charge.",
+)
+DLS005 = DiagnosticRule(
+    "DLS005",
+    "unknown-particle",
+    "A particle is neither an alias nor known to the particle package.",
+)
+
 DIAGNOSTIC_RULES = (
     DLP001,
     DLW001,
@@ -102,10 +164,36 @@ DIAGNOSTIC_RULES = (
     DLW005,
     DLW006,
     DLW999,
+    DLS001,
+    DLS002,
+    DLS003,
+    DLS004,
+    DLS005,
 )
 _RULES_BY_CODE = {rule.code: rule for rule in DIAGNOSTIC_RULES}
+# Compact, stable diagnostic messages, given the particle names involved
+_MESSAGES = {
+    DLW001.code: "duplicate Decay block(s): {}; later definitions ignored",
+    DLW002.code: "duplicate CDecay statement(s): {}; later statements ignored",
+    DLW003.code: "both Decay and CDecay defined: {}; CDecay ignored",
+    DLW004.code: "missing Decay source for CDecay: {}",
+    DLW005.code: "CDecay targets self-conjugate particle: {}",
+    DLW006.code: "missing Decay source for CopyDecay: {}",
+}
 _DEFAULT_MAX_DIAGNOSTICS = 100
 
+_DEFAULT_WATCH_INTERVAL = 0.5
+# Tolerance on the sum of the branching fractions of a Decay block
+_BF_SUM_TOLERANCE = 0.01
+# Minimum c*tau, in meters, of the particles left to the detector simulation
+_STABLE_CTAU = 1
+# EvtGen placeholders for partons in PYTHIA decay modes
+_PSEUDO_PARTICLES = frozenset(
+    ("rndmflav", "anti-rndmflav", "specflav", "anti-specflav")
+)
+# Pythia 8 particle data settings, "<ID>:<SETTING>=<NAME>", that name a particle
+_PYTHIA_NAME_SETTINGS = frozenset(("name", "antiname", "new", "all"))
+
 
 class Style:
     """
@@ -140,19 +228,341 @@ def validate_files(
     *,
     ignore: Iterable[str] = (),
     additional_decay_models: Iterable[str] = (),
+    jobs: int = 1,
+    cache_dir: str | os.PathLike[str] | None = None,
+    semantic: bool = False,
 ) -> list[Diagnostic]:
-    """Validate EvtGen ``.dec`` decay files and return non-ignored diagnostics."""
+    """
+    Validate EvtGen ``.dec`` decay files and return non-ignored diagnostics.
+
+    With ``jobs`` other than 1, files are validated in a pool of ``jobs`` processes,
+    or as many as CPUs if ``jobs`` is 0. Diagnostics are always returned in file order.
+
+    With a ``cache_dir``, the diagnostics of every file are stored in that directory,
+    keyed on the file content, the decaylanguage version, the grammar and
+    the validation settings, so that unchanged files are not parsed again.
 
+    With ``semantic``, the decays defined in the files are also checked
+    for physics consistency, see the ``DLS`` diagnostics.
+    """
+    return _validate_files(
+        paths,
+        ignore=ignore,
+        additional_decay_models=additional_decay_models,
+        jobs=jobs,
+        cache_dir=cache_dir,
+        semantic=semantic,
+    )[0]
+
+
+def _validate_files(
+    paths: Iterable[Path],
+    *,
+    ignore: Iterable[str] = (),
+    additional_decay_models: Iterable[str] = (),
+    jobs: int = 1,
+    cache_dir: str | os.PathLike[str] | None = None,
+    semantic: bool = False,
+) -> tuple[list[Diagnostic], int]:
+    """
+    Same as ``validate_files``, also returning the number of files served from cache.
+    """
+    results = list(
+        _iter_file_results(
+            paths,
+            ignore=ignore,
+            additional_decay_models=additional_decay_models,
+            jobs=jobs,
+            cache_dir=cache_dir,
+            semantic=semantic,
+        )
+    )
+    diagnostics = [d for result in results for d in result.diagnostics]
+    return diagnostics, sum(result.cached for result in results)
+
+
+def _iter_file_results(
+    paths: Iterable[Path],
+    *,
+    ignore: Iterable[str] = (),
+    additional_decay_models: Iterable[str] = (),
+    jobs: int = 1,
+    cache_dir: str | os.PathLike[str] | None = None,
+    semantic: bool = False,
+    trace_memory: bool = False,
+) -> Iterator[FileResult]:
+    """
+    Validate decay files as ``validate_files``, yielding the result of every file,
+    with its non-ignored diagnostics, in file order as soon as it is available.
+
+    With ``trace_memory``, the peak memory allocated while validating every file
+    is traced with ``tracemalloc``, which slows down the validation severalfold.
+    """
+
+    if jobs < 0:
+        raise ValueError(f"jobs must be non-negative, not {jobs}!")
     ignored = tuple(ignore)
     additional_models = tuple(additional_decay_models)
-    diagnostics: list[Diagnostic] = []
-    for path in _iter_decay_files(paths):
-        diagnostics.extend(
-            diagnostic
-            for diagnostic in _validate_file(path, additional_models)
-            if not _is_ignored(diagnostic.code, ignored)
+    files = list(_iter_decay_files(paths))
+
+    cached: list[list[Diagnostic] | None] = [None] * len(files)
+    keys: list[str | None] = [None] * len(files)
+    cache = None
+    if cache_dir is not None:
+        cache = _ResultCache(cache_dir, additional_models, semantic)
+        for i, path in enumerate(files):
+            keys[i] = cache.key(path)
+            cached[i] = cache.load(keys[i], path)
+    todo = [files[i] for i, diagnostics in enumerate(cached) if diagnostics is None]
+
+    validate = functools.partial(
+        _validate_file,
+        additional_decay_models=additional_models,
+        semantic=semantic,
+        trace_memory=trace_memory,
+    )
+    workers = min(jobs or os.cpu_count() or 1, len(todo))
+    with contextlib.ExitStack() as stack:
+        new_results: Iterator[FileResult]
+        if workers > 1:
+            pool = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_warm_up_worker,
+                    initargs=(additional_models,),
+                )
+            )
+            # Results come in file order, whatever the completion order
+            new_results = pool.map(
+                validate, todo, chunksize=max(1, len(todo) // (8 * workers))
+            )
+        else:
+            new_results = map(validate, todo)
+
+        for key, path, diagnostics in zip(keys, files, cached, strict=True):
+            if diagnostics is None:
+                result = next(new_results)
+                if cache is not None:
+                    cache.store(key, result.diagnostics)
+            else:
+                result = FileResult(path, diagnostics, cached=True)
+            yield replace(
+                result,
+                diagnostics=[
+                    diagnostic
+                    for diagnostic in result.diagnostics
+                    if not _is_ignored(diagnostic.code, ignored)
+                ],
+            )
+
+
+class _ResultCache:
+    """
+    On-disk cache of the diagnostics of validated files, one JSON file per entry.
+
+    Entries hold all the diagnostics of a file, ignored codes being filtered out
+    after loading, so that changing ``--ignore`` does not invalidate the cache.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        additional_decay_models: Sequence[str],
+        semantic: bool,
+    ) -> None:
+        from lark import __version__ as lark_version  # noqa: PLC0415
+        from particle import __version__ as particle_version  # noqa: PLC0415
+
+        self.directory = Path(directory)
+        # The diagnostics also depend on the grammar and on the particle tables
+        settings = [
+            version,
+            lark_version,
+            particle_version,
+            hashlib.sha256(
+                data.basepath.joinpath("decfile.lark").read_bytes()
+            ).hexdigest(),
+            sorted(set(additional_decay_models)),
+            semantic,
+        ]
+        self._settings = json.dumps(settings).encode()
+
+    def key(self, path: Path) -> str | None:
+        """Key of the file at the path, None if it cannot be read."""
+        try:
+            content = path.read_bytes()
+        except OSError:
+            return None
+        return hashlib.sha256(self._settings + b"\0" + content).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def load(self, key: str | None, path: Path) -> list[Diagnostic] | None:
+        """Cached diagnostics of the file at the path, None if not (validly) cached."""
+        if key is None:
+            return None
+        try:
+            entries = json.loads(self._entry(key).read_text(encoding="utf-8"))
+            # Entries do not depend on the file location, only on its content
+            return [Diagnostic(path=path, **entry) for entry in entries]
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def store(self, key: str | None, diagnostics: Sequence[Diagnostic]) -> None:
+        if key is None:
+            return
+        entries = [_diagnostic_record(d) for d in diagnostics]
+        entry = self._entry(key)
+        # Write then rename, so that concurrent runs never read partial entries
+        tmp = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(entries), encoding="utf-8")
+            tmp.replace(entry)
+        except OSError:
+            # Read-only, full or otherwise unwritable cache directory, not cached
+            with contextlib.suppress(OSError):
+                tmp.unlink(missing_ok=True)
+
+
+def _diagnostic_record(diagnostic: Diagnostic) -> dict[str, Any]:
+    """Fields of a diagnostic other than its path, JSON-serializable."""
+    return {
+        f.name: getattr(diagnostic, f.name)
+        for f in fields(diagnostic)
+        if f.name != "path"
+    }
+
+
+class _ResultWriter(abc.ABC):
+    """
+    Writer of the results of validated files to a stream in a machine-readable
+    format, every result being written as soon as it is available.
+    """
+
+    def __init__(self, stream: typing.TextIO) -> None:
+        self.stream = stream
+        self.count = 0
+
+    def write(self, result: FileResult) -> None:
+        self._write(result)
+        self.count += 1
+        self.stream.flush()
+
+    @abc.abstractmethod
+    def _write(self, result: FileResult) -> None:
+        """Write the result of a validated file."""
+
+    def close(self) -> None:  # noqa: B027
+        """Complete the output, if needed by the format."""
+
+    @staticmethod
+    def _record(result: FileResult) -> dict[str, Any]:
+        return {
+            "path": str(result.path),
+            "diagnostics": [_diagnostic_record(d) for d in result.diagnostics],
+            "time": result.time,
+            "decays": result.decays,
+            "modes": result.modes,
+            "peak_memory": result.peak_memory,
+            "cached": result.cached,
+        }
+
+
+class _NdjsonWriter(_ResultWriter):
+    """One JSON record per line and per file."""
+
+    def _write(self, result: FileResult) -> None:
+        self.stream.write(json.dumps(self._record(result)) + "\n")
+
+
+class _JsonWriter(_ResultWriter):
+    """A JSON array of the records of the files."""
+
+    def _write(self, result: FileResult) -> None:
+        self.stream.write(",\n" if self.count else "[\n")
+        self.stream.write(json.dumps(self._record(result)))
+
+    def close(self) -> None:
+        self.stream.write("\n]\n" if self.count else "[]\n")
+
+
+class _SarifWriter(_ResultWriter):
+    """
+    A SARIF 2.1.0 log, with a result per diagnostic and the statistics
+    of the validation of every file as properties of its artifact.
+    """
+
+    def __init__(self, stream: typing.TextIO) -> None:
+        super().__init__(stream)
+        self._artifacts: list[dict[str, Any]] = []
+        self._results = 0
+        tool = {
+            "driver": {
+                "name": "decaylanguage-validate",
+                "version": version,
+                "informationUri": "https://github.com/scikit-hep/decaylanguage",
+                "rules": [
+                    {
+                        "id": rule.code,
+                        "name": rule.name,
+                        "shortDescription": {"text": rule.description},
+                    }
+                    for rule in DIAGNOSTIC_RULES
+                ],
+            }
+        }
+        self.stream.write(
+            '{"$schema": "https://json.schemastore.org/sarif-2.1.0.json", '
+            f'"version": "2.1.0", "runs": [{{"tool": {json.dumps(tool)}, '
+            '"results": ['
         )
-    return diagnostics
+
+    def _write(self, result: FileResult) -> None:
+        uri = (
+            result.path.as_uri()
+            if result.path.is_absolute()
+            else result.path.as_posix()
+        )
+        for diagnostic in result.diagnostics:
+            location: dict[str, Any] = {"artifactLocation": {"uri": uri}}
+            if diagnostic.line is not None:
+                location["region"] = {"startLine": diagnostic.line}
+                if diagnostic.column is not None:
+                    location["region"]["startColumn"] = diagnostic.column
+            record = {
+                "ruleId": diagnostic.code,
+                "level": "error" if diagnostic.code == DLP001.code else "warning",
+                "message": {"text": diagnostic.message},
+                "locations": [{"physicalLocation": location}],
+            }
+            self.stream.write(",\n" if self._results else "\n")
+            self.stream.write(json.dumps(record))
+            self._results += 1
+        record = self._record(result)
+        del record["path"], record["diagnostics"]
+        self._artifacts.append({"location": {"uri": uri}, "properties": record})
+
+    def close(self) -> None:
+        self.stream.write(f'], "artifacts": {json.dumps(self._artifacts)}}}]}}\n')
+
+
+_WRITERS: dict[str, type[_ResultWriter]] = {
+    "json": _JsonWriter,
+    "ndjson": _NdjsonWriter,
+    "sarif": _SarifWriter,
+}
+
+
+def _warm_up_worker(additional_decay_models: Sequence[str]) -> None:
+    # Build the (cached) Lark parser once per worker process, up front,
+    # rather than when validating the first file.
+    from .dec import DecFileParser  # noqa: PLC0415
+
+    parser = DecFileParser.from_string("End\n")
+    parser.load_additional_decay_models(*additional_decay_models)
+    parser.parse(diagnostics=[])
 
 
 def _iter_decay_files(paths: Iterable[Path]) -> Iterable[Path]:
@@ -168,7 +578,50 @@ def _iter_decay_files(paths: Iterable[Path]) -> Iterable[Path]:
 def _validate_file(
     path: Path,
     additional_decay_models: Iterable[str],
-) -> list[Diagnostic]:
+    semantic: bool = False,
+    statements: dict[str, list[Any]] | None = None,
+    trace_memory: bool = False,
+) -> FileResult:
+    start = time.perf_counter()
+    if trace_memory:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    try:
+        diagnostics, parser = _check_file(
+            path, additional_decay_models, semantic, statements
+        )
+        peak_memory = None
+        if trace_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        if trace_memory and started:
+            tracemalloc.stop()
+    elapsed = time.perf_counter() - start
+
+    result = FileResult(path, diagnostics, time=elapsed, peak_memory=peak_memory)
+    if parser is None:
+        return result
+    decays = parser._parsed_decays or []
+    return replace(
+        result,
+        decays=len(decays),
+        modes=sum(len(decay.children) - 1 for decay in decays),
+    )
+
+
+def _check_file(
+    path: Path,
+    additional_decay_models: Iterable[str],
+    semantic: bool,
+    statements: dict[str, list[Any]] | None,
+) -> tuple[list[Diagnostic], DecFileParser | None]:
+    """Diagnostics of a decay file, with its parser if parsed."""
+    from .dec import DecFileParser  # noqa: PLC0415
+
     if not path.is_file():
         return [
             Diagnostic(
@@ -177,32 +630,339 @@ def _validate_file(
                 path=path,
                 message="file does not exist or is not a regular file",
             )
-        ]
-    caught_warnings: list[warnings.WarningMessage]
+        ], None
+    # DecFileParser collects recoverable validation issues in the sink,
+    # rather than as (process-global) warnings.
+    records: list[DecFileDiagnostic] = []
     try:
-        # DecFileParser reports recoverable validation issues as warnings.
-        with warnings.catch_warnings(record=True) as caught_warnings:
-            warnings.simplefilter("always")
-            parser = DecFileParser(path)
-            parser.load_additional_decay_models(*additional_decay_models)
-            parser.parse()
+        parser = DecFileParser(path)
     except Exception as exc:  # noqa: BLE001
-        return [_diagnostic_from_exception(path, exc)]
+        return [_diagnostic_from_exception(path, exc)], None
+    # Only the statements not in the cache of parsed statements, if any, are parsed
+    parser._statement_cache = statements
+    try:
+        parser.load_additional_decay_models(*additional_decay_models)
+        parser.parse(diagnostics=records, recover=True)
+    except Exception as exc:  # noqa: BLE001
+        return [_diagnostic_from_exception(path, exc, parser.source_index)], None
+
+    diagnostics = [
+        _diagnostic_from_record(path, record, parser.source_index) for record in records
+    ]
+    if semantic:
+        diagnostics += _semantic_diagnostics(path, parser)
+    return diagnostics, parser
 
-    return [_diagnostic_from_warning(path, warning) for warning in caught_warnings]
 
+class _Watcher:
+    """
+    Validation of decay files kept up to date as they are edited, polling
+    the modification times and sizes of the files rather than relying on
+    file system notifications.
 
-def _diagnostic_from_exception(path: Path, exc: Exception) -> Diagnostic:
+    Files are validated again only if changed, and only their statements
+    changed since the previous validation are parsed again.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[Path],
+        *,
+        ignore: Iterable[str] = (),
+        additional_decay_models: Iterable[str] = (),
+        semantic: bool = False,
+    ) -> None:
+        self.paths = list(paths)
+        self._ignored = tuple(ignore)
+        self._additional_models = tuple(additional_decay_models)
+        self._semantic = semantic
+        # Modification time and size of every file at its last validation
+        self._stamps: dict[Path, tuple[int, int] | None] = {}
+        self._statements: dict[Path, dict[str, list[Any]]] = {}
+
+    @property
+    def files(self) -> list[Path]:
+        """Files found at the last poll."""
+        return list(self._stamps)
+
+    def poll(self) -> dict[Path, list[Diagnostic]]:
+        """
+        Validate the files new or changed since the previous poll,
+        returning their non-ignored diagnostics.
+        """
+        changed: dict[Path, list[Diagnostic]] = {}
+        stamps: dict[Path, tuple[int, int] | None] = {}
+        for path in _iter_decay_files(self.paths):
+            try:
+                stat = path.stat()
+                stamps[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamps[path] = None
+            if path in self._stamps and self._stamps[path] == stamps[path]:
+                continue
+            diagnostics = _validate_file(
+                path,
+                self._additional_models,
+                self._semantic,
+                self._statements.setdefault(path, {}),
+            ).diagnostics
+            changed[path] = [
+                d for d in diagnostics if not _is_ignored(d.code, self._ignored)
+            ]
+        # Forget the files removed from the watched directories
+        for path in self._stamps.keys() - stamps.keys():
+            self._statements.pop(path, None)
+        self._stamps = stamps
+        return changed
+
+
+def _watch(
+    watcher: _Watcher,
+    *,
+    interval: float,
+    color: str,
+    max_diagnostics: int,
+    polls: int | None = None,
+) -> None:
+    """
+    Print the diagnostics of the watched files whenever they change,
+    polling every ``interval`` seconds, ``polls`` times or until interrupted.
+    """
+    style = Style(_use_color(color))
+    count = 0
+    while polls is None or count < polls:
+        if count:
+            time.sleep(interval)
+        start = time.perf_counter()
+        changed = watcher.poll()
+        elapsed = time.perf_counter() - start
+        for path, diagnostics in changed.items():
+            _print_diagnostics(
+                diagnostics,
+                files=[path],
+                show_ok=True,
+                color=color,
+                max_diagnostics=max_diagnostics,
+            )
+        if changed:
+            sys.stderr.write(
+                style.muted(
+                    f"watch: validated {len(changed)} file(s) in "
+                    f"{elapsed * 1000:.0f} ms; "
+                    f"watching {len(watcher.files)} file(s), press Ctrl+C to stop"
+                )
+                + "\n"
+            )
+        count += 1
+
+
+@cache
+def _particle_properties(name: str) -> tuple[int | None, bool] | None:
+    """
+    Three times the charge of a particle, if defined, and whether it is
+    long-lived enough not to need a Decay block, None if the particle is unknown.
+    """
+    from hepunits import meter  # noqa: PLC0415
+    from particle import Particle  # noqa: PLC0415
+
+    if name in _PSEUDO_PARTICLES:
+        return None, True
+    try:
+        particle = Particle.from_evtgen_name(name)
+    except Exception:  # noqa: BLE001
+        # EvtGen names without PDG table entry, e.g. Xsd or X_1(3872),
+        # are known, with unknown charge and lifetime
+        return (None, True) if _is_evtgen_name(name) else None
+    ctau = particle.ctau
+    return particle.three_charge, ctau is None or ctau >= _STABLE_CTAU * meter
+
+
+def _is_evtgen_name(name: str) -> bool:
+    """Whether the name is a known EvtGen particle name."""
+    from particle.converters.evtgen import EvtGenName2PDGIDBiMap  # noqa: PLC0415
+
+    try:
+        EvtGenName2PDGIDBiMap[name]
+    except Exception:  # noqa: BLE001
+        return False
+    return True
+
+
+def _semantic_diagnostics(path: Path, parser: DecFileParser) -> list[Diagnostic]:
+    """
+    Check the decays defined in a parsed decay file for physics consistency.
+
+    The checks run over a flat table of the decay modes of the Decay blocks
+    of the file, built in one pass over the top-level statements, with cached
+    particle lookups. Decays created from CDecay and CopyDecay statements
+    only mirror these, hence are not checked again.
+    """
+    from .dec import get_decay_mother_name  # noqa: PLC0415
+
+    index = parser.source_index
+    assert parser._parsed_dec_file is not None
+    assert parser._parsed_decays is not None
+    # Top-level statements, rather than searching the whole parse tree
+    statements = parser._parsed_dec_file.children
+    aliases = {
+        str(statement.children[0]): str(statement.children[1])
+        for statement in statements
+        if statement.data == "alias"
+    }
+
+    # Names declared in the file, known whatever the particle tables say
+    declared = {
+        *aliases,
+        *parser.get_particle_property_definitions(),
+        *(
+            value
+            for commands in parser.dict_pythia_definitions().values()
+            for key, value in commands.items()
+            if isinstance(value, str)
+            and key.partition(":")[2].lower() in _PYTHIA_NAME_SETTINGS
+        ),
+    }
+
+    # Decay trees as used by the parser (first definitions),
+    # and mothers of the Decay blocks of the file
+    decays: dict[str, Any] = {}
+    for decay in parser._parsed_decays:
+        decays.setdefault(get_decay_mother_name(decay), decay)
+    defined = dict.fromkeys(
+        get_decay_mother_name(statement)
+        for statement in statements
+        if statement.data == "decay"
+    )
+
+    # The table of decay modes: mother, decay mode tree, BF and daughters
+    table = [
+        (
+            mother,
+            mode,
+            float(mode.children[0].children[0].value),
+            [c.children[0].value for c in mode.children[1:] if c.data == "particle"],
+        )
+        for mother in defined
+        for mode in decays[mother].children[1:]
+    ]
+
+    diagnostics: list[Diagnostic] = []
+
+    def report(rule: DiagnosticRule, message: str, offset: int | None = None) -> None:
+        line = source_line = None
+        if offset is not None and index is not None:
+            concatenated_line = index.line_of(offset)
+            line = index.locate_line(concatenated_line)[1]
+            source_line = index.line_text(concatenated_line)
+        diagnostics.append(
+            Diagnostic(
+                code=rule.code,
+                name=rule.name,
+                path=path,
+                message=message,
+                line=line,
+                source_line=source_line,
+            )
+        )
+
+    def mode_offset(mode: Any) -> int | None:
+        return getattr(mode.children[0].children[0], "start_pos", None)
+
+    def mother_offset(mother: str) -> int | None:
+        return getattr(decays[mother].children[0].children[0], "start_pos", None)
+
+    bf_sums = dict.fromkeys(defined, 0.0)
+    used = set(decays)
+    for statement in statements:
+        if statement.data == "copydecay":
+            used.update(str(label.children[0]) for label in statement.children)
+        elif statement.data in ("chargeconj", "cdecay"):
+            used.update(map(str, statement.children))
+        elif statement.data == "alias":
+            # An alias of an alias uses the latter
+            used.add(str(statement.children[1]))
+    first_uses: dict[str, Any] = {}
+    for mother, mode, bf, daughters in table:
+        bf_sums[mother] += bf
+        used.update(daughters)
+        for daughter in daughters:
+            first_uses.setdefault(daughter, mode)
+
+    for mother, total in bf_sums.items():
+        if abs(total - 1) > _BF_SUM_TOLERANCE:
+            report(
+                DLS001,
+                f"branching fractions of {mother} sum to {total:.6g}",
+                mother_offset(mother),
+            )
+
+    # Unknown particles, reported once, at their Decay block or first use
+    for name in dict.fromkeys([*defined, *first_uses]):
+        if name not in declared and _particle_properties(name) is None:
+            report(
+                DLS005,
+                f"unknown particle: {name}",
+                mother_offset(name)
+                if name in defined
+                else mode_offset(first_uses[name]),
+            )
+
+    for name, mode in first_uses.items():
+        properties = _particle_properties(aliases.get(name, name))
+        if (
+            properties is not None
+            and not properties[1]
+            and name not in decays
+            and aliases.get(name, name) not in decays
+        ):
+            report(
+                DLS002,
+                f"no Decay block for unstable daughter: {name}",
+                mode_offset(mode),
+            )
+
+    for mother, mode, _, daughters in table:
+        # Decay modes without daughters, e.g. generic PYTHIA ones, cannot be checked
+        if not daughters:
+            continue
+        charges = [
+            _particle_properties(aliases.get(name, name))
+            for name in (mother, *daughters)
+        ]
+        three_charges = [c[0] if c is not None else None for c in charges]
+        if None in three_charges:
+            continue
+        initial, *final = typing.cast(list[int], three_charges)
+        if initial != sum(final):
+            report(
+                DLS004,
+                f"charge not conserved in {mother} -> {' '.join(daughters)}: "
+                f"{Fraction(initial, 3)} != {Fraction(sum(final), 3)}",
+                mode_offset(mode),
+            )
+
+    for statement in statements:
+        if statement.data == "alias" and statement.children[0] not in used:
+            alias = statement.children[0]
+            report(
+                DLS003,
+                f"alias never used: {alias}",
+                getattr(alias, "start_pos", None),
+            )
+
+    return diagnostics
+
+
+def _diagnostic_from_exception(
+    path: Path, exc: Exception, index: SourceIndex | None = None
+) -> Diagnostic:
     line = getattr(exc, "line", None)
     column = getattr(exc, "column", None)
     source_line = None
-    if isinstance(line, int):
-        try:
-            # Keep parse-error output useful even when the parser gives only
-            # location attributes on the exception.
-            source_line = path.read_text(encoding="utf_8").splitlines()[line - 1]
-        except Exception:  # noqa: BLE001
-            source_line = None
+    if isinstance(line, int) and index is not None and line > 0:
+        # Map the location in the parsed input back to the file
+        source_line = index.line_text(line)
+        line = index.locate_line(line)[1]
 
     message_lines = str(exc).strip().splitlines()
     message = exc.__class__.__name__
@@ -220,68 +980,28 @@ def _diagnostic_from_exception(path: Path, exc: Exception) -> Diagnostic:
     )
 
 
-def _diagnostic_from_warning(
-    path: Path,
-    warning: warnings.WarningMessage,
+def _diagnostic_from_record(
+    path: Path, record: DecFileDiagnostic, index: SourceIndex | None
 ) -> Diagnostic:
-    message = _normalize_warning_message(warning)
-    category = warning.category
-    code = category.code if issubclass(category, DecFileWarning) else DLW999.code
-    rule = _RULES_BY_CODE.get(code, DLW999)
+    rule = _RULES_BY_CODE.get(record.code or DLW999.code, DLW999)
+    if rule.code in _MESSAGES and record.particles:
+        message = _MESSAGES[rule.code].format(", ".join(record.particles))
+    else:
+        message = " ".join(record.message.split())
+    line = record.line
     return Diagnostic(
         code=rule.code,
         name=rule.name,
         path=path,
-        message=_compact_warning_message(rule, message),
+        message=message,
+        line=line,
+        column=record.column,
+        source_line=index.source_line(record.file, line)
+        if index is not None and record.file is not None and line is not None
+        else None,
     )
 
 
-def _normalize_warning_message(warning: warnings.WarningMessage) -> str:
-    return " ".join(str(warning.message).split())
-
-
-def _compact_warning_message(rule: DiagnosticRule, message: str) -> str:
-    # Warning text from DecFileParser is user-facing but verbose; keep the
-    # diagnostic stable by extracting only the particle names we need.
-    if rule is DLW001:
-        particles = _search_message(message, r"with 'Decay': (?P<particles>.*?)!")
-        if particles is not None:
-            return f"duplicate Decay block(s): {particles}; later definitions ignored"
-    if rule is DLW002:
-        particles = _search_message(message, r"with 'CDecay': (?P<particles>.*?)!")
-        if particles is not None:
-            return (
-                f"duplicate CDecay statement(s): {particles}; later statements ignored"
-            )
-    if rule is DLW003:
-        particles = _search_message(message, r"'CDecay': (?P<particles>.*?)!")
-        if particles is not None:
-            return f"both Decay and CDecay defined: {particles}; CDecay ignored"
-    if rule is DLW004:
-        particles = _search_message(message, r"not found: (?P<particles>.*?)\.")
-        if particles is not None:
-            return f"missing Decay source for CDecay: {particles}"
-    if rule is DLW005:
-        particle = _search_message(
-            message,
-            r"self-conjugate particle (?P<particles>.*?)\.",
-        )
-        if particle is not None:
-            return f"CDecay targets self-conjugate particle: {particle}"
-    if rule is DLW006:
-        particles = _search_message(message, r"not found: (?P<particles>.*?)\.")
-        if particles is not None:
-            return f"missing Decay source for CopyDecay: {particles}"
-    return message
-
-
-def _search_message(message: str, pattern: str) -> str | None:
-    match = re.search(pattern, message)
-    if match is None:
-        return None
-    return match.group("particles")
-
-
 def _is_ignored(code: str, ignored: Sequence[str]) -> bool:
     return any(code == item or code.startswith(item) for item in ignored)
 
@@ -389,13 +1109,34 @@ def _display_path(path: Path) -> str:
         return str(path)
 
 
+def _print_slowest(results: Sequence[FileResult], count: int, color: str) -> None:
+    style = Style(_use_color(color))
+    timed = sorted(
+        (result for result in results if result.time is not None),
+        key=lambda result: typing.cast(float, result.time),
+        reverse=True,
+    )[:count]
+    sys.stderr.write(style.bold(f"slowest {len(timed)} file(s):") + "\n")
+    for result in timed:
+        if result.decays is None:
+            details = "not parsed"
+        else:
+            details = f"{result.decays} decays, {result.modes} decay modes"
+        if result.peak_memory is not None:
+            details += f", peak memory {result.peak_memory / 2**20:.1f} MiB"
+        sys.stderr.write(
+            f"{result.time:8.3f} s  {_display_path(result.path)} ({details})\n"
+        )
+
+
 def _print_rules() -> None:
     for rule in DIAGNOSTIC_RULES:
         sys.stdout.write(f"{rule.code} {rule.name}: {rule.description}\n")
 
 
-def parse_args(argv: Sequence[str]) -> argparse.Namespace:
+def parse_args(argv: Sequence[str], prog: str | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
+        prog=prog,
         description="Validate EvtGen decay files with decaylanguage.DecFileParser.",
     )
     parser.add_argument(
@@ -415,6 +1156,11 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
         metavar="NAME",
         help="allow an experiment-specific EvtGen decay model name",
     )
+    parser.add_argument(
+        "--semantic",
+        action="store_true",
+        help="also check the decays for physics consistency (DLS diagnostics)",
+    )
     parser.add_argument(
         "--show-ok",
         action="store_true",
@@ -430,6 +1176,54 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
             "use 0 to print all diagnostics"
         ),
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of files validated in parallel; use 0 for the number of CPUs",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        metavar="DIR",
+        help="cache the diagnostics of every file in this directory, "
+        "so that unchanged files are not validated again",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("text", "json", "ndjson", "sarif"),
+        default="text",
+        help=(
+            "output format; the machine-readable formats are written to stdout "
+            "as every file is validated, with its validation time and statistics"
+        ),
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=0,
+        metavar="N",
+        help="summarise the N files slowest to validate",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="trace the peak memory used to validate every file (much slower)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep watching the files, validating them again whenever they change",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=_DEFAULT_WATCH_INTERVAL,
+        metavar="SECONDS",
+        help="time between checks for changed files in watch mode",
+    )
     parser.add_argument(
         "--color",
         choices=("auto", "always", "never"),
@@ -451,8 +1245,8 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
     return parser.parse_args(argv)
 
 
-def main(argv: Sequence[str] | None = None) -> int:
-    args = parse_args(sys.argv[1:] if argv is None else argv)
+def main(argv: Sequence[str] | None = None, *, prog: str | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv, prog)
     if args.list_diagnostics:
         _print_rules()
         return 0
@@ -462,19 +1256,66 @@ def main(argv: Sequence[str] | None = None) -> int:
     ignored = _validate_ignore_codes(args.ignore)
     if args.max_diagnostics < 0:
         raise SystemExit("--max-diagnostics must be non-negative")
+    if args.jobs < 0:
+        raise SystemExit("--jobs must be non-negative")
+    if args.slowest < 0:
+        raise SystemExit("--slowest must be non-negative")
+    if args.watch:
+        if args.format != "text":
+            raise SystemExit("--watch only supports the text format")
+        if args.interval <= 0:
+            raise SystemExit("--interval must be positive")
+        watcher = _Watcher(
+            args.files,
+            ignore=ignored,
+            additional_decay_models=args.additional_decay_model,
+            semantic=args.semantic,
+        )
+        with contextlib.suppress(KeyboardInterrupt):
+            _watch(
+                watcher,
+                interval=args.interval,
+                color=args.color,
+                max_diagnostics=args.max_diagnostics,
+            )
+        return 0
     files = list(_iter_decay_files(args.files))
-    diagnostics = validate_files(
+    results = _iter_file_results(
         files,
         ignore=ignored,
         additional_decay_models=args.additional_decay_model,
+        jobs=args.jobs,
+        cache_dir=args.cache_dir,
+        semantic=args.semantic,
+        trace_memory=args.trace_memory,
     )
-    _print_diagnostics(
-        diagnostics,
-        files=files,
-        show_ok=args.show_ok,
-        color=args.color,
-        max_diagnostics=args.max_diagnostics,
-    )
+    if args.format == "text":
+        done = list(results)
+        diagnostics = [d for result in done for d in result.diagnostics]
+        _print_diagnostics(
+            diagnostics,
+            files=files,
+            show_ok=args.show_ok,
+            color=args.color,
+            max_diagnostics=args.max_diagnostics,
+        )
+    else:
+        writer = _WRITERS[args.format](sys.stdout)
+        done = []
+        for result in results:
+            writer.write(result)
+            done.append(result)
+        writer.close()
+        diagnostics = [d for result in done for d in result.diagnostics]
+    if args.cache_dir is not None:
+        cached = sum(result.cached for result in done)
+        style = Style(_use_color(args.color))
+        sys.stderr.write(
+            style.muted(f"cache: {cached} of {len(files)} file(s) served from cache")
+            + "\n"
+        )
+    if args.slowest:
+        _print_slowest(done, args.slowest, args.color)
     return 1 if diagnostics else 0
 
 
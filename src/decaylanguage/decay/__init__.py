@@ -5,10 +5,76 @@
 
 from __future__ import annotations
 
-from .decay import DaughtersDict, DecayChain, DecayMode
-from .viewer import DecayChainViewer
+from typing import TYPE_CHECKING
 
-__all__ = ("DaughtersDict", "DecayChain", "DecayChainViewer", "DecayMode")
+from .._lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from .collection import DecayChainCollection
+    from .decay import (
+        DaughtersDict,
+        DecayChain,
+        DecayMode,
+        FrozenDaughters,
+        flatten_many,
+    )
+    from .descriptor import DescriptorNode, parse_descriptor, parse_descriptors
+    from .matching import DecayPattern, PatternMatch
+    from .serialization import (
+        DecayChainReader,
+        DecayChainWriter,
+        dump_chains,
+        iter_chains,
+        load_chains,
+    )
+    from .viewer import DecayChainViewer, RenderCache, render_decay_chains
+
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "DaughtersDict": ".decay",
+        "DecayChain": ".decay",
+        "DecayChainCollection": ".collection",
+        "DecayChainReader": ".serialization",
+        "DecayChainViewer": ".viewer",
+        "DecayChainWriter": ".serialization",
+        "DecayMode": ".decay",
+        "DecayPattern": ".matching",
+        "DescriptorNode": ".descriptor",
+        "FrozenDaughters": ".decay",
+        "PatternMatch": ".matching",
+        "RenderCache": ".viewer",
+        "dump_chains": ".serialization",
+        "flatten_many": ".decay",
+        "iter_chains": ".serialization",
+        "load_chains": ".serialization",
+        "parse_descriptor": ".descriptor",
+        "parse_descriptors": ".descriptor",
+        "render_decay_chains": ".viewer",
+    },
+)
+
+__all__ = (
+    "DaughtersDict",
+    "DecayChain",
+    "DecayChainCollection",
+    "DecayChainReader",
+    "DecayChainViewer",
+    "DecayChainWriter",
+    "DecayMode",
+    "DecayPattern",
+    "DescriptorNode",
+    "FrozenDaughters",
+    "PatternMatch",
+    "RenderCache",
+    "dump_chains",
+    "flatten_many",
+    "iter_chains",
+    "load_chains",
+    "parse_descriptor",
+    "parse_descriptors",
+    "render_decay_chains",
+)
 
 
 def __dir__() -> tuple[str, ...]:
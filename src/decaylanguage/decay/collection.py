@@ -0,0 +1,531 @@
+# Copyright (c) 2018-2026, Eduardo Rodrigues and Henry Schreiner.
+#
+# Distributed under the 3-clause BSD license, see accompanying file LICENSE
+# or https://github.com/scikit-hep/decaylanguage for details.
+
+"""
+Submodule with a columnar container for (many) exclusive decay chains.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from itertools import product
+from typing import Any, overload
+
+from .._compat.typing import Self
+from ..utils import DescriptorFormatter, current_descriptor_formatter
+from .decay import (
+    DecayChain,
+    DecayChainDict,
+    DecayMode,
+    FrozenDaughters,
+    _same_decay_mode,
+)
+
+# An exclusive decay "plan": the decaying particle name, the decay mode dict
+# and the plans for each of the daughters that decay further, in order.
+_Plan = tuple[str, dict[str, Any], tuple[Any, ...]]
+
+
+class DecayChainCollection:
+    """
+    Class holding many exclusive decay chains in a columnar layout.
+
+    Rather than storing a list of ``DecayChain`` instances, each with its own
+    dicts of ``DecayMode``, ``DaughtersDict`` and metadata, all decay modes of all chains
+    are stored as rows ("nodes") of flat arrays:
+
+    - particle and model names are interned in a single string table
+      and referred to by integer ids;
+    - each node holds the id of the decaying particle, its branching fraction,
+      its model id and the index of its parent node (-1 for the top-level decay);
+    - the daughters of all nodes are stored contiguously, together with
+      the index of the node describing their sub-decay, if any (else -1).
+
+    Every chain occupies a contiguous range of nodes, in depth-first order,
+    the first node being the top-level decay.
+    Quantities such as branching fractions and final states are computed in single
+    passes over these arrays, and ``DecayChain`` instances are only
+    created on access.
+
+    Note
+    ----
+    Unlike a ``DecayChain``, a chain in the collection may contain several
+    occurrences of the same particle with *different* sub-decays,
+    as produced when expanding all decay modes of a mother particle
+    (e.g. 'pi0 pi0' with one 'pi0 -> gamma gamma' and one 'pi0 -> e+ e- gamma').
+    Such chains cannot be materialised as ``DecayChain`` instances
+    but all other operations, e.g. ``to_descriptors``, apply.
+
+    Examples
+    --------
+    >>> dm1 = DecayMode(0.0124, 'K_S0 pi0', model='PHSP')
+    >>> dm2 = DecayMode(0.692, 'pi+ pi-')
+    >>> dm3 = DecayMode(0.98823, 'gamma gamma')
+    >>> dc = DecayChain('D0', {'D0': dm1, 'K_S0': dm2, 'pi0': dm3})
+    >>> coll = DecayChainCollection([dc, DecayChain('K_S0', {'K_S0': dm2})])
+    >>> coll
+    <DecayChainCollection: 2 chains, 4 decay modes>
+    >>> coll.to_descriptors()
+    ['D0 -> (K_S0 -> pi+ pi-) (pi0 -> gamma gamma)', 'K_S0 -> pi+ pi-']
+    >>> coll[1]
+    <DecayChain: K_S0 -> pi+ pi- (0 sub-decays), BF=0.692>
+    """
+
+    __slots__ = (
+        "_chain_offsets",
+        "_dau_child",
+        "_dau_offsets",
+        "_dau_particle",
+        "_node_bf",
+        "_node_extra",
+        "_node_model",
+        "_node_params",
+        "_node_parent",
+        "_node_particle",
+        "_string_ids",
+        "_strings",
+    )
+
+    def __init__(self, chains: Iterable[DecayChain] = ()) -> None:
+        """
+        Default constructor.
+
+        Parameters
+        ----------
+        chains: iterable of ``DecayChain``, optional, default=()
+            Decay chains to be stored in the collection.
+        """
+        # String table shared by particle and model names
+        self._strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+
+        # Start of each chain in the node arrays, plus the final end
+        self._chain_offsets = array("q", [0])
+
+        # Node (decay mode) columns
+        self._node_particle = array("q")
+        self._node_parent = array("q")
+        self._node_bf = array("d")
+        self._node_model = array("q")
+        self._node_params: list[Any] = []
+        self._node_extra: list[dict[str, Any] | None] = []
+
+        # Daughter columns, the daughters of node i being in the range
+        # _dau_offsets[i]:_dau_offsets[i+1]
+        self._dau_offsets = array("q", [0])
+        self._dau_particle = array("q")
+        self._dau_child = array("q")
+
+        self.extend(chains)
+
+    @classmethod
+    def from_chains(cls, chains: Iterable[DecayChain]) -> Self:
+        """
+        Constructor from an iterable of ``DecayChain`` instances.
+        """
+        return cls(chains)
+
+    @classmethod
+    def from_decay_chains_dict(cls, decay_chains: DecayChainDict) -> Self:
+        """
+        Constructor expanding all the decay modes of a mother particle,
+        as returned by ``DecFileParser.build_decay_chains(...)``,
+        into the collection of all exclusive decay chains.
+
+        The chains are stored in the same order as the descriptors returned by
+        ``DecFileParser.expand_decay_modes(...)``.
+
+        Examples
+        --------
+        >>> dc_dict = {'D0': [{'bf': 0.6, 'fs': ['K-', 'pi+']},
+        ...                   {'bf': 0.4, 'fs': [{'pi0': [{'bf': 0.988, 'fs': ['gamma', 'gamma']},
+        ...                                               {'bf': 0.012, 'fs': ['e+', 'e-', 'gamma']}]},
+        ...                                      'K_S0']}]}
+        >>> DecayChainCollection.from_decay_chains_dict(dc_dict).to_descriptors()
+        ['D0 -> K- pi+', 'D0 -> (pi0 -> gamma gamma) K_S0', 'D0 -> (pi0 -> e+ e- gamma) K_S0']
+        """
+        coll = cls()
+        mother = next(iter(decay_chains))
+        for plan in _expand_plans(mother, decay_chains[mother]):  # type: ignore[arg-type]
+            coll._add_plan(plan, -1)
+            coll._chain_offsets.append(len(coll._node_bf))
+        return coll
+
+    def _intern(self, name: str) -> int:
+        idx = self._string_ids.get(name)
+        if idx is None:
+            idx = len(self._strings)
+            self._strings.append(name)
+            self._string_ids[name] = idx
+        return idx
+
+    def _add_node(
+        self,
+        particle: str,
+        parent: int,
+        bf: float,
+        metadata: dict[str, Any],
+        daughters: Sequence[str],
+    ) -> int:
+        """
+        Append a node to the columns and return its index. The daughters are
+        all recorded as not decaying further; the caller patches ``_dau_child``.
+        """
+        node = len(self._node_bf)
+        self._node_particle.append(self._intern(particle))
+        self._node_parent.append(parent)
+        self._node_bf.append(bf)
+        self._node_model.append(self._intern(metadata.get("model") or ""))
+        params = metadata.get("model_params")
+        self._node_params.append("" if params is None else params)
+        extra = {
+            k: v for k, v in metadata.items() if k not in ("model", "model_params")
+        }
+        self._node_extra.append(extra or None)
+        for d in daughters:
+            self._dau_particle.append(self._intern(d))
+            self._dau_child.append(-1)
+        self._dau_offsets.append(len(self._dau_particle))
+        return node
+
+    def _add_plan(self, plan: _Plan, parent: int) -> int:
+        name, mode, subplans = plan
+        fs = mode["fs"]
+        daughters = [p if isinstance(p, str) else next(iter(p)) for p in fs]
+        metadata = {k: v for k, v in mode.items() if k not in ("bf", "fs")}
+        node = self._add_node(name, parent, mode["bf"], metadata, daughters)
+        start = self._dau_offsets[node]
+        it = iter(subplans)
+        for i, p in enumerate(fs):
+            if not isinstance(p, str):
+                self._dau_child[start + i] = self._add_plan(next(it), node)
+        return node
+
+    def append(self, chain: DecayChain) -> None:
+        """
+        Add a ``DecayChain`` to the collection.
+        """
+        decays = chain.decays
+
+        def add(name: str, parent: int, ancestors: frozenset[str]) -> int:
+            dm = decays[name]
+            daughters = dm.daughters.to_list()
+            node = self._add_node(name, parent, dm.bf, dm.metadata, daughters)
+            start = self._dau_offsets[node]
+            for i, d in enumerate(daughters):
+                # Particles decaying into themselves further down are left undecayed
+                if d in decays and d not in ancestors:
+                    self._dau_child[start + i] = add(d, node, ancestors | {d})
+            return node
+
+        add(chain.mother, -1, frozenset((chain.mother,)))
+        self._chain_offsets.append(len(self._node_bf))
+
+    def extend(self, chains: Iterable[DecayChain]) -> None:
+        """
+        Add several ``DecayChain`` instances to the collection.
+        """
+        for chain in chains:
+            self.append(chain)
+
+    def _chain_decay_mode(self, node: int) -> DecayMode:
+        strings = self._strings
+        start, end = self._dau_offsets[node], self._dau_offsets[node + 1]
+        params = self._node_params[node]
+        extra = self._node_extra[node]
+        return DecayMode(
+            self._node_bf[node],
+            [strings[i] for i in self._dau_particle[start:end]],
+            model=strings[self._node_model[node]],
+            model_params=params if isinstance(params, str) else list(params),
+            **(extra or {}),
+        )
+
+    def _chain(self, index: int) -> DecayChain:
+        start, end = self._chain_offsets[index], self._chain_offsets[index + 1]
+        decays: dict[str, DecayMode] = {}
+        for node in range(start, end):
+            name = self._strings[self._node_particle[node]]
+            dm = self._chain_decay_mode(node)
+            existing = decays.get(name)
+            if existing is not None and not _same_decay_mode(existing, dm):
+                raise RuntimeError(
+                    f"Chain {index} is not a single decay chain: "
+                    f"'{name}' decays in more than one way!"
+                )
+            decays[name] = dm
+        return DecayChain(self._strings[self._node_particle[start]], decays)
+
+    def to_chains(self) -> list[DecayChain]:
+        """
+        Return all chains as a list of ``DecayChain`` instances.
+        """
+        return [self._chain(i) for i in range(len(self))]
+
+    def to_descriptors(
+        self,
+        aliases: dict[str, str] | None = None,
+        formatter: DescriptorFormatter | None = None,
+    ) -> list[str]:
+        """
+        Return the decay descriptors of all chains, see ``DecayChain.to_string``.
+
+        Parameters
+        ----------
+        aliases: dict[str, str], optional, default=None
+            Mapping of (decaying) particle names to replace,
+            as done by ``DecFileParser.expand_decay_modes(...)``.
+        formatter: DescriptorFormatter, optional, default=None
+            Formatter of the decay descriptors.
+            Default is the formatter of the current context, see ``DescriptorFormat``.
+        """
+        format_descriptor = (
+            formatter or current_descriptor_formatter()
+        ).format_descriptor
+        strings = self._strings
+        offsets = self._dau_offsets
+        dau_particle = self._dau_particle
+        dau_child = self._dau_child
+
+        def descriptor(node: int, top: bool) -> str:
+            parts = []
+            for e in range(offsets[node], offsets[node + 1]):
+                child = dau_child[e]
+                parts.append(
+                    strings[dau_particle[e]] if child < 0 else descriptor(child, False)
+                )
+            mother = strings[self._node_particle[node]]
+            if aliases:
+                mother = aliases.get(mother, mother)
+            return format_descriptor(mother, " ".join(sorted(parts)), top)
+
+        return [descriptor(start, True) for start in self._chain_offsets[:-1]]
+
+    @property
+    def mothers(self) -> list[str]:
+        """
+        Mother particle names of all chains.
+        """
+        return [
+            self._strings[self._node_particle[start]]
+            for start in self._chain_offsets[:-1]
+        ]
+
+    @property
+    def bf(self) -> array[float]:
+        """
+        Branching fractions of the top-level decays of all chains.
+        """
+        return array("d", (self._node_bf[start] for start in self._chain_offsets[:-1]))
+
+    @property
+    def visible_bf(self) -> array[float]:
+        """
+        Visible branching fractions of all chains,
+        i.e. the products of all branching fractions in each chain.
+        """
+        return self._flatten_columns(())[0]
+
+    def _included_nodes(self, stable_ids: Collection[int]) -> bytearray:
+        """
+        Flag the nodes not hidden by a stable particle. Parents always
+        precede their children, hence a single forward pass suffices.
+        """
+        parent = self._node_parent
+        particle = self._node_particle
+        included = bytearray(len(self._node_bf))
+        for node in range(len(included)):
+            p = parent[node]
+            included[node] = p < 0 or (
+                included[p] == 1 and particle[node] not in stable_ids
+            )
+        return included
+
+    def _flatten_columns(
+        self, stable_particles: Collection[str]
+    ) -> tuple[array[float], list[FrozenDaughters]]:
+        """
+        Compute the visible branching fractions and flattened final states
+        of all chains in a single pass over the node arrays.
+        """
+        stable_ids = {
+            self._string_ids[p] for p in stable_particles if p in self._string_ids
+        }
+        included = self._included_nodes(stable_ids)
+        strings = self._strings
+        node_bf = self._node_bf
+        offsets = self._dau_offsets
+        dau_particle = self._dau_particle
+        dau_child = self._dau_child
+        chain_offsets = self._chain_offsets
+
+        vis_bfs = array("d")
+        final_states = []
+        for i in range(len(self)):
+            vis_bf = 1.0
+            fs: Counter[int] = Counter()
+            for node in range(chain_offsets[i], chain_offsets[i + 1]):
+                if not included[node]:
+                    continue
+                vis_bf *= node_bf[node]
+                for e in range(offsets[node], offsets[node + 1]):
+                    child = dau_child[e]
+                    if child < 0 or not included[child]:
+                        fs[dau_particle[e]] += 1
+            vis_bfs.append(vis_bf)
+            final_states.append(
+                FrozenDaughters._from_items(
+                    tuple(sorted((strings[k], v) for k, v in fs.items()))
+                )
+            )
+        return vis_bfs, final_states
+
+    def final_states(
+        self, stable_particles: Collection[str] = ()
+    ) -> list[FrozenDaughters]:
+        """
+        Flattened final states of all chains, as hashable ``FrozenDaughters``
+        suitable for indexing chains by final state.
+
+        Parameters
+        ----------
+        stable_particles: collection of str, optional, default=()
+            Particles whose sub-decays are ignored, see ``DecayChain.flatten``.
+        """
+        return self._flatten_columns(stable_particles)[1]
+
+    def flatten(self, stable_particles: Collection[str] = ()) -> Self:
+        """
+        Return a new collection with all chains flattened, see ``DecayChain.flatten``.
+
+        Examples
+        --------
+        >>> dm1 = DecayMode(0.0124, 'K_S0 pi0', model='PHSP')
+        >>> dm2 = DecayMode(0.692, 'pi+ pi-')
+        >>> dm3 = DecayMode(0.98823, 'gamma gamma')
+        >>> dc = DecayChain('D0', {'D0': dm1, 'K_S0': dm2, 'pi0': dm3})
+        >>> DecayChainCollection([dc]).flatten(stable_particles=['pi0']).to_chains()
+        [<DecayChain: D0 -> pi+ pi- pi0 (0 sub-decays), BF=0.0085808>]
+        """
+        vis_bfs, final_states = self._flatten_columns(stable_particles)
+        coll = self._empty_like()
+        strings = self._strings
+        for i, start in enumerate(self._chain_offsets[:-1]):
+            metadata = {
+                "model": strings[self._node_model[start]],
+                "model_params": self._node_params[start],
+                **(self._node_extra[start] or {}),
+            }
+            coll._add_node(
+                strings[self._node_particle[start]],
+                -1,
+                vis_bfs[i],
+                metadata,
+                final_states[i].to_list(),
+            )
+            coll._chain_offsets.append(len(coll._node_bf))
+        return coll
+
+    def _empty_like(self) -> Self:
+        coll = self.__class__()
+        coll._strings = list(self._strings)
+        coll._string_ids = dict(self._string_ids)
+        return coll
+
+    def _take(self, indices: Iterable[int]) -> Self:
+        """
+        Return a new collection with the chains of given indices.
+        """
+        coll = self._empty_like()
+        for i in indices:
+            start, end = self._chain_offsets[i], self._chain_offsets[i + 1]
+            shift = len(coll._node_bf) - start
+            dau_start = self._dau_offsets[start]
+            dau_shift = len(coll._dau_particle) - dau_start
+            coll._node_particle.extend(self._node_particle[start:end])
+            coll._node_parent.extend(
+                p + shift if p >= 0 else -1 for p in self._node_parent[start:end]
+            )
+            coll._node_bf.extend(self._node_bf[start:end])
+            coll._node_model.extend(self._node_model[start:end])
+            coll._node_params.extend(self._node_params[start:end])
+            coll._node_extra.extend(self._node_extra[start:end])
+            dau_end = self._dau_offsets[end]
+            coll._dau_particle.extend(self._dau_particle[dau_start:dau_end])
+            coll._dau_child.extend(
+                c + shift if c >= 0 else -1 for c in self._dau_child[dau_start:dau_end]
+            )
+            coll._dau_offsets.extend(
+                o + dau_shift for o in self._dau_offsets[start + 1 : end + 1]
+            )
+            coll._chain_offsets.append(len(coll._node_bf))
+        return coll
+
+    def filter(self, mask: Iterable[bool]) -> Self:
+        """
+        Return a new collection with the chains selected by a boolean mask.
+
+        Examples
+        --------
+        >>> dc1 = DecayChain('K_S0', {'K_S0': DecayMode(0.692, 'pi+ pi-')})
+        >>> dc2 = DecayChain('pi0', {'pi0': DecayMode(0.98823, 'gamma gamma')})
+        >>> coll = DecayChainCollection([dc1, dc2])
+        >>> coll.filter(bf > 0.9 for bf in coll.bf).mothers
+        ['pi0']
+        """
+        selection = list(mask)
+        if len(selection) != len(self):
+            raise ValueError(
+                f"Mask length {len(selection)} does not match the number of chains {len(self)}!"
+            )
+        return self._take(i for i, keep in enumerate(selection) if keep)
+
+    def __len__(self) -> int:
+        return len(self._chain_offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> DecayChain: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Self: ...
+
+    def __getitem__(self, index: int | slice) -> DecayChain | Self:
+        if isinstance(index, slice):
+            return self._take(range(*index.indices(len(self))))
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("DecayChainCollection index out of range")
+        return self._chain(index)
+
+    def __iter__(self) -> Iterator[DecayChain]:
+        for i in range(len(self)):
+            yield self._chain(i)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {len(self)} chains, {len(self._node_bf)} decay modes>"
+
+    def __str__(self) -> str:
+        return repr(self)
+
+
+def _expand_plans(name: str, modes: list[dict[str, Any]]) -> list[_Plan]:
+    """
+    Internal function expanding the decay modes of a particle,
+    including all sub-decays, into the list of exclusive decay "plans",
+    in the same order as ``_expand_decay_modes``.
+    """
+    plans: list[_Plan] = []
+    for mode in modes:
+        sub_options = [
+            _expand_plans(next(iter(p)), next(iter(p.values())))
+            for p in mode["fs"]
+            if not isinstance(p, str)
+        ]
+        plans.extend((name, mode, combo) for combo in product(*sub_options))
+    return plans
@@ -6,19 +6,20 @@
 
 from __future__ import annotations
 
+import hashlib
 import typing
 from collections import Counter
-from collections.abc import Collection, Iterator, Sequence
+from collections.abc import Collection, Iterable, Iterator, Sequence
 from copy import deepcopy
 from itertools import product
 from typing import Any, NoReturn, TypedDict
 
-from particle import PDGID, ParticleNotFound
-from particle.converters import EvtGenName2PDGIDBiMap
-from particle.exceptions import MatchingIDNotFound
-
 from .._compat.typing import Self
-from ..utils import DescriptorFormat, charge_conjugate_name
+from ..utils import (
+    DescriptorFormatter,
+    charge_conjugate_name,
+    current_descriptor_formatter,
+)
 
 
 class DecayModeDict(TypedDict):
@@ -30,6 +31,14 @@ class DecayModeDict(TypedDict):
 
 DecayChainDict = dict[str, list[DecayModeDict]]
 
+#: Sentinel default of the ``bf_digits`` arguments of ``DecayChain``,
+#: meaning "use the class attribute ``DecayChain.bf_digits``".
+_CLASS_BF_DIGITS: Any = object()
+
+#: Maximum number of derived quantities cached per ``DecayChain``,
+#: the least recently used being discarded first.
+_CHAIN_CACHE_SIZE = 16
+
 
 class DaughtersDict(Counter[str]):
     """
@@ -83,6 +92,8 @@ class DaughtersDict(Counter[str]):
         """
         if isinstance(iterable, dict):
             iterable = {k: v for k, v in iterable.items() if v > 0}
+        elif isinstance(iterable, FrozenDaughters):
+            iterable = dict(iterable.items())
         elif iterable and isinstance(iterable, str):
             iterable = iterable.split()
         super().__init__(iterable, **kwds)
@@ -191,6 +202,258 @@ class DaughtersDict(Counter[str]):
     def __iter__(self) -> Iterator[str]:
         return self.elements()
 
+    def freeze(self) -> FrozenDaughters:
+        """
+        Return the final state as an immutable and hashable ``FrozenDaughters``.
+
+        Examples
+        --------
+        >>> dd = DaughtersDict('K+ K- pi0')
+        >>> dd.freeze()
+        <FrozenDaughters: ['K+', 'K-', 'pi0']>
+        """
+        return FrozenDaughters.from_daughters_dict(self)
+
+
+def _merge_counts(
+    a: tuple[tuple[str, int], ...],
+    b: tuple[tuple[str, int], ...],
+    sign: int,
+) -> tuple[tuple[str, int], ...]:
+    """
+    Internal function merging two sorted tuples of (name, count) pairs
+    in a single linear pass, adding (sign=1) or subtracting (sign=-1)
+    the counts of the second from the first. Non-positive counts are dropped.
+    """
+    out = []
+    i = j = 0
+    na, nb = len(a), len(b)
+    while i < na and j < nb:
+        ka, va = a[i]
+        kb, vb = b[j]
+        if ka == kb:
+            v = va + sign * vb
+            if v > 0:
+                out.append((ka, v))
+            i += 1
+            j += 1
+        elif ka < kb:
+            out.append(a[i])
+            i += 1
+        else:
+            if sign > 0:
+                out.append(b[j])
+            j += 1
+    out.extend(a[i:])
+    if sign > 0:
+        out.extend(b[j:])
+    return tuple(out)
+
+
+class FrozenDaughters:
+    """
+    Immutable and hashable companion of ``DaughtersDict``.
+
+    The final state is stored as a sorted tuple of (name, count) pairs,
+    and both the hash and the canonical string representation are computed
+    once and cached. Instances can therefore be used as dictionary keys
+    or set members, e.g. to index final states across many decay chains.
+
+    Note
+    ----
+    As for ``DaughtersDict``, EvtGen particle names are only assumed
+    by the ``charge_conjugate`` method.
+
+    Examples
+    --------
+    >>> fd = FrozenDaughters('K+ K- K- pi+ pi0')
+    >>> fd
+    <FrozenDaughters: ['K+', 'K-', 'K-', 'pi+', 'pi0']>
+    >>> fd.items()
+    (('K+', 1), ('K-', 2), ('pi+', 1), ('pi0', 1))
+    >>> {fd: 0.1}[FrozenDaughters(['pi0', 'K-', 'pi+', 'K-', 'K+'])]
+    0.1
+    """
+
+    __slots__ = ("_hash", "_items", "_string")
+
+    def __init__(
+        self,
+        iterable: dict[str, int] | Collection[str] | str | None = None,
+        **kwds: int,
+    ) -> None:
+        """
+        Default constructor, accepting the same inputs as ``DaughtersDict``.
+
+        Examples
+        --------
+        >>> fd = FrozenDaughters({'K+': 1, 'K-': 2})
+        >>> fd = FrozenDaughters(['K+', 'K-', 'K-'])
+        >>> fd = FrozenDaughters('K+ K-', pi0=1)
+        """
+        if isinstance(iterable, FrozenDaughters) and not kwds:
+            self._items: tuple[tuple[str, int], ...] = iterable._items
+        else:
+            dd = DaughtersDict(iterable, **kwds)
+            self._items = tuple(sorted((k, v) for k, v in dd.items() if v > 0))
+        self._hash: int | None = None
+        self._string: str | None = None
+
+    @classmethod
+    def _from_items(cls, items: tuple[tuple[str, int], ...]) -> Self:
+        """
+        Internal fast constructor from an already sorted tuple
+        of (name, count) pairs with strictly positive counts.
+        """
+        fd = cls.__new__(cls)
+        fd._items = items
+        fd._hash = None
+        fd._string = None
+        return fd
+
+    @classmethod
+    def from_daughters_dict(cls, dd: DaughtersDict) -> Self:
+        """
+        Constructor from a ``DaughtersDict``.
+        """
+        return cls._from_items(tuple(sorted((k, v) for k, v in dd.items() if v > 0)))
+
+    def to_daughters_dict(self) -> DaughtersDict:
+        """
+        Return the final state as a (mutable) ``DaughtersDict``.
+
+        Examples
+        --------
+        >>> FrozenDaughters('K+ K- K-').to_daughters_dict()
+        <DaughtersDict: ['K+', 'K-', 'K-']>
+        """
+        return DaughtersDict(dict(self._items))
+
+    def items(self) -> tuple[tuple[str, int], ...]:
+        """
+        Return the sorted tuple of (name, count) pairs.
+        """
+        return self._items
+
+    def keys(self) -> tuple[str, ...]:
+        """
+        Return the sorted tuple of distinct particle names.
+        """
+        return tuple(k for k, _ in self._items)
+
+    def values(self) -> tuple[int, ...]:
+        """
+        Return the particle multiplicities, in the order of ``keys()``.
+        """
+        return tuple(v for _, v in self._items)
+
+    def to_string(self) -> str:
+        """
+        Return the daughters as a string representation (ordered list of names).
+        The result is computed once and cached.
+        """
+        if self._string is None:
+            self._string = " ".join(self.to_list())
+        return self._string
+
+    def to_list(self) -> list[str]:
+        """
+        Return the daughters as an ordered list of names.
+        """
+        return [k for k, v in self._items for _ in range(v)]
+
+    def charge_conjugate(self, pdg_name: bool = False) -> Self:
+        """
+        Return the charge-conjugate final state.
+
+        Parameters
+        ----------
+        pdg_name: str, optional, default=False
+            Input particle name is the PDG name,
+            not the (default) EvtGen name.
+
+        Examples
+        --------
+        >>> FrozenDaughters({'K+': 2, 'pi0': 1}).charge_conjugate()
+        <FrozenDaughters: ['K-', 'K-', 'pi0']>
+        """
+        cc: Counter[str] = Counter()
+        for p, n in self._items:
+            cc[charge_conjugate_name(p, pdg_name=pdg_name)] += n
+        return self._from_items(tuple(sorted(cc.items())))
+
+    def __getitem__(self, name: str) -> int:
+        for k, v in self._items:
+            if k == name:
+                return v
+        return 0
+
+    def __contains__(self, name: object) -> bool:
+        return any(k == name for k, _ in self._items)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_list())
+
+    def __len__(self) -> int:
+        """
+        Return the length, i.e. the number of final-state particles.
+        """
+        return sum(v for _, v in self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(self._items)
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenDaughters):
+            return self._items == other._items
+        if isinstance(other, dict):
+            return dict(self._items) == {k: v for k, v in other.items() if v > 0}
+        return NotImplemented
+
+    def __add__(self, other: FrozenDaughters | DaughtersDict) -> Self:
+        """
+        Add two final states, particle-type-wise.
+
+        Examples
+        --------
+        >>> FrozenDaughters('K+ K-') + FrozenDaughters('pi0 K-')
+        <FrozenDaughters: ['K+', 'K-', 'K-', 'pi0']>
+        """
+        if isinstance(other, DaughtersDict):
+            other = other.freeze()
+        if not isinstance(other, FrozenDaughters):
+            return NotImplemented
+        return self._from_items(_merge_counts(self._items, other._items, 1))
+
+    def __sub__(self, other: FrozenDaughters | DaughtersDict) -> Self:
+        """
+        Subtract two final states, particle-type-wise.
+
+        Examples
+        --------
+        >>> FrozenDaughters('K+ K- K- pi0') - FrozenDaughters('K- pi0')
+        <FrozenDaughters: ['K+', 'K-']>
+        """
+        if isinstance(other, DaughtersDict):
+            other = other.freeze()
+        if not isinstance(other, FrozenDaughters):
+            return NotImplemented
+        return self._from_items(_merge_counts(self._items, other._items, -1))
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (self.__class__, (dict(self._items),))
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {self.to_list()}>"
+
+    def __str__(self) -> str:
+        return repr(self)
+
 
 class DecayMode:
     """
@@ -281,6 +544,8 @@ class DecayMode:
     def from_dict(
         cls,
         decay_mode_dict: DecayModeDict,
+        *,
+        copy: bool = True,
     ) -> Self:
         """
         Constructor from a dictionary of the form
@@ -288,6 +553,17 @@ class DecayMode:
         These two keys are mandatory. All others are interpreted as
         model information or metadata, see the constructor signature and doc.
 
+        Parameters
+        ----------
+        decay_mode_dict: dict
+            The input decay mode dictionary.
+        copy: bool, optional, default=True
+            Make a defensive deep copy of the input. Pass ``copy=False``
+            when the caller owns the input and will not modify it afterwards,
+            e.g. for the output of ``DecFileParser.build_decay_chains(...)``;
+            metadata values such as model parameter lists are then shared
+            with the input rather than copied.
+
         Note
         ----
         This class assumes EvtGen particle names, though this assumption is only
@@ -313,7 +589,7 @@ class DecayMode:
         >>> dm.metadata
         {'model': '', 'model_params': '', 'zfit': {'B0': 'gauss'}}
         """
-        dm = deepcopy(decay_mode_dict)
+        dm = deepcopy(decay_mode_dict) if copy else decay_mode_dict
 
         # Ensure the input dict has the 2 required keys 'bf' and 'fs'
         if not dm.keys() >= {"bf", "fs"}:
@@ -364,6 +640,10 @@ class DecayMode:
         if not daughters:
             return cls(bf=bf, daughters=None, **info)
 
+        from particle import PDGID, ParticleNotFound  # noqa: PLC0415
+        from particle.converters import EvtGenName2PDGIDBiMap  # noqa: PLC0415
+        from particle.exceptions import MatchingIDNotFound  # noqa: PLC0415
+
         try:
             _daughters = [EvtGenName2PDGIDBiMap[PDGID(d)] for d in daughters]
         except MatchingIDNotFound:
@@ -463,6 +743,30 @@ class DecayMode:
         return repr(self)
 
 
+def _same_decay_mode(dm1: DecayMode, dm2: DecayMode) -> bool:
+    """
+    Internal function checking whether two ``DecayMode`` instances are
+    structurally identical, i.e. whether their ``to_dict()`` representations
+    would compare equal, without materialising the dictionaries.
+    """
+    if dm1 is dm2:
+        return True
+    if dm1.bf != dm2.bf or dm1.daughters != dm2.daughters:
+        return False
+    md1, md2 = dm1.metadata, dm2.metadata
+    if md1 == md2:
+        return True
+    # to_dict() maps a None model_params to ''
+    if md1.keys() != md2.keys():
+        return False
+    return all(
+        ("" if md1[k] is None else md1[k]) == ("" if md2[k] is None else md2[k])
+        if k == "model_params"
+        else md1[k] == md2[k]
+        for k in md1
+    )
+
+
 def _has_no_subdecay(ds: list[Any]) -> bool:
     """
     Internal function to check whether the input list
@@ -480,7 +784,10 @@ def _has_no_subdecay(ds: list[Any]) -> bool:
 
 
 def _build_decay_modes(
-    decay_modes: dict[str, DecayMode], dc_dict: DecayChainDict
+    decay_modes: dict[str, DecayMode],
+    dc_dict: DecayChainDict,
+    *,
+    copy: bool = True,
 ) -> None:
     """
     Internal recursive function that identifies and creates all ``DecayMode`` instances
@@ -497,6 +804,9 @@ def _build_decay_modes(
         built from the input decay chain dictionary.
     dc_dict: dict
         The input decay chain dictionary.
+    copy: bool, optional, default=True
+        Deep copy the decay mode information taken from the input,
+        see ``DecayMode.from_dict``. The input itself is never modified.
 
     Note
     ----
@@ -559,7 +869,7 @@ def _build_decay_modes(
         # For example, eta -> pi0 pi0 with pi0 -> gamma gamma, in which case
         # the identical mode is simply re-confirmed rather than rejected.
         existing = decay_modes.get(mother)
-        if existing is not None and existing.to_dict() != decay_mode.to_dict():
+        if existing is not None and not _same_decay_mode(existing, decay_mode):
             raise RuntimeError("Input is not a single decay chain!")
         decay_modes[mother] = decay_mode
 
@@ -573,21 +883,24 @@ def _build_decay_modes(
 
         assert isinstance(fs, list)
         if _has_no_subdecay(fs):
-            _set_decay_mode(mother, DecayMode.from_dict(dm))
+            _set_decay_mode(mother, DecayMode.from_dict(dm, copy=copy))
         else:
-            d = deepcopy(dm)
-            fs_local = d["fs"]
-            assert isinstance(fs_local, list)
-            for i, ifs in enumerate(fs_local):
+            # Shallow copy of the decay mode with every sub-decay replaced
+            # by the name of its mother, so that the (possibly large)
+            # sub-decay dicts are never copied
+            fs_local: list[Any] = []
+            for ifs in fs:
                 if isinstance(ifs, dict):
-                    # Replace the element with the key and
-                    # store the present decay mode ignoring sub-decays
-                    fs_local[i] = next(iter(ifs.keys()))
+                    fs_local.append(next(iter(ifs.keys())))
                     # Recursively continue ...
-                    _build_decay_modes(decay_modes, fs[i])
+                    _build_decay_modes(decay_modes, ifs, copy=copy)
+                else:
+                    fs_local.append(ifs)
+            d = dict(dm)
+            d["fs"] = fs_local
             # Create the decay mode now that none of its particles
             # has a sub-decay
-            _set_decay_mode(mother, DecayMode.from_dict(d))
+            _set_decay_mode(mother, DecayMode.from_dict(d, copy=copy))  # type: ignore[arg-type]
 
 
 T = typing.TypeVar("T")
@@ -615,6 +928,7 @@ def _expand_decay_modes(
     *,
     top: bool = True,
     aliases: dict[str, str] | None = None,
+    formatter: DescriptorFormatter | None = None,
 ) -> list[str]:
     """Given a dict with 1 key (the mother particle) whose value is a list of
     decay modes, recursively replace all decay modes with decay descriptors.
@@ -630,6 +944,9 @@ def _expand_decay_modes(
     aliases: dict[str, str], optional, default={}
         Mapping of names to replace. Useful when dealing with DecFiles that have
         Alias statements.
+    formatter: DescriptorFormatter, optional, default=None
+        Formatter of the decay descriptors.
+        Default is the formatter of the current context, see ``DescriptorFormat``.
 
     Examples
     --------
@@ -725,11 +1042,15 @@ def _expand_decay_modes(
     assert len(decay_chain.keys()) == 1
     orig_mother = next(iter(decay_chain.keys()))
     mother = aliases.get(orig_mother, orig_mother) if aliases else orig_mother
+    if formatter is None:
+        formatter = current_descriptor_formatter()
 
     for mode in _get_modes(decay_chain):
         for fsp in _get_fs(mode):
             if isinstance(fsp, dict):
-                _expand_decay_modes(fsp, top=False, aliases=aliases)
+                _expand_decay_modes(
+                    fsp, top=False, aliases=aliases, formatter=formatter
+                )
 
     # Replace dicts with strings (decay descriptors)
     expanded_modes = []
@@ -744,7 +1065,7 @@ def _expand_decay_modes(
             # TODO: delegate descriptor-building to another function
             #       allow for different conventions?
             final_state = DaughtersDict(expanded_mode).to_string()
-            descriptor = DescriptorFormat.format_descriptor(mother, final_state, top)
+            descriptor = formatter.format_descriptor(mother, final_state, top)
             expanded_modes += [descriptor]
 
     decay_chain[orig_mother] = expanded_modes  # type: ignore[assignment]
@@ -770,9 +1091,17 @@ class DecayChain:
     It is nevertheless advised to default use EvtGen names for consistency
     with the defaults used in the related classes ``DecayMode`` and ``DaughtersDict``,
     unless there is a good motivation not to.
+    3) Chains compare equal and hash by their canonical form,
+    see ``DecayChain.canonical_form``. Chains are nevertheless mutable,
+    so do not modify a chain while it is stored in a set or used as a dictionary key.
     """
 
-    __slots__ = ("decays", "mother")
+    __slots__ = ("_cache", "decays", "mother")
+
+    #: Default number of significant digits the branching fractions are
+    #: rounded to when comparing and hashing chains, see ``canonical_form``.
+    #: Set to None for exact comparisons.
+    bf_digits: int | None = 10
 
     def __init__(self, mother: str, decays: dict[str, DecayMode]) -> None:
         """
@@ -798,12 +1127,76 @@ class DecayChain:
         self.mother = mother
         self.decays = decays
 
+        # LRU cache of derived quantities such as the flattened chain,
+        # see ``_cached``. Entries are discarded as soon as the chain changes.
+        self._cache: dict[Any, tuple[tuple[Any, ...], Any]] = {}
+
+    def _state_token(self) -> tuple[Any, ...]:
+        """
+        Snapshot of the chain state the cached values are computed from,
+        used to detect that the chain has been modified since.
+        It holds the mother and, for each decay mode, its branching fraction,
+        daughters, model and model parameters, hence in-place changes
+        to the daughters or models of a decay mode are detected as well.
+        """
+        token: list[Any] = [self.mother]
+        for k, v in self.decays.items():
+            params = v.metadata.get("model_params")
+            if isinstance(params, list):
+                params = tuple(params)
+            token.append(
+                (
+                    k,
+                    v,
+                    v.bf,
+                    tuple(v.daughters.items()),
+                    v.metadata.get("model"),
+                    params,
+                )
+            )
+        return tuple(token)
+
+    def _cached(self, key: Any, compute: typing.Callable[[], T]) -> T:
+        """
+        Return the cached value for the given key,
+        (re)computing it if missing or if the chain has since been modified.
+        """
+        token = self._state_token()
+        cache = self._cache
+        hit = cache.pop(key, None)
+        if hit is not None and hit[0] == token:
+            value = typing.cast(T, hit[1])
+        else:
+            value = compute()
+            if len(cache) >= _CHAIN_CACHE_SIZE:
+                del cache[next(iter(cache))]
+        cache[key] = (token, value)
+        return value
+
     @classmethod
-    def from_dict(cls, decay_chain_dict: DecayChainDict) -> Self:
+    def from_dict(cls, decay_chain_dict: DecayChainDict, *, copy: bool = True) -> Self:
         """
         Constructor from a decay chain represented as a dictionary.
         The format is the same as that returned by
         ``DecFileParser.build_decay_chains(...)``.
+
+        Parameters
+        ----------
+        decay_chain_dict: dict
+            The input decay chain dictionary.
+        copy: bool, optional, default=True
+            Deep copy the decay mode information taken from the input.
+            Pass ``copy=False`` when the caller owns the input,
+            for example the freshly built output of
+            ``DecFileParser.build_decay_chains(...)``, to skip all defensive copies.
+
+        Examples
+        --------
+        >>> dc_dict = {'D0': [{'bf': 0.0124,
+        ...                    'fs': [{'K_S0': [{'bf': 0.692, 'fs': ['pi+', 'pi-']}]}, 'pi0'],
+        ...                    'model': 'PHSP'}]}
+        >>> DecayChain.from_dict(dc_dict, copy=False)
+        <DecayChain: D0 -> K_S0 pi0 (1 sub-decays), BF=0.0124>
         """
         try:
             assert len(decay_chain_dict.keys()) == 1
@@ -812,7 +1205,7 @@ class DecayChain:
 
         decay_modes: dict[str, DecayMode] = {}
         mother = next(iter(decay_chain_dict.keys()))
-        _build_decay_modes(decay_modes, decay_chain_dict)
+        _build_decay_modes(decay_modes, decay_chain_dict, copy=copy)
 
         return cls(mother, decay_modes)
 
@@ -847,11 +1240,17 @@ class DecayChain:
         """
         return len(self.decays)
 
-    def to_string(self) -> str:
+    def to_string(self, formatter: DescriptorFormatter | None = None) -> str:
         """
         One-line string representation of the entire decay chain.
         Sub-decays are enclosed in round parentheses.
 
+        Parameters
+        ----------
+        formatter: DescriptorFormatter, optional, default=None
+            Formatter of the decay descriptor.
+            Default is the formatter of the current context, see ``DescriptorFormat``.
+
         Examples
         --------
         >>> dm1 = DecayMode(0.6770, "D0 pi+") # D*+
@@ -861,9 +1260,12 @@ class DecayChain:
         >>> dc = DecayChain("D*+", {"D*+":dm1, "D0":dm2, "K_S0":dm3, "pi0":dm4})
         >>> print(dc.to_string())
         D*+ -> (D0 -> (K_S0 -> pi+ pi-) (pi0 -> gamma gamma)) pi+
+        >>> from decaylanguage.utils import DescriptorFormatter
+        >>> print(dc.to_string(DescriptorFormatter("{mother} => {daughters}", "[{mother} => {daughters}]")))
+        D*+ => [D0 => [K_S0 => pi+ pi-] [pi0 => gamma gamma]] pi+
         """
         dc_dict = self.to_dict()
-        descriptors = _expand_decay_modes(dc_dict, top=True)
+        descriptors = _expand_decay_modes(dc_dict, top=True, formatter=formatter)
         assert len(descriptors) == 1
         return descriptors[0]
 
@@ -990,6 +1392,105 @@ class DecayChain:
 
         return recursively_replace(self.mother)
 
+    def canonical_form(
+        self, bf_digits: int | None = _CLASS_BF_DIGITS
+    ) -> tuple[Any, ...]:
+        """
+        Return a canonical, hashable representation of the decay chain,
+        independent of the order of the daughters and of the sub-decays.
+
+        Each decaying particle is represented by the tuple
+        ``(name, bf, model, model_params, daughters)``, where ``daughters``
+        is the sorted tuple of the representations of its daughters,
+        and each stable particle by the tuple ``(name,)``.
+
+        Parameters
+        ----------
+        bf_digits: int or None, optional, default=DecayChain.bf_digits
+            Number of significant digits the branching fractions are rounded to,
+            or None to keep them exact.
+            Defaults to the class attribute ``DecayChain.bf_digits``.
+
+        Note
+        ----
+        1) Only particle names, branching fractions and models are considered;
+        any other ``DecayMode`` metadata is ignored.
+        2) The branching fractions are rounded, which is not a tolerance:
+        two values either side of a rounding boundary, e.g. 0.123449 and 0.123451
+        with 4 digits, differ in the canonical form however close they are.
+        3) The result is cached and recomputed only once the chain is modified,
+        see ``DecayChain.flatten`` for what modifications are detected.
+
+        Examples
+        --------
+        >>> dm1 = DecayMode(0.0124, 'K_S0 pi0', model='PHSP')
+        >>> dm2 = DecayMode(0.692, 'pi+ pi-')
+        >>> dc = DecayChain('D0', {'D0':dm1, 'K_S0':dm2})
+        >>> dc.canonical_form()
+        ('D0', 0.0124, 'PHSP', '', (('K_S0', 0.692, '', '', (('pi+',), ('pi-',))), ('pi0',)))
+        """
+        digits = self.bf_digits if bf_digits is _CLASS_BF_DIGITS else bf_digits
+        return self._cached(
+            ("canonical_form", digits), lambda: self._canonical_form(digits)
+        )
+
+    def _canonical_form(self, bf_digits: int | None) -> tuple[Any, ...]:
+        decays = self.decays
+        in_progress: set[str] = set()
+
+        def canonical(p: str) -> tuple[Any, ...]:
+            # A particle already being processed is a cycle and kept as stable
+            if p not in decays or p in in_progress:
+                return (p,)
+            in_progress.add(p)
+            mode = decays[p]
+            bf = mode.bf
+            if bf_digits is not None:
+                bf = float(f"{bf:.{bf_digits}g}")
+            params = mode.metadata.get("model_params")
+            params = tuple(params) if isinstance(params, list) else params or ""
+            daughters = tuple(sorted(canonical(d) for d in mode.daughters.elements()))
+            in_progress.discard(p)
+            return (p, bf, mode.metadata.get("model") or "", params, daughters)
+
+        return canonical(self.mother)
+
+    def content_hash(self, bf_digits: int | None = _CLASS_BF_DIGITS) -> str:
+        """
+        Return a stable hexadecimal hash of the content of the decay chain,
+        computed from its canonical form, see ``DecayChain.canonical_form``
+        for the meaning of ``bf_digits``.
+        Unlike ``hash(...)``, the value is the same across Python sessions.
+
+        Examples
+        --------
+        >>> dc1 = DecayChain('K_S0', {'K_S0': DecayMode(0.692, 'pi+ pi-')})
+        >>> dc2 = DecayChain('K_S0', {'K_S0': DecayMode(0.692, 'pi- pi+')})
+        >>> dc1.content_hash() == dc2.content_hash()
+        True
+        """
+        digits = self.bf_digits if bf_digits is _CLASS_BF_DIGITS else bf_digits
+        return self._cached(
+            ("content_hash", digits),
+            lambda: hashlib.blake2b(
+                repr(self.canonical_form(digits)).encode(), digest_size=16
+            ).hexdigest(),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DecayChain):
+            return NotImplemented
+        return self.canonical_form() == other.canonical_form()
+
+    def __hash__(self) -> int:
+        # Chains are mutable: modifying a chain stored in a set or used
+        # as a dictionary key changes its hash and silently corrupts
+        # the container, see the class docstring.
+        # Keyed on the digits, for the hash to follow changes of the class default
+        return self._cached(
+            ("hash", self.bf_digits), lambda: hash(self.canonical_form())
+        )
+
     def flatten(
         self,
         stable_particles: Collection[str] = (),
@@ -1008,8 +1509,12 @@ class DecayChain:
 
         Note
         ----
-        After flattening the only ``DecayMode`` metadata kept is that of the top-level decay,
+        1) After flattening the only ``DecayMode`` metadata kept is that of the top-level decay,
         i.e. that of the mother particle (nothing else would make sense).
+        2) The flattened final state and branching fraction are cached
+        per set of stable particles, and recomputed only once the chain is modified
+        (decay modes added, removed or replaced, or their branching fractions,
+        daughters or models changed, also in place).
 
         Examples
         --------
@@ -1030,37 +1535,80 @@ class DecayChain:
         {'D0': <DecayMode: daughters=K_S0 pi0, BF=0.0124>}
         """
 
-        vis_bf = self.bf
-        fs = DaughtersDict(self.decays[self.mother].daughters)
-
-        if stable_particles:
-            # The mother must always be decayed (that is the point of
-            # flattening), so it is never treated as stable even if listed.
-            keys = [
-                k for k in self.decays if k == self.mother or k not in stable_particles
-            ]
-        else:
-            keys = list(self.decays.keys())
-        keys.insert(0, keys.pop(keys.index(self.mother)))
-
-        further_to_replace = True
-        while further_to_replace:
-            for k in keys:
-                if k in fs:
-                    n_k = fs[k]
-                    vis_bf *= self.decays[k].bf ** n_k
-                    for _ in range(n_k):
-                        fs += self.decays[k].daughters
-                    fs[k] -= n_k
-            further_to_replace = any(fs[_k] > 0 for _k in keys)
+        stable = frozenset(stable_particles)
+        vis_bf, fs = self._cached(("flatten", stable), lambda: self._flatten(stable))
 
         return self.__class__(
             self.mother,
-            {self.mother: DecayMode(vis_bf, fs, **self.top_level_decay().metadata)},
+            {
+                self.mother: DecayMode(
+                    vis_bf, fs.to_daughters_dict(), **self.top_level_decay().metadata
+                )
+            },
         )
 
+    def _flatten(
+        self, stable_particles: frozenset[str]
+    ) -> tuple[float, FrozenDaughters]:
+        """
+        Compute the visible branching fraction and final state of the flattened chain
+        with a single post-order traversal, memoizing the result for each
+        intermediate particle so that repeated sub-decays are only resolved once.
+        """
+        decays = self.decays
+        memo: dict[str, tuple[float, FrozenDaughters]] = {}
+        in_progress: set[str] = set()
+
+        def resolve(p: str) -> tuple[float, FrozenDaughters]:
+            if p in memo:
+                return memo[p]
+            in_progress.add(p)
+            mode = decays[p]
+            bf = mode.bf
+            fs: Counter[str] = Counter()
+            for d, n in mode.daughters.items():
+                # The mother is always decayed, see the method docstring;
+                # a particle already being resolved is a cycle and kept as is
+                if d in decays and d not in stable_particles and d not in in_progress:
+                    sub_bf, sub_fs = resolve(d)
+                    bf *= sub_bf**n
+                    for k, v in sub_fs.items():
+                        fs[k] += v * n
+                elif n > 0:
+                    fs[d] += n
+            in_progress.discard(p)
+            result = (bf, FrozenDaughters._from_items(tuple(sorted(fs.items()))))
+            memo[p] = result
+            return result
+
+        return resolve(self.mother)
+
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__}: {self.mother} -> {self.top_level_decay().daughters.to_string()} ({len(self.decays) - 1} sub-decays), BF={self.bf}>"
 
     def __str__(self) -> str:
         return repr(self)
+
+
+def flatten_many(
+    chains: Iterable[DecayChain],
+    stable_particles: Collection[str] = (),
+) -> list[DecayChain]:
+    """
+    Flatten many decay chains in one go, see ``DecayChain.flatten``.
+
+    The collection of stable particles is normalised once for all chains,
+    and every chain reuses (and fills) its own cache of flattened results.
+
+    Examples
+    --------
+    >>> dm1 = DecayMode(0.0124, 'K_S0 pi0')
+    >>> dm2 = DecayMode(0.692, 'pi+ pi-')
+    >>> dm3 = DecayMode(0.98823, 'gamma gamma')
+    >>> dc1 = DecayChain('D0', {'D0': dm1, 'K_S0': dm2, 'pi0': dm3})
+    >>> dc2 = DecayChain('K_S0', {'K_S0': dm2})
+    >>> flatten_many([dc1, dc2], stable_particles=['pi0'])
+    [<DecayChain: D0 -> pi+ pi- pi0 (0 sub-decays), BF=0.0085808>, <DecayChain: K_S0 -> pi+ pi- (0 sub-decays), BF=0.692>]
+    """
+    stable = frozenset(stable_particles)
+    return [chain.flatten(stable) for chain in chains]
@@ -0,0 +1,320 @@
+# Copyright (c) 2018-2026, Eduardo Rodrigues and Henry Schreiner.
+#
+# Distributed under the 3-clause BSD license, see accompanying file LICENSE
+# or https://github.com/scikit-hep/decaylanguage for details.
+
+"""
+Submodule with a matcher of LHCb-style decay descriptor patterns
+against decay chains or against the decays defined in a parsed decay file.
+
+The pattern syntax is that of decay descriptors, see ``parse_descriptor``,
+with the usual ``'->'`` arrows and sub-decays enclosed in round parentheses, plus
+
+- ``[...]CC``: the whole pattern or its charge conjugate,
+- ``...``: any number of additional daughters,
+- ``^``: a marked particle, e.g. ``'D0 -> ^K- pi+'`` or ``'B0 -> ^(D- -> ...) ...'``.
+
+A daughter without a sub-decay in the pattern matches that particle
+whether or not it decays further.
+
+Examples
+--------
+>>> from decaylanguage import DecayChain, DecayMode
+>>> dc = DecayChain('D*+', {'D*+': DecayMode(0.677, 'D0 pi+'),
+...                         'D0': DecayMode(0.0395, 'K- pi+')})
+>>> DecayPattern('[D*+ -> (D0 -> K- ...) pi+]CC').matches(dc)
+True
+>>> DecayPattern('D*+ -> (D0 -> K- pi+ pi0) pi+').matches(dc)
+False
+"""
+
+from __future__ import annotations
+
+import re
+import typing
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from ..utils import charge_conjugate_name
+from .decay import DaughtersDict, DecayChain, DecayMode, FrozenDaughters
+from .descriptor import DescriptorNode, _compile_parser
+
+if TYPE_CHECKING:
+    from ..dec.dec import DecFileParser
+
+_WILDCARD = "..."
+_MARK = "^"
+_CC_PATTERN = re.compile(r"\s*\[(.*)\]\s*CC\s*", re.DOTALL)
+
+
+class _PatternNode(NamedTuple):
+    """
+    Compiled pattern for one particle: its name, whether it is marked,
+    and, if its decay is constrained, the daughter patterns, whether other daughters
+    are allowed (wildcard), and the required daughter names with their counts.
+    """
+
+    name: str
+    marked: bool
+    daughters: tuple[_PatternNode, ...] | None = None
+    wildcard: bool = False
+    required: FrozenDaughters = FrozenDaughters()
+
+    def charge_conjugate(self) -> _PatternNode:
+        daughters = self.daughters
+        if daughters is not None:
+            daughters = tuple(d.charge_conjugate() for d in daughters)
+        return _PatternNode(
+            charge_conjugate_name(self.name),
+            self.marked,
+            daughters,
+            self.wildcard,
+            self.required.charge_conjugate(),
+        )
+
+    def marked_names(self) -> list[str]:
+        names = [self.name] if self.marked else []
+        for d in self.daughters or ():
+            names += d.marked_names()
+        return names
+
+    def accepts(self, daughters: Any) -> bool:
+        """
+        Check whether the final state, a mapping of names to counts,
+        is compatible with the daughters of the pattern.
+        """
+        for name, count in self.required.items():
+            if daughters.get(name, 0) < count:
+                return False
+        return self.wildcard or sum(daughters.values()) == len(self.required)
+
+
+def _compile_node(name: str | DescriptorNode, descriptor: str) -> _PatternNode:
+    if isinstance(name, str):
+        marked = name.startswith(_MARK)
+        return _PatternNode(name[1:] if marked else name, marked)
+
+    marked = name.mother.startswith(_MARK)
+    mother = name.mother[1:] if marked else name.mother
+    if mother == _WILDCARD:
+        raise ValueError(
+            f"Invalid decay pattern '{descriptor}': '{_WILDCARD}' cannot decay."
+        )
+    daughters = tuple(
+        _compile_node(d, descriptor) for d in name.daughters if d != _WILDCARD
+    )
+    return _PatternNode(
+        mother,
+        marked,
+        daughters,
+        len(daughters) < len(name.daughters),
+        FrozenDaughters([d.name for d in daughters]),
+    )
+
+
+class PatternMatch(NamedTuple):
+    """
+    Decay chain matching a ``DecayPattern``, restricted to the decays constrained
+    by the pattern, with the product of their branching fractions
+    and the names of the marked particles.
+    """
+
+    chain: DecayChain
+    bf: float
+    marked: tuple[str, ...]
+
+
+class DecayPattern:
+    """
+    Compiled LHCb-style decay descriptor pattern, see the module documentation.
+
+    Note
+    ----
+    As for ``DecayChain``, every particle can only decay in a single way within a match.
+    """
+
+    __slots__ = ("_trees", "descriptor")
+
+    def __init__(self, descriptor: str) -> None:
+        """
+        Default constructor.
+
+        Parameters
+        ----------
+        descriptor: str
+            The pattern, e.g. ``'[B0 -> (D- -> K+ pi- pi-) ^mu+ ...]CC'``.
+        """
+        self.descriptor = descriptor
+        cc = _CC_PATTERN.fullmatch(descriptor)
+        body = cc.group(1) if cc else descriptor
+        # Mark sub-decays through their mother, "^(D0 -> ...)" -> "(^D0 -> ...)"
+        body = body.replace(_MARK + "(", "(" + _MARK)
+        parser = _compile_parser("{mother} -> {daughters}", "({mother} -> {daughters})")
+        tree = _compile_node(parser.parse(body), descriptor)
+        self._trees: tuple[_PatternNode, ...] = (tree,)
+        if cc:
+            conjugate = tree.charge_conjugate()
+            if conjugate != tree:
+                self._trees += (conjugate,)
+
+    @property
+    def mother(self) -> str:
+        """Mother particle of the pattern (not of its charge conjugate)."""
+        return self._trees[0].name
+
+    @property
+    def marked(self) -> list[str]:
+        """Names of the marked particles of the pattern (not of its charge conjugate)."""
+        return self._trees[0].marked_names()
+
+    def matches(self, chain: DecayChain) -> bool:
+        """
+        Check whether the decay chain matches the pattern.
+        """
+        return self.match(chain) is not None
+
+    def match(self, chain: DecayChain) -> PatternMatch | None:
+        """
+        Match the decay chain against the pattern,
+        returning the part of the chain constrained by the pattern if matched.
+
+        Examples
+        --------
+        >>> dc = DecayChain('D0', {'D0': DecayMode(0.0124, 'K_S0 pi0'),
+        ...                        'K_S0': DecayMode(0.692, 'pi+ pi-')})
+        >>> DecayPattern('D0 -> ^(K_S0 -> pi+ pi-) ...').match(dc)
+        PatternMatch(chain=<DecayChain: D0 -> K_S0 pi0 (1 sub-decays), BF=0.0124>, bf=0.0085808, marked=('K_S0',))
+        """
+        decays = chain.decays
+
+        def match(
+            node: _PatternNode, particle: str, out: dict[str, DecayMode]
+        ) -> float | None:
+            """Product of the matched branching fractions, None if not matched."""
+            if node.daughters is None:
+                return 1.0
+            mode = decays.get(particle)
+            if mode is None or not node.accepts(mode.daughters):
+                return None
+            out[particle] = mode
+            bf = mode.bf
+            for d in node.daughters:
+                sub_bf = match(d, d.name, out)
+                if sub_bf is None:
+                    return None
+                bf *= sub_bf
+            return bf
+
+        for tree in self._trees:
+            matched: dict[str, DecayMode] = {}
+            if tree.name != chain.mother:
+                continue
+            bf = match(tree, tree.name, matched)
+            if bf is not None:
+                return PatternMatch(
+                    DecayChain(chain.mother, matched), bf, tuple(tree.marked_names())
+                )
+        return None
+
+    def find(self, parser: DecFileParser) -> list[PatternMatch]:
+        """
+        Return all decay chains defined in a parsed decay file matching the pattern.
+
+        Only the decay modes of the particles constrained by the pattern are inspected,
+        looked up with the decay modes index of the parser and selected by final state,
+        so that no decay chain is ever fully expanded.
+        Aliases are resolved, e.g. a pattern particle 'D0' matches a decay
+        of 'MyD0' if 'MyD0' is an alias of 'D0'.
+
+        Parameters
+        ----------
+        parser: DecFileParser
+            The decay file parser, after parsing.
+
+        Examples
+        --------
+        >>> from decaylanguage import DecFileParser
+        >>> p = DecFileParser('tests/data/test_example_Dst.dec')    # doctest: +SKIP
+        >>> p.parse()    # doctest: +SKIP
+        >>> DecayPattern('[D*+ -> (D0 -> K- pi+) pi+]CC').find(p)    # doctest: +SKIP
+        """
+        from ..dec.dec import DecayNotFound  # noqa: PLC0415
+
+        aliases = parser.dict_aliases()
+        # Decay modes and final-state index of each particle, filled on demand
+        modes: dict[str, list[tuple[DecayMode, DaughtersDict]]] = {}
+        index: dict[str, dict[FrozenDaughters, list[int]]] = {}
+
+        def modes_of(particle: str) -> list[tuple[DecayMode, DaughtersDict]]:
+            if particle not in modes:
+                try:
+                    trees = parser._find_decay_modes(particle)
+                except DecayNotFound:
+                    trees = ()
+                modes[particle] = []
+                index[particle] = {}
+                for tree in trees:
+                    details = parser._decay_mode_details(tree, False)
+                    mode = DecayMode.from_dict(details, copy=False)
+                    names = typing.cast(list[str], details["fs"])
+                    resolved = DaughtersDict([aliases.get(d, d) for d in names])
+                    index[particle].setdefault(resolved.freeze(), []).append(
+                        len(modes[particle])
+                    )
+                    modes[particle].append((mode, resolved))
+            return modes[particle]
+
+        def candidates(
+            node: _PatternNode, particle: str
+        ) -> list[tuple[DecayMode, DaughtersDict]]:
+            all_modes = modes_of(particle)
+            if node.wildcard:
+                return [m for m in all_modes if node.accepts(m[1])]
+            return [all_modes[i] for i in index[particle].get(node.required, ())]
+
+        Alternatives = list[tuple[float, dict[str, DecayMode]]]
+        memo: dict[tuple[int, str], Alternatives] = {}
+
+        def search(node: _PatternNode, particle: str) -> Alternatives:
+            """All the ways the particle decays as required by the pattern."""
+            if node.daughters is None:
+                return [(1.0, {})]
+            key = (id(node), particle)
+            if key in memo:
+                return memo[key]
+            results: Alternatives = []
+            for mode, _ in candidates(node, particle):
+                partial: Alternatives = [(mode.bf, {particle: mode})]
+                names = set(mode.daughters)
+                for d in node.daughters:
+                    if d.daughters is None:
+                        continue
+                    options = [n for n in names if aliases.get(n, n) == d.name]
+                    partial = [
+                        (bf * sub_bf, {**decays, **sub_decays})
+                        for bf, decays in partial
+                        for n in options
+                        for sub_bf, sub_decays in search(d, n)
+                        # A particle decays in a single way within a chain
+                        if all(decays.get(k, v) is v for k, v in sub_decays.items())
+                    ]
+                results += partial
+            memo[key] = results
+            return results
+
+        matches: list[PatternMatch] = []
+        seen: set[DecayChain] = set()
+        mothers = parser.list_decay_mother_names()
+        for tree in self._trees:
+            marked = tuple(tree.marked_names())
+            for mother in mothers:
+                if aliases.get(mother, mother) != tree.name:
+                    continue
+                for bf, decays in search(tree, mother):
+                    chain = DecayChain(mother, decays)
+                    if chain not in seen:
+                        seen.add(chain)
+                        matches.append(PatternMatch(chain, bf, marked))
+        return matches
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {self.descriptor}>"
@@ -0,0 +1,379 @@
+# Copyright (c) 2018-2026, Eduardo Rodrigues and Henry Schreiner.
+#
+# Distributed under the 3-clause BSD license, see accompanying file LICENSE
+# or https://github.com/scikit-hep/decaylanguage for details.
+
+"""
+Submodule with compact, streamable serialization formats for decay chains.
+
+Two formats are available, both versioned and built on the same record layout:
+
+- ``"binary"``: a little-endian binary stream starting with the magic bytes ``b"DLDC"``;
+- ``"json"``: newline-delimited JSON (NDJSON), one record per line.
+
+Both formats share a single string table per stream for all particle names,
+model names and (JSON-encoded) model parameters and extra metadata.
+A string is written once, in the record where it first appears, and referred to
+by its integer id afterwards. Each record describes one ``DecayChain`` as
+
+- the list of strings added to the table by this record,
+- a flat list of integers:
+  ``[mother, (particle, model, model_params, metadata, n_daughters, daughter_1, ...)...]``,
+- the list of branching fractions, one per decay mode.
+
+Examples
+--------
+>>> from io import BytesIO
+>>> from decaylanguage import DecayChain, DecayMode
+>>> dc = DecayChain('D0', {'D0': DecayMode(0.0124, 'K_S0 pi0', model='PHSP'),
+...                        'K_S0': DecayMode(0.692, 'pi+ pi-')})
+>>> buffer = BytesIO()
+>>> dump_chains([dc, dc], buffer)
+2
+>>> _ = buffer.seek(0)
+>>> load_chains(buffer)
+[<DecayChain: D0 -> K_S0 pi0 (1 sub-decays), BF=0.0124>, <DecayChain: D0 -> K_S0 pi0 (1 sub-decays), BF=0.0124>]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from types import TracebackType
+from typing import IO, Any
+
+from .._compat.typing import Self
+from .decay import DecayChain, DecayMode
+
+FORMAT_VERSION = 1
+FORMATS = ("binary", "json")
+
+_MAGIC = b"DLDC"
+_JSON_FORMAT_NAME = "decaylanguage-decay-chains"
+_FILE_HEADER = struct.Struct("<4sH")
+# Number of new strings, number of decay modes, number of integers,
+# and byte length of the new strings joined with NUL separators
+_RECORD_HEADER = struct.Struct("<IIII")
+# Unsigned 32-bit integer typecode for the array module, platform-dependent
+_UINT32 = next(t for t in "IL" if array(t).itemsize == 4)
+_SWAP_BYTES = sys.byteorder == "big"
+
+_PathOrFile = str | os.PathLike[str] | IO[bytes]
+
+
+class DecayChainWriter:
+    """
+    Streaming writer of ``DecayChain`` instances in a compact serialization format.
+
+    Examples
+    --------
+    >>> with DecayChainWriter('chains.dldc') as writer:    # doctest: +SKIP
+    ...     for chain in chains:
+    ...         writer.write(chain)
+    """
+
+    __slots__ = ("_count", "_file", "_format", "_ids", "_owns_file")
+
+    def __init__(self, file: _PathOrFile, format: str = "binary") -> None:
+        """
+        Default constructor.
+
+        Parameters
+        ----------
+        file: str, path-like or binary file object
+            Output file name or an open binary file object.
+        format: {"binary", "json"}, optional, default="binary"
+            Output serialization format.
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format {format!r}, expected one of {FORMATS}!")
+        self._format = format
+        self._owns_file = isinstance(file, (str, os.PathLike))
+        self._file: IO[bytes] = (
+            open(file, "wb")  # noqa: SIM115, PTH123
+            if isinstance(file, (str, os.PathLike))
+            else file
+        )
+        self._ids: dict[str, int] = {}
+        self._count = 0
+
+        if format == "binary":
+            self._file.write(_FILE_HEADER.pack(_MAGIC, FORMAT_VERSION))
+        else:
+            header = {"format": _JSON_FORMAT_NAME, "version": FORMAT_VERSION}
+            self._file.write(json.dumps(header).encode() + b"\n")
+
+    @property
+    def count(self) -> int:
+        """Number of chains written so far."""
+        return self._count
+
+    def write(self, chain: DecayChain) -> None:
+        """
+        Write one decay chain to the stream.
+
+        Note
+        ----
+        Model parameters and extra metadata must be JSON-serializable.
+        """
+        ids = self._ids
+        new_strings: list[str] = []
+
+        def intern(s: str) -> int:
+            idx = ids.get(s)
+            if idx is None:
+                idx = len(ids)
+                ids[s] = idx
+                new_strings.append(s)
+            return idx
+
+        ints = [intern(chain.mother)]
+        bfs = []
+        for name, dm in chain.decays.items():
+            metadata = dm.metadata
+            params = metadata.get("model_params")
+            extra = {
+                k: v for k, v in metadata.items() if k not in ("model", "model_params")
+            }
+            daughters = dm.daughters.to_list()
+            ints += (
+                intern(name),
+                intern(metadata.get("model") or ""),
+                intern(json.dumps("" if params is None else params)),
+                intern(json.dumps(extra)),
+                len(daughters),
+            )
+            ints += map(intern, daughters)
+            bfs.append(float(dm.bf))
+
+        if self._format == "binary":
+            strings = "\x00".join(new_strings).encode()
+            ints_array = array(_UINT32, ints)
+            bfs_array = array("d", bfs)
+            if _SWAP_BYTES:  # pragma: no cover
+                ints_array.byteswap()
+                bfs_array.byteswap()
+            self._file.write(
+                _RECORD_HEADER.pack(len(new_strings), len(bfs), len(ints), len(strings))
+            )
+            self._file.write(strings)
+            self._file.write(bfs_array.tobytes())
+            self._file.write(ints_array.tobytes())
+        else:
+            record = json.dumps([new_strings, ints, bfs], separators=(",", ":"))
+            self._file.write(record.encode() + b"\n")
+        self._count += 1
+
+    def write_many(self, chains: Iterable[DecayChain]) -> None:
+        """
+        Write several decay chains to the stream.
+        """
+        for chain in chains:
+            self.write(chain)
+
+    def close(self) -> None:
+        """
+        Flush the stream, closing the file if opened by the writer.
+        """
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class DecayChainReader:
+    """
+    Streaming reader of ``DecayChain`` instances written by ``DecayChainWriter``.
+    The serialization format is detected from the stream header.
+
+    Examples
+    --------
+    >>> with DecayChainReader('chains.dldc') as reader:    # doctest: +SKIP
+    ...     for chain in reader:
+    ...         print(chain)
+    """
+
+    __slots__ = ("_decoded", "_file", "_format", "_owns_file", "_strings")
+
+    def __init__(self, file: _PathOrFile) -> None:
+        """
+        Default constructor.
+
+        Parameters
+        ----------
+        file: str, path-like or binary file object
+            Input file name or an open binary file object.
+        """
+        self._owns_file = isinstance(file, (str, os.PathLike))
+        self._file: IO[bytes] = (
+            open(file, "rb")  # noqa: SIM115, PTH123
+            if isinstance(file, (str, os.PathLike))
+            else file
+        )
+        self._strings: list[str] = []
+        # Decoded JSON model parameters and metadata, for immutable values only
+        self._decoded: dict[int, Any] = {}
+
+        start = self._file.read(len(_MAGIC))
+        if start == _MAGIC:
+            self._format = "binary"
+            (version,) = struct.unpack("<H", self._file.read(2))
+        else:
+            self._format = "json"
+            try:
+                header = json.loads(start + self._file.readline())
+            except ValueError:
+                header = {}
+            if (
+                not isinstance(header, dict)
+                or header.get("format") != _JSON_FORMAT_NAME
+            ):
+                self.close()
+                raise ValueError("Input is not a serialized stream of decay chains!")
+            version = header.get("version")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(
+                f"Unsupported serialization format version {version}, expected {FORMAT_VERSION}!"
+            )
+
+    @property
+    def format(self) -> str:
+        """Serialization format of the input stream, "binary" or "json"."""
+        return self._format
+
+    def _decode(self, idx: int) -> Any:
+        value = self._decoded.get(idx)
+        if value is not None:
+            return value
+        value = json.loads(self._strings[idx])
+        # Never share mutable values between decay modes
+        if not isinstance(value, (list, dict)) or not value:
+            self._decoded[idx] = value
+        return value
+
+    def _build_chain(self, ints: Any, bfs: Any) -> DecayChain:
+        strings = self._strings
+        decode = self._decode
+        decays: dict[str, DecayMode] = {}
+        pos = 1
+        for bf in bfs:
+            name, model, params, extra, n = ints[pos : pos + 5]
+            pos += 5
+            daughters = [strings[i] for i in ints[pos : pos + n]]
+            pos += n
+            decays[strings[name]] = DecayMode(
+                bf,
+                daughters,
+                model=strings[model],
+                model_params=decode(params),
+                **decode(extra),
+            )
+        return DecayChain(strings[ints[0]], decays)
+
+    def _read_exactly(self, size: int) -> bytes:
+        data = self._file.read(size)
+        if len(data) != size:
+            raise ValueError("Truncated decay chain stream!")
+        return bytes(data)
+
+    def _read_binary_record(self) -> DecayChain | None:
+        header = self._file.read(_RECORD_HEADER.size)
+        if not header:
+            return None
+        if len(header) != _RECORD_HEADER.size:
+            raise ValueError("Truncated decay chain stream!")
+        n_strings, n_modes, n_ints, n_bytes = _RECORD_HEADER.unpack(header)
+        if n_strings:
+            self._strings += self._read_exactly(n_bytes).decode().split("\x00")
+        bfs = array("d")
+        bfs.frombytes(self._read_exactly(8 * n_modes))
+        ints = array(_UINT32)
+        ints.frombytes(self._read_exactly(4 * n_ints))
+        if _SWAP_BYTES:  # pragma: no cover
+            bfs.byteswap()
+            ints.byteswap()
+        return self._build_chain(ints, bfs)
+
+    def __iter__(self) -> Iterator[DecayChain]:
+        if self._format == "binary":
+            while (chain := self._read_binary_record()) is not None:
+                yield chain
+        else:
+            for line in self._file:
+                if not line.strip():
+                    continue
+                new_strings, ints, bfs = json.loads(line)
+                self._strings += new_strings
+                yield self._build_chain(ints, bfs)
+
+    def close(self) -> None:
+        """
+        Close the file if opened by the reader.
+        """
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def dump_chains(
+    chains: Iterable[DecayChain],
+    file: _PathOrFile,
+    *,
+    format: str = "binary",
+) -> int:
+    """
+    Serialize decay chains to a file, returning the number of chains written.
+
+    Parameters
+    ----------
+    chains: iterable of ``DecayChain``
+        The decay chains to serialize.
+    file: str, path-like or binary file object
+        Output file name or an open binary file object.
+    format: {"binary", "json"}, optional, default="binary"
+        Output serialization format.
+    """
+    with DecayChainWriter(file, format=format) as writer:
+        writer.write_many(chains)
+        return writer.count
+
+
+def iter_chains(file: _PathOrFile) -> Iterator[DecayChain]:
+    """
+    Lazily iterate over the decay chains serialized in a file.
+    """
+    with DecayChainReader(file) as reader:
+        yield from reader
+
+
+def load_chains(file: _PathOrFile) -> list[DecayChain]:
+    """
+    Load all decay chains serialized in a file.
+    """
+    return list(iter_chains(file))
@@ -11,20 +11,337 @@ see the ``DecFileParser`` class.
 
 from __future__ import annotations
 
+import contextlib
+import hashlib
 import html
 import itertools
+import json
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
 from collections.abc import Iterable
-from typing import Any
-
-import graphviz
-from particle import latex_to_html_name
-from particle.converters.bimap import DirectionalMap, DirectionalMaps
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cache, lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar, NamedTuple
 
 from decaylanguage.decay.decay import DecayChain, _has_no_subdecay
 
-_EvtGen2LatexNameMap: DirectionalMap[str, str]
-_Latex2EvtGenNameMap: DirectionalMap[str, str]
-_EvtGen2LatexNameMap, _Latex2EvtGenNameMap = DirectionalMaps("EvtGenName", "LaTexName")
+# graphviz and the particle name conversion tables are only imported when first used
+if TYPE_CHECKING:
+    import graphviz
+    from particle.converters.bimap import DirectionalMap
+
+    from ..dec.dec import DecFileParser
+
+
+@cache
+def _evtgen_to_latex_name_map() -> DirectionalMap[str, str]:
+    from particle.converters.bimap import DirectionalMaps  # noqa: PLC0415
+
+    evtgen_to_latex, _ = DirectionalMaps("EvtGenName", "LaTexName")
+    return evtgen_to_latex
+
+
+@cache
+def _safe_html_name(name: str) -> str:
+    """
+    Get a safe HTML name from the EvtGen name.
+
+    Note
+    ----
+    The match is done using a conversion map rather than via
+    ``Particle.from_evtgen_name(name).html_name`` for 2 reasons:
+    - Some decay-file-specific "particle" names (e.g. cs_0)
+      are not in the PDG table.
+    - No need to load all particle information if all that's needed
+      is a match EvtGen - HTML name.
+    """
+    from particle import latex_to_html_name  # noqa: PLC0415
+
+    try:
+        return latex_to_html_name(_evtgen_to_latex_name_map()[name])
+    except Exception:  # noqa: BLE001
+        # Escape characters such as &, <, > (legal in .dec Alias
+        # statements) so the fallback yields valid HTML-like DOT labels.
+        return html.escape(name)
+
+
+@lru_cache(maxsize=4096)
+def _html_table_label(
+    names: tuple[str, ...],
+    add_tags: bool = False,
+    bgcolor: str = "#9abad6",
+) -> str:
+    """
+    HTML-like DOT label of a table of particle names.
+    """
+    if add_tags:
+        cells = "".join(
+            f'<TR><TD BORDER="1" CELLPADDING="5" PORT="p{i}">{_safe_html_name(n)}</TD></TR>'
+            for i, n in enumerate(names)
+        )
+        return (
+            f'<<TABLE BORDER="0" CELLSPACING="0" BGCOLOR="{bgcolor}">{cells}</TABLE>>'
+        )
+    cells = "".join(
+        f'<TD BORDER="0" CELLPADDING="2">{_safe_html_name(n)}</TD>' for n in names
+    )
+    return f'<<TABLE BORDER="0" CELLSPACING="0" CELLPADDING="0" BGCOLOR="{bgcolor}"><TR>{cells}</TR></TABLE>>'
+
+
+def _plural(n: int, noun: str) -> str:
+    return f"{n} {noun}" if n == 1 else f"{n} {noun}s"
+
+
+@lru_cache(maxsize=4096)
+def _quote(identifier: str) -> str:
+    """
+    DOT quoting of IDs, e.g. edge labels, the very one used by ``graphviz.Digraph`` methods.
+    """
+    from graphviz.quoting import quote  # noqa: PLC0415
+
+    return str(quote(identifier))
+
+
+class RenderCacheInfo(NamedTuple):
+    """
+    Statistics of a ``RenderCache``: the numbers of renderings served from memory,
+    served from disk and actually run, and the current and maximum numbers
+    of renderings held in memory.
+    """
+
+    hits: int
+    disk_hits: int
+    misses: int
+    currsize: int
+    maxsize: int
+
+
+def _pipe_dot(
+    source: str,
+    engine: str,
+    format: str,
+    renderer: str | None = None,
+    formatter: str | None = None,
+) -> bytes:
+    """
+    Lay out and render a DOT source with the Graphviz executables.
+    """
+    import graphviz  # noqa: PLC0415
+
+    return bytes(
+        graphviz.pipe(
+            engine, format, source.encode(), renderer=renderer, formatter=formatter
+        )
+    )
+
+
+# Names of the files of the on-disk render cache, "<sha256 of the key>.<format>".
+# Other files in the cache directory are never counted, pruned nor removed.
+_RENDER_CACHE_FILE_NAME = re.compile(r"[0-9a-f]{64}\.[\w\-]+")
+
+
+class RenderCache:
+    """
+    Cache of rendered DOT sources, e.g. SVG or PNG images of decay chains,
+    keyed on the hash of the DOT source and of the rendering settings.
+
+    Renderings are held in an in-memory LRU cache and, optionally,
+    in files in a directory, which persist across sessions.
+    ``DecayChainViewer`` uses the cache set in ``DecayChainViewer.render_cache``
+    for the display in notebooks.
+
+    Examples
+    --------
+    >>> DecayChainViewer.render_cache = RenderCache(maxsize=32, directory='~/.cache/decaylanguage')    # doctest: +SKIP
+    >>> DecayChainViewer.render_cache.cache_info()    # doctest: +SKIP
+    RenderCacheInfo(hits=0, disk_hits=0, misses=0, currsize=0, maxsize=32)
+    """
+
+    __slots__ = (
+        "_disk_hits",
+        "_hits",
+        "_lock",
+        "_memory",
+        "_misses",
+        "directory",
+        "max_disk_bytes",
+        "maxsize",
+    )
+
+    def __init__(
+        self,
+        maxsize: int = 64,
+        directory: str | os.PathLike[str] | None = None,
+        max_disk_bytes: int | None = None,
+    ) -> None:
+        """
+        Default constructor.
+
+        Parameters
+        ----------
+        maxsize: int, optional, default=64
+            Maximum number of renderings held in memory.
+        directory: str or path-like, optional, default=None
+            Directory of the on-disk cache, created if needed.
+            Default is no on-disk cache.
+        max_disk_bytes: int, optional, default=None
+            Maximum total size of the files in the on-disk cache,
+            the least recently used files being removed first. Default is no limit.
+
+        Note
+        ----
+        Only the files written by the cache, named after the cache keys,
+        are taken into account and removed, so the directory can be shared.
+        """
+        if maxsize < 0:
+            raise ValueError(f"maxsize must be non-negative, not {maxsize}!")
+        self.maxsize = maxsize
+        self.directory = None if directory is None else Path(directory).expanduser()
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._disk_hits = self._misses = 0
+
+    @staticmethod
+    def key(
+        source: str,
+        engine: str,
+        format: str,
+        renderer: str | None = None,
+        formatter: str | None = None,
+    ) -> str:
+        """
+        Cache key of a rendering, the hash of the DOT source and rendering settings.
+        """
+        settings = f"{engine}\0{format}\0{renderer or ''}\0{formatter or ''}\0"
+        return hashlib.sha256((settings + source).encode()).hexdigest()
+
+    def render(
+        self,
+        source: str,
+        engine: str = "dot",
+        format: str = "svg",
+        renderer: str | None = None,
+        formatter: str | None = None,
+    ) -> bytes:
+        """
+        Return the rendering of a DOT source, from the cache if available.
+
+        Parameters
+        ----------
+        source: str
+            The DOT source.
+        engine: str, optional, default="dot"
+            Graphviz layout engine.
+        format: str, optional, default="svg"
+            Output format, e.g. "svg" or "png".
+        renderer, formatter: str, optional, default=None
+            Graphviz output renderer and formatter.
+        """
+        key = self.key(source, engine, format, renderer, formatter)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._hits += 1
+                return data
+
+        path = None if self.directory is None else self.directory / f"{key}.{format}"
+        data = None if path is None else self._read(path)
+        if data is not None:
+            with self._lock:
+                self._disk_hits += 1
+        else:
+            data = _pipe_dot(source, engine, format, renderer, formatter)
+            with self._lock:
+                self._misses += 1
+            if path is not None:
+                self._write(path, data)
+
+        with self._lock:
+            if self.maxsize > 0:
+                self._memory[key] = data
+                self._memory.move_to_end(key)
+                while len(self._memory) > self.maxsize:
+                    self._memory.popitem(last=False)
+        return data
+
+    @staticmethod
+    def _read(path: Path) -> bytes | None:
+        """Rendering cached in the file, None if not (readably) cached."""
+        try:
+            data = path.read_bytes()
+            # Keep track of the least recently used files
+            path.touch()
+        except OSError:
+            return None
+        return data
+
+    def _write(self, path: Path, data: bytes) -> None:
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(data)
+            tmp.replace(path)
+            if self.max_disk_bytes is not None:
+                self._prune(path.parent, self.max_disk_bytes)
+        except OSError:
+            # Read-only, full or otherwise unwritable cache directory,
+            # the rendering is only kept in memory
+            with contextlib.suppress(OSError):
+                tmp.unlink(missing_ok=True)
+
+    @staticmethod
+    def _prune(directory: Path, max_disk_bytes: int) -> None:
+        """Remove the least recently used files of the cache beyond the size limit."""
+        files = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and _RENDER_CACHE_FILE_NAME.fullmatch(entry.name):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, file in sorted(files):
+            if total <= max_disk_bytes:
+                break
+            Path(file).unlink(missing_ok=True)
+            total -= size
+
+    def cache_info(self) -> RenderCacheInfo:
+        """
+        Return the cache statistics.
+        """
+        with self._lock:
+            return RenderCacheInfo(
+                self._hits,
+                self._disk_hits,
+                self._misses,
+                len(self._memory),
+                self.maxsize,
+            )
+
+    def clear(self, disk: bool = False) -> None:
+        """
+        Clear the in-memory cache and the statistics,
+        as well as the on-disk cache if requested.
+        Only the files written by the cache are removed from its directory.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._hits = self._disk_hits = self._misses = 0
+        if disk and self.directory is not None and self.directory.is_dir():
+            for file in self.directory.iterdir():
+                if _RENDER_CACHE_FILE_NAME.fullmatch(file.name) and file.is_file():
+                    file.unlink(missing_ok=True)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {self.cache_info()}, directory={self.directory}>"
+
+
+# Formats of the notebook display MIME types emitted by graphviz, in its order
+_MIME_FORMATS = {"image/jpeg": "jpeg", "image/png": "png", "image/svg+xml": "svg"}
 
 
 class GraphNotBuiltError(RuntimeError):
@@ -47,14 +364,35 @@ class DecayChainViewer:
     When not in notebooks the graph can easily be visualized with the
     ``graphviz.Digraph.render`` or ``graphviz.Digraph.view`` functions, e.g.:
     >>> dcv.graph.render(filename="test", format="pdf", view=True, cleanup=True)    # doctest: +SKIP
+
+    Renderings displayed in notebooks are cached, see ``RenderCache``.
     """
 
-    __slots__ = ("_chain", "_counter", "_graph", "_show_effective_bf")
+    # Cache of the renderings displayed in notebooks
+    render_cache: ClassVar[RenderCache] = RenderCache()
+
+    __slots__ = (
+        "_attrs",
+        "_body",
+        "_chain",
+        "_counter",
+        "_deduplicate",
+        "_graph",
+        "_max_depth",
+        "_max_modes_per_node",
+        "_min_effective_bf",
+        "_show_effective_bf",
+    )
 
     def __init__(
         self,
         decaychain: dict[str, list[dict[str, float | str | list[Any]]]] | DecayChain,
         show_effective_bf: bool = False,
+        *,
+        deduplicate: bool = False,
+        max_depth: int | None = None,
+        max_modes_per_node: int | None = None,
+        min_effective_bf: float | None = None,
         **attrs: dict[str, bool | int | float | str],
     ) -> None:
         """
@@ -70,6 +408,21 @@ class DecayChainViewer:
             If True, display the effective branching fraction on the terminal node (node with no
             subchains). The effective branching fraction is the product of all branching fractions
             along the chain from the mother particle to the terminal node. Default is False.
+        deduplicate: bool, optional, default=False
+            If True, draw every distinct sub-decay, i.e. a particle with its decay modes,
+            only once, and link all its occurrences to it.
+            The effective branching fractions of a shared sub-decay are those
+            of its occurrence with the largest effective branching fraction.
+        max_depth: int, optional, default=None
+            Maximum number of decay levels to draw, deeper decays being collapsed
+            into a summary node. The decays of the mother particle are at level 1.
+        max_modes_per_node: int, optional, default=None
+            Maximum number of decay modes drawn for each decaying particle,
+            keeping those with the largest branching fractions.
+            The other decay modes are collapsed into a summary node.
+        min_effective_bf: float, optional, default=None
+            Decay modes with an effective branching fraction below this value
+            are collapsed into a summary node.
         attrs: optional
             User input ``graphviz.Digraph`` class attributes.
 
@@ -91,139 +444,243 @@ class DecayChainViewer:
         # Store whether to show effective branching fractions
         self._show_effective_bf = show_effective_bf
 
+        # Store the level-of-detail options
+        if max_depth is not None and max_depth < 0:
+            raise ValueError(f"max_depth must be non-negative, not {max_depth}!")
+        if max_modes_per_node is not None and max_modes_per_node < 1:
+            raise ValueError(
+                f"max_modes_per_node must be positive, not {max_modes_per_node}!"
+            )
+        self._deduplicate = deduplicate
+        self._max_depth = max_depth
+        self._max_modes_per_node = max_modes_per_node
+        self._min_effective_bf = min_effective_bf
+
         # Per-instance node counter, so that rendering the same chain
         # twice produces identical, reproducible DOT output.
         self._counter = itertools.count()
 
-        # Instantiate the digraph with defaults possibly overridden by user attributes
-        self._graph = self._instantiate_graph(**attrs)
+        # The digraph, with defaults possibly overridden by user attributes,
+        # is only instantiated when first requested
+        self._attrs = attrs
+        self._graph: graphviz.Digraph | None = None
 
-        # Build the actual graph from the input decay chain structure
+        # Build the DOT statements of the graph from the input decay chain structure
+        self._body: list[str] = []
         self._build_decay_graph()
 
     def _build_decay_graph(self) -> None:
         """
-        Recursively navigate the decay chain tree and produce a Digraph
-        in the DOT language.
-        """
+        Recursively navigate the decay chain tree and produce the statements
+        of a Digraph in the DOT language.
 
-        def safe_html_name(name: str) -> str:
-            """
-            Get a safe HTML name from the EvtGen name.
-
-            Note
-            ----
-            The match is done using a conversion map rather than via
-            ``Particle.from_evtgen_name(name).html_name`` for 2 reasons:
-            - Some decay-file-specific "particle" names (e.g. cs_0)
-              are not in the PDG table.
-            - No need to load all particle information if all that's needed
-              is a match EvtGen - HTML name.
-            """
-            try:
-                return latex_to_html_name(_EvtGen2LatexNameMap[name])
-            except Exception:  # noqa: BLE001
-                # Escape characters such as &, <, > (legal in .dec Alias
-                # statements) so the fallback yields valid HTML-like DOT labels.
-                return html.escape(name)
-
-        def html_table_label(
-            names: list[str],
-            add_tags: bool = False,
-            bgcolor: str = "#9abad6",
-        ) -> str:
-            if add_tags:
-                label = f'<<TABLE BORDER="0" CELLSPACING="0" BGCOLOR="{bgcolor}">'
-            else:
-                label = f'<<TABLE BORDER="0" CELLSPACING="0" CELLPADDING="0" BGCOLOR="{bgcolor}"><TR>'
-            for i, n in enumerate(names):
-                if add_tags:
-                    label += f'<TR><TD BORDER="1" CELLPADDING="5" PORT="p{i}">{safe_html_name(n)}</TD></TR>'
-                else:
-                    label += f'<TD BORDER="0" CELLPADDING="2">{safe_html_name(n)}</TD>'
-            label += "{tr}</TABLE>>".format(tr="" if add_tags else "</TR>")
-            return label
+        The DOT statements are written directly, exactly as the ``graphviz.Digraph``
+        ``node`` and ``edge`` methods would, without their per-call overhead.
+        """
+        body = self._body
+        counter = self._counter
+        show_effective_bf = self._show_effective_bf
 
         def new_node_no_subchain(list_parts: list[str], effective_bf: float) -> str:
-            label = html_table_label(list_parts, bgcolor="#eef3f8")
-            r = f"dec{next(self._counter)}"
-            self.graph.node(r, label=label, style="filled", fillcolor="#eef3f8")
-            if self._show_effective_bf:
-                bf_node = f"dec{next(self._counter)}"
-                self.graph.node(
-                    bf_node,
-                    label=f"eff BF: {effective_bf:.4g}",
-                    shape="none",
-                    fontcolor="#4c4c4c",
+            label = _html_table_label(tuple(list_parts), bgcolor="#eef3f8")
+            r = f"dec{next(counter)}"
+            body.append(f'\t{r} [label={label} fillcolor="#eef3f8" style=filled]\n')
+            if show_effective_bf:
+                bf_node = f"dec{next(counter)}"
+                # Always quoted, being neither a DOT ID nor an HTML-like string
+                body.append(
+                    f'\t{bf_node} [label="eff BF: {effective_bf:.4g}" fontcolor="#4c4c4c" shape=none]\n'
                 )
-                self.graph.edge(r, bf_node, style="invis")
+                body.append(f"\t{r} -> {bf_node} [style=invis]\n")
             return r
 
         def new_node_with_subchain(list_parts: list[Any]) -> str:
-            _list_parts = [
+            _list_parts = tuple(
                 next(iter(p.keys())) if isinstance(p, dict) else p for p in list_parts
-            ]
-            label = html_table_label(_list_parts, add_tags=True)
-            r = f"dec{next(self._counter)}"
-            self.graph.node(r, shape="none", label=label)
+            )
+            label = _html_table_label(_list_parts, add_tags=True)
+            r = f"dec{next(counter)}"
+            body.append(f"\t{r} [label={label} shape=none]\n")
             return r
 
+        def new_collapsed_node(text: str) -> str:
+            r = f"dec{next(counter)}"
+            body.append(
+                f'\t{r} [label={_quote(text)} fontcolor="#4c4c4c" shape=box style=dashed]\n'
+            )
+            return r
+
+        def mode_bf(decay_mode: dict[str, Any]) -> float:
+            return float(decay_mode["bf"])
+
+        def count_modes(subchain: list[Any]) -> int:
+            """Number of decay modes of a sub-chain, including all nested ones."""
+            return sum(
+                1
+                + sum(
+                    count_modes(next(iter(p.values())))
+                    for p in dm["fs"]
+                    if not isinstance(p, str)
+                )
+                for dm in subchain
+            )
+
+        # Identifiers of the distinct sub-decays and, for the shared ones,
+        # their largest effective branching fraction and the node drawn for them
+        subdecay_ids: dict[int, int] = {}
+        shared_bf: dict[int, float] = {}
+        shared_nodes: dict[int, str] = {}
+
+        if self._deduplicate:
+            keys: dict[tuple[Any, ...], int] = {}
+            counts: dict[int, int] = {}
+            max_bf: dict[int, float] = {}
+
+            def subdecay_id(particle: str, subchain: list[Any]) -> int:
+                idx = subdecay_ids.get(id(subchain))
+                if idx is None:
+                    key = (
+                        particle,
+                        tuple(
+                            (
+                                dm["bf"],
+                                tuple(
+                                    p
+                                    if isinstance(p, str)
+                                    else subdecay_id(*next(iter(p.items())))
+                                    for p in dm["fs"]
+                                ),
+                            )
+                            for dm in subchain
+                        ),
+                    )
+                    idx = subdecay_ids[id(subchain)] = keys.setdefault(key, len(keys))
+                return idx
+
+            def visit(subchain: list[Any], effective_bf: float, count: bool) -> None:
+                """
+                Count the occurrences of the sub-decays and find their largest
+                effective branching fraction. Sub-decays nested in a sub-decay
+                already visited are only visited again, without being counted,
+                when reached with a larger effective branching fraction.
+                """
+                for dm in subchain:
+                    _effective_bf = effective_bf * mode_bf(dm)
+                    for p in dm["fs"]:
+                        if isinstance(p, str):
+                            continue
+                        idx = subdecay_id(*next(iter(p.items())))
+                        first = idx not in max_bf
+                        if count:
+                            counts[idx] = counts.get(idx, 0) + 1
+                        if first or _effective_bf > max_bf[idx]:
+                            max_bf[idx] = _effective_bf
+                            visit(
+                                next(iter(p.values())), _effective_bf, count and first
+                            )
+
+            visit(self._chain[next(iter(self._chain.keys()))], 1.0, True)
+            shared_bf = {idx: max_bf[idx] for idx, n in counts.items() if n > 1}
+
+        max_depth = self._max_depth
+        max_modes = self._max_modes_per_node
+        min_bf = self._min_effective_bf
+
+        def link_subdecay(
+            particle: str,
+            subchain: list[dict[str, float | str | list[Any]]],
+            top_node: str,
+            link_pos: int,
+            effective_bf: float,
+            depth: int,
+        ) -> None:
+            idx = subdecay_ids.get(id(subchain))
+            if idx is None or idx not in shared_bf:
+                iterate_chain(subchain, top_node, link_pos, effective_bf, depth)
+                return
+            node = shared_nodes.get(idx)
+            if node is None:
+                label = _html_table_label((particle,), add_tags=True)
+                node = shared_nodes[idx] = f"dec{next(counter)}"
+                body.append(f"\t{node} [label={label} shape=none]\n")
+                iterate_chain(subchain, node, None, shared_bf[idx], depth)
+            body.append(f"\t{top_node}:p{link_pos} -> {node} [style=dashed]\n")
+
         def iterate_chain(
             subchain: list[dict[str, float | str | list[Any]]],
-            top_node: str | None = None,
+            top_node: str,
             link_pos: int | None = None,
             effective_bf: float = 1.0,
+            depth: int = 1,
         ) -> None:
-            if not top_node:
-                top_node = "mother"
-                self.graph.node("mother", shape="none", label=label)
-            n_decaymodes = len(subchain)
-            for idm in range(n_decaymodes):
-                _list_parts = subchain[idm]["fs"]
-                _bf = subchain[idm]["bf"]
+            tail = top_node if link_pos is None else f"{top_node}:p{link_pos}"
+            if max_depth is not None and depth > max_depth:
+                n_modes = len(subchain)
+                n_nested = count_modes(subchain) - n_modes
+                text = _plural(n_modes, "decay mode")
+                if n_nested:
+                    text += f", {_plural(n_nested, 'sub-decay mode')}"
+                _ref = new_collapsed_node(text)
+                body.append(f"\t{tail} -> {_ref} [style=dashed]\n")
+                return
+
+            hidden: list[dict[str, float | str | list[Any]]] = []
+            if max_modes is not None or min_bf is not None:
+                selected = [
+                    dm
+                    for dm in subchain
+                    if min_bf is None or effective_bf * mode_bf(dm) >= min_bf
+                ]
+                if max_modes is not None and len(selected) > max_modes:
+                    kept = sorted(selected, key=mode_bf, reverse=True)[:max_modes]
+                    selected = [dm for dm in selected if any(dm is k for k in kept)]
+                hidden = [dm for dm in subchain if not any(dm is k for k in selected)]
+                subchain = selected
+
+            for decay_mode in subchain:
+                _list_parts = decay_mode["fs"]
+                _bf = decay_mode["bf"]
                 assert isinstance(_list_parts, list)
                 assert isinstance(_bf, (int, float))
                 _effective_bf = effective_bf * float(_bf)
+                edge_label = _quote(str(_bf))
                 if _has_no_subdecay(_list_parts):
                     _ref = new_node_no_subchain(_list_parts, _effective_bf)
-                    if link_pos is None:
-                        self.graph.edge(top_node, _ref, label=str(_bf))
-                    else:
-                        self.graph.edge(f"{top_node}:p{link_pos}", _ref, label=str(_bf))
+                    body.append(f"\t{tail} -> {_ref} [label={edge_label}]\n")
                 else:
                     _ref_1 = new_node_with_subchain(_list_parts)
-                    edge_label = str(_bf)
-                    if link_pos is None:
-                        self.graph.edge(top_node, _ref_1, label=edge_label)
-                    else:
-                        self.graph.edge(
-                            f"{top_node}:p{link_pos}",
-                            _ref_1,
-                            label=edge_label,
-                        )
+                    body.append(f"\t{tail} -> {_ref_1} [label={edge_label}]\n")
                     for i, _p in enumerate(_list_parts):
                         if not isinstance(_p, str):
                             _k = next(iter(_p.keys()))
-                            iterate_chain(
-                                _p[_k],
-                                top_node=_ref_1,
-                                link_pos=i,
-                                effective_bf=_effective_bf,
+                            link_subdecay(
+                                _k, _p[_k], _ref_1, i, _effective_bf, depth + 1
                             )
 
+            if hidden:
+                hidden_bf = sum(mode_bf(dm) for dm in hidden)
+                _ref = new_collapsed_node(_plural(len(hidden), "more decay mode"))
+                body.append(
+                    f"\t{tail} -> {_ref} [label={_quote(f'{hidden_bf:.4g}')} style=dashed]\n"
+                )
+
         k = next(iter(self._chain.keys()))
-        label = html_table_label([k], add_tags=True, bgcolor="#568dba")
-        sc = self._chain[k]
+        label = _html_table_label((k,), add_tags=True, bgcolor="#568dba")
+        body.append(f"\tmother [label={label} shape=none]\n")
 
         # Actually build the whole decay chain, iteratively
-        iterate_chain(sc)
+        iterate_chain(self._chain[k], top_node="mother")
 
     @property
     def graph(self) -> graphviz.Digraph:
         """
-        Get the actual ``graphviz.Digraph`` object.
+        Get the actual ``graphviz.Digraph`` object,
+        instantiated on first access.
         The user now has full control ...
         """
+        if self._graph is None:
+            self._graph = self._instantiate_graph(**self._attrs)
+            self._graph.body.extend(self._body)
         return self._graph
 
     def to_string(self) -> str:
@@ -256,6 +713,8 @@ class DecayChainViewer:
         arguments = self._get_default_arguments()
         arguments.update(**attrs)  # type: ignore[call-overload]
 
+        import graphviz  # noqa: PLC0415
+
         return graphviz.Digraph(
             graph_attr=graph_attr, node_attr=node_attr, edge_attr=edge_attr, **arguments
         )
@@ -288,13 +747,167 @@ class DecayChainViewer:
         include: Iterable[str] | None = None,
         exclude: Iterable[str] | None = None,
         **kwargs: Any,
-    ) -> Any:  # pragma: no cover
+    ) -> Any:
         """
-        IPython display helper.
+        IPython display helper, with the renderings cached in ``render_cache``.
+        As for ``graphviz.Digraph``, the MIME types to display are selected
+        with ``include`` and ``exclude``, defaulting to that of the format
+        set with ``graphviz.set_jupyter_format``.
         """
-        try:
-            return self._graph._repr_mimebundle_(
-                include=include, exclude=exclude, **kwargs
-            )
-        except AttributeError:
-            return {"image/svg+xml": self._graph._repr_svg_()}  # for graphviz < 0.19
+        graph = self.graph
+        mimetypes = (
+            set(include)
+            if include is not None
+            else {getattr(graph, "_jupyter_mimetype", "image/svg+xml")}
+        )
+        mimetypes -= set(exclude or ())
+        bundle: dict[str, str | bytes] = {}
+        for mimetype, format in _MIME_FORMATS.items():
+            if mimetype in mimetypes:
+                data = self.render_cache.render(
+                    graph.source,
+                    graph.engine,
+                    format,
+                    getattr(graph, "renderer", None),
+                    getattr(graph, "formatter", None),
+                )
+                bundle[mimetype] = (
+                    data.decode(graph.encoding) if format == "svg" else data
+                )
+        return bundle
+
+
+# Name of the file recording the hashes of the DOT sources of rendered outputs
+_RENDER_MANIFEST = ".decaylanguage-render.json"
+_UNSAFE_FILE_NAME_CHARS = re.compile(r"[^\w+\-.()]")
+
+
+def _render_dot(source: str, engine: str, format: str, path: Path) -> None:
+    """
+    Lay out and render a DOT source to a file with the Graphviz executables.
+    """
+    data = _pipe_dot(source, engine, format)
+    # Write then rename, so that interrupted runs never leave partial outputs
+    tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def render_decay_chains(
+    parser: DecFileParser,
+    mothers: Iterable[str] | None = None,
+    outdir: str | os.PathLike[str] = ".",
+    format: str = "svg",
+    jobs: int | None = None,
+    *,
+    stable_particles: Iterable[str] = (),
+    **options: Any,
+) -> dict[str, Path]:
+    """
+    Render the decay chains of many particles to files, one per mother particle.
+
+    The DOT sources are built one after the other, while the layouts,
+    done by the external Graphviz executables, run concurrently.
+    The hash of the DOT source of every output is recorded in the output directory,
+    and outputs whose DOT source has not changed since the last run are not rendered again.
+
+    Parameters
+    ----------
+    parser: DecFileParser
+        The decay file parser, after parsing.
+    mothers: iterable of str, optional, default=None
+        The mother particles. Default is all particles with decays defined in the parser.
+    outdir: str or path-like, optional, default="."
+        Output directory, created if needed.
+    format: str, optional, default="svg"
+        Output format, any format supported by Graphviz, e.g. "svg", "pdf" or "png".
+    jobs: int, optional, default=None
+        Number of layouts run concurrently. Default is the number of CPUs.
+    stable_particles: iterable of str, optional, default=()
+        Particles not to be decayed further, see ``DecFileParser.build_decay_chains``.
+    options: optional
+        Options passed to ``DecayChainViewer``, e.g. ``deduplicate=True``
+        or ``graphviz.Digraph`` attributes.
+
+    Returns
+    -------
+    out: dict[str, Path]
+        The output file of every mother particle.
+
+    Examples
+    --------
+    >>> dfp = DecFileParser('my-decay-file.dec')    # doctest: +SKIP
+    >>> dfp.parse()    # doctest: +SKIP
+    >>> render_decay_chains(dfp, ['D*+', 'D*-'], 'figures', format='pdf', jobs=4)    # doctest: +SKIP
+    {'D*+': PosixPath('figures/D_+.pdf'), 'D*-': PosixPath('figures/D_-.pdf')}
+    """
+    if jobs is not None and jobs < 1:
+        raise ValueError(f"jobs must be positive, not {jobs}!")
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    manifest_path = outdir / _RENDER_MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+    if not isinstance(manifest, dict):
+        manifest = {}
+
+    all_mothers = parser.list_decay_mother_names()
+    mothers = all_mothers if mothers is None else list(dict.fromkeys(mothers))
+    stable = list(stable_particles)
+
+    # Distinct names mapped to the same file name, e.g. "D*+" and "D_+",
+    # are all told apart by a hash of the name. Clashes are found among all
+    # the mothers of the parser, so that file names do not depend on the mothers rendered
+    names = {
+        mother: _UNSAFE_FILE_NAME_CHARS.sub("_", mother)
+        for mother in dict.fromkeys([*all_mothers, *mothers])
+    }
+    clashing = {name for name, count in Counter(names.values()).items() if count > 1}
+
+    outputs: dict[str, Path] = {}
+    pending: list[tuple[str, str, Future[None]]] = []
+    try:
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+            for mother in mothers:
+                name = names[mother]
+                if name in clashing:
+                    name += "_" + hashlib.sha256(mother.encode()).hexdigest()[:8]
+                path = outdir / f"{name}.{format}"
+                outputs[mother] = path
+
+                chain: dict[str, Any] = parser.build_decay_chains(
+                    mother, stable_particles=stable
+                )
+                graph = DecayChainViewer(chain, **options).graph
+                source = graph.source
+                digest = hashlib.sha256(
+                    f"{graph.engine}\0{format}\0{source}".encode()
+                ).hexdigest()
+                if manifest.get(path.name) == digest and path.exists():
+                    continue
+                manifest.pop(path.name, None)
+                pending.append(
+                    (
+                        path.name,
+                        digest,
+                        pool.submit(_render_dot, source, graph.engine, format, path),
+                    )
+                )
+    finally:
+        # All submitted renderings are over, record every successful one
+        for file_name, digest, future in pending:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                manifest[file_name] = digest
+        manifest_path.write_text(
+            json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8"
+        )
+
+    for _, _, future in pending:
+        future.result()
+    return outputs
@@ -5,19 +5,42 @@
 
 from __future__ import annotations
 
-from .errors import LineFailure
-from .particleutils import charge_conjugate_name
-from .utilities import (
-    DescriptorFormat,
-    filter_lines,
-    iter_flatten,
-    split,
+from typing import TYPE_CHECKING
+
+from .._lazy import lazy_getattr
+
+if TYPE_CHECKING:
+    from .errors import LineFailure
+    from .particleutils import charge_conjugate_name
+    from .utilities import (
+        DescriptorFormat,
+        DescriptorFormatter,
+        current_descriptor_formatter,
+        filter_lines,
+        iter_flatten,
+        split,
+    )
+
+__getattr__ = lazy_getattr(
+    __name__,
+    {
+        "DescriptorFormat": ".utilities",
+        "DescriptorFormatter": ".utilities",
+        "LineFailure": ".errors",
+        "charge_conjugate_name": ".particleutils",
+        "current_descriptor_formatter": ".utilities",
+        "filter_lines": ".utilities",
+        "iter_flatten": ".utilities",
+        "split": ".utilities",
+    },
 )
 
 __all__ = (
     "DescriptorFormat",
+    "DescriptorFormatter",
     "LineFailure",
     "charge_conjugate_name",
+    "current_descriptor_formatter",
     "filter_lines",
     "iter_flatten",
     "split",
@@ -8,16 +8,11 @@ from __future__ import annotations
 
 import re
 from functools import lru_cache
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from particle import Particle, ParticleNotFound
-from particle.converters import (
-    EvtGen2PDGNameMap,
-    EvtGenName2PDGIDBiMap,
-    PDG2EvtGenNameMap,
-)
-from particle.exceptions import MatchingIDNotFound
-from particle.particle.enums import Charge_mapping
+# The particle package is only imported when first used, as loading its tables is costly
+if TYPE_CHECKING:
+    from particle import Particle
 
 cacher = lru_cache(maxsize=None)
 
@@ -53,6 +48,14 @@ def charge_conjugate_name(name: str, pdg_name: bool = False) -> str:
         Either the EvtGen or PDG charge-conjugate particle name
         depending on the value of parameter ``pdg_name``.
     """
+    from particle import Particle  # noqa: PLC0415
+    from particle.converters import (  # noqa: PLC0415
+        EvtGen2PDGNameMap,
+        EvtGenName2PDGIDBiMap,
+        PDG2EvtGenNameMap,
+    )
+    from particle.exceptions import MatchingIDNotFound  # noqa: PLC0415
+
     if pdg_name:
         try:
             ccname = charge_conjugate_name(PDG2EvtGenNameMap[name])
@@ -77,6 +80,8 @@ def particle_from_string_name(name: str) -> Particle:
 
     Note: the best match is returned.
     """
+    from particle import ParticleNotFound  # noqa: PLC0415
+
     matches = particle_list_from_string_name(name)
     if matches:
         return matches[0]
@@ -87,6 +92,7 @@ def particle_from_string_name(name: str) -> Particle:
 
 def particle_list_from_string_name(name: str) -> list[Particle]:
     "Get a list of particles from an AmpGen style name."
+    from particle import Particle, ParticleNotFound  # noqa: PLC0415
 
     # Forcible override
     particle = None
@@ -125,6 +131,9 @@ def _from_group_dict_list(mat: dict[str, Any]) -> list[Particle]:
     Internal helper class for the functions ``from_string`` and ``from_string_list``
     for fuzzy finding of particle names used by AmpGen.
     """
+    from particle import Particle, ParticleNotFound  # noqa: PLC0415
+    from particle.particle.enums import Charge_mapping  # noqa: PLC0415
+
     kw: dict[str, Any] = {
         "particle": (
             False if mat["bar"] is not None else True if mat["charge"] == "0" else None
@@ -6,8 +6,8 @@
 from __future__ import annotations
 
 import string
-from collections.abc import Iterator
-from copy import copy
+from collections.abc import Callable, Iterator, Mapping, MutableMapping
+from contextvars import ContextVar, Token
 from re import Pattern
 from typing import Any, ClassVar
 
@@ -64,10 +64,216 @@ def filter_lines(
     return output, new_inp
 
 
-class DescriptorFormat:
+def _compile_template(pattern: str) -> Callable[[str, str], str]:
     """
-    Class to help with setting the decay descriptor format. The format is stored as a
-    class-level variable: ``DescriptorFormat.config``.
+    Compile a descriptor pattern into a function of the mother and daughters strings,
+    avoiding ``str.format`` for the usual patterns.
+    """
+    pieces = list(string.Formatter().parse(pattern))
+    if any(conversion or spec for _, _, spec, conversion in pieces):
+        return lambda mother, daughters: pattern.format(
+            mother=mother, daughters=daughters
+        )
+
+    # Literals around the fields, merging the separate pieces of escaped braces
+    literals = [""]
+    fields = []
+    for literal, field, _, _ in pieces:
+        literals[-1] += literal
+        if field is not None:
+            fields.append(field)
+            literals.append("")
+    if fields == ["mother", "daughters"]:
+        a, b, c = literals
+        return lambda mother, daughters: f"{a}{mother}{b}{daughters}{c}"
+    if fields == ["daughters", "mother"]:
+        a, b, c = literals
+        return lambda mother, daughters: f"{a}{daughters}{b}{mother}{c}"
+
+    def template(mother: str, daughters: str) -> str:
+        values = {"mother": mother, "daughters": daughters}
+        return "".join(
+            literal + (values[field] if field is not None else "")
+            for literal, field, _, _ in pieces
+        )
+
+    return template
+
+
+def _check_pattern(pattern: str) -> None:
+    """
+    Check that a descriptor pattern has the named-wildcards "mother" and "daughters".
+    """
+    expected_wildcards = {"mother", "daughters"}
+    wildcards = {
+        t[1] for t in string.Formatter().parse(pattern) if isinstance(t[1], str)
+    }
+    if wildcards != expected_wildcards:
+        error_msg = (
+            "The pattern should only have the wildcards "
+            f"{expected_wildcards}, while '{pattern}' has the wildcards "
+            f"{wildcards}."
+        )
+        raise ValueError(error_msg)
+
+
+class DescriptorFormatter:
+    """
+    Immutable decay descriptor formatter, with the top-level decay
+    and sub-decay patterns compiled once.
+
+    A formatter can be passed explicitly to the functions producing descriptors,
+    e.g. ``DecayChain.to_string(formatter=...)``, which is safe to use
+    concurrently from several threads.
+    Otherwise, the formatter of the current context is used,
+    see ``current_descriptor_formatter`` and ``DescriptorFormat``.
+
+    Examples
+    --------
+    >>> formatter = DescriptorFormatter("{mother} --> {daughters}", "[{mother} --> {daughters}]")
+    >>> formatter.format_descriptor("K_S0", "pi+ pi-", top=False)
+    '[K_S0 --> pi+ pi-]'
+    """
+
+    __slots__ = ("_sub_template", "_top_template", "decay_pattern", "sub_decay_pattern")
+
+    def __init__(
+        self,
+        decay_pattern: str = "{mother} -> {daughters}",
+        sub_decay_pattern: str = "({mother} -> {daughters})",
+    ) -> None:
+        """
+        Default constructor.
+
+        Parameters
+        ----------
+        decay_pattern: str, optional, default="{mother} -> {daughters}"
+            Format-string expression for a top-level decay.
+        sub_decay_pattern: str, optional, default="({mother} -> {daughters})"
+            Format-string expression for a sub-decay.
+        """
+        _check_pattern(decay_pattern)
+        _check_pattern(sub_decay_pattern)
+        self.decay_pattern = decay_pattern
+        self.sub_decay_pattern = sub_decay_pattern
+        self._top_template = _compile_template(decay_pattern)
+        self._sub_template = _compile_template(sub_decay_pattern)
+
+    def format_descriptor(self, mother: str, daughters: str, top: bool = True) -> str:
+        """
+        Apply the format to one "layer" of the decay. Does not handle nested
+        decays itself. It is assumed that the ``daughters`` string already contains
+        any sub-decays.
+
+        Parameters
+        ----------
+
+        mother: str
+            The decaying particle.
+        daughters: str
+            The final-state particles.
+        top: bool, optional, default=True
+            Whether to use the top-level decay pattern or the sub-decay pattern.
+        """
+        if top:
+            return self._top_template(mother, daughters)
+        return self._sub_template(mother, daughters)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DescriptorFormatter):
+            return NotImplemented
+        return (self.decay_pattern, self.sub_decay_pattern) == (
+            other.decay_pattern,
+            other.sub_decay_pattern,
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.decay_pattern, self.sub_decay_pattern))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.decay_pattern!r}, {self.sub_decay_pattern!r})"
+
+
+# Formatter of the current context, set by ``DescriptorFormat`` as a context manager.
+# Unset, the process-wide default formatter ``DescriptorFormat.default`` is used.
+_current_formatter: ContextVar[DescriptorFormatter] = ContextVar("descriptor_formatter")
+# Tokens restoring the formatter on exit of the ``DescriptorFormat`` blocks of the context,
+# innermost last. Kept per context, so that one instance can be shared across threads and tasks.
+_formatter_tokens: ContextVar[tuple[Token[DescriptorFormatter], ...]] = ContextVar(
+    "descriptor_formatter_tokens", default=()
+)
+
+
+def current_descriptor_formatter() -> DescriptorFormatter:
+    """
+    Return the descriptor formatter of the current context,
+    i.e. that of the innermost ``with DescriptorFormat(...)`` block
+    in the current thread or asyncio task, else the process-wide default.
+    """
+    return _current_formatter.get(DescriptorFormat.default)
+
+
+class _DescriptorConfig(MutableMapping[str, str]):
+    """
+    Patterns of the descriptor formatter of the current context,
+    as returned by ``DescriptorFormat.config``.
+    Changing a pattern in place changes the patterns as ``DescriptorFormat.set_config`` does.
+    """
+
+    __slots__ = ("_patterns",)
+
+    def __init__(self, formatter: DescriptorFormatter) -> None:
+        self._patterns = {
+            "decay_pattern": formatter.decay_pattern,
+            "sub_decay_pattern": formatter.sub_decay_pattern,
+        }
+
+    def __getitem__(self, key: str) -> str:
+        return self._patterns[key]
+
+    def __setitem__(self, key: str, value: str) -> None:
+        if key not in self._patterns:
+            raise KeyError(key)
+        DescriptorFormat.set_config(**{**self._patterns, key: value})
+        self._patterns[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError("Descriptor patterns cannot be deleted.")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._patterns)
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def __repr__(self) -> str:
+        return repr(self._patterns)
+
+
+class _DescriptorFormatMeta(type):
+    """
+    Metaclass exposing ``DescriptorFormat.config`` as a class-level property
+    backed by the compiled formatter of the current context.
+    """
+
+    default: DescriptorFormatter
+
+    @property
+    def config(cls) -> MutableMapping[str, str]:
+        return _DescriptorConfig(current_descriptor_formatter())
+
+    @config.setter
+    def config(cls, config: Mapping[str, str]) -> None:
+        DescriptorFormat.set_config(**config)
+
+
+class DescriptorFormat(metaclass=_DescriptorFormatMeta):
+    """
+    Class to help with setting the decay descriptor format. The format in use is stored
+    as a class-level variable: ``DescriptorFormat.config``, which can be assigned as a whole
+    or modified in place, as with ``DescriptorFormat.set_config``.
+    Used as a context manager, the format is only changed within the current context,
+    i.e. the current thread or asyncio task, which is safe under concurrency.
 
     Examples
     --------
@@ -87,29 +293,34 @@ class DescriptorFormat:
     'D*+ -> (D0 -> (K_S0 -> pi+ pi-) (pi0 -> gamma gamma)) pi+'
     """
 
-    config: ClassVar[dict[str, str]] = {
-        "decay_pattern": "{mother} -> {daughters}",
-        "sub_decay_pattern": "({mother} -> {daughters})",
-    }
+    default: ClassVar[DescriptorFormatter] = DescriptorFormatter(
+        "{mother} -> {daughters}", "({mother} -> {daughters})"
+    )
 
     def __init__(self, decay_pattern: str, sub_decay_pattern: str) -> None:
-        self.new_config = {
-            "decay_pattern": decay_pattern,
-            "sub_decay_pattern": sub_decay_pattern,
-        }
-        self.old_config = copy(DescriptorFormat.config)
+        self.formatter = DescriptorFormatter(decay_pattern, sub_decay_pattern)
+
+    @property
+    def config(self) -> MutableMapping[str, str]:
+        """The descriptor patterns in use, see ``DescriptorFormat.config``."""
+        return _DescriptorConfig(current_descriptor_formatter())
 
     def __enter__(self) -> None:
-        self.set_config(**self.new_config)
+        token = _current_formatter.set(self.formatter)
+        _formatter_tokens.set((*_formatter_tokens.get(), token))
 
     def __exit__(self, *args: object) -> None:
-        self.set_config(**self.old_config)
+        *tokens, token = _formatter_tokens.get()
+        _formatter_tokens.set(tuple(tokens))
+        _current_formatter.reset(token)
 
     @staticmethod
     def set_config(decay_pattern: str, sub_decay_pattern: str) -> None:
         """
-        Configure the descriptor patterns after checking that each pattern
+        Configure the process-wide descriptor patterns after checking that each pattern
         has named-wildcards "mother" and "daughters".
+        Within a ``with DescriptorFormat(...)`` block, only the patterns of the block are changed,
+        and the patterns in use before the block are restored on exit.
 
         Parameters
         ----------
@@ -121,30 +332,18 @@ class DescriptorFormat:
             Format-string expression for a sub-decay,
             e.g. "({mother} -> {daughters}"
         """
-        new_config = {
-            "decay_pattern": decay_pattern,
-            "sub_decay_pattern": sub_decay_pattern,
-        }
-        expected_wildcards = {"mother", "daughters"}
-        for pattern in new_config.values():
-            wildcards = {
-                t[1] for t in string.Formatter().parse(pattern) if isinstance(t[1], str)
-            }
-            if wildcards != expected_wildcards:
-                error_msg = (
-                    "The pattern should only have the wildcards "
-                    f"{expected_wildcards}, while '{pattern}' has the wildcards "
-                    f"{wildcards}."
-                )
-                raise ValueError(error_msg)
-        DescriptorFormat.config = new_config
+        formatter = DescriptorFormatter(decay_pattern, sub_decay_pattern)
+        if _current_formatter.get(None) is not None:
+            # Undone on exit of the enclosing block, whose token predates this change
+            _current_formatter.set(formatter)
+            return
+        DescriptorFormat.default = formatter
 
     @staticmethod
     def format_descriptor(mother: str, daughters: str, top: bool = True) -> str:
         """
-        Apply the format to one "layer" of the decay. Does not handle nested
-        decays itself. It is assumed that the ``daughters`` string already contains
-        any sub-decays.
+        Apply the format of the current context to one "layer" of the decay,
+        see ``DescriptorFormatter.format_descriptor``.
 
         Parameters
         ----------
@@ -154,10 +353,4 @@ class DescriptorFormat:
         daughters: str
             The final-state particles.
         """
-        args = {
-            "mother": mother,
-            "daughters": daughters,
-        }
-        if top:
-            return DescriptorFormat.config["decay_pattern"].format(**args)
-        return DescriptorFormat.config["sub_decay_pattern"].format(**args)
+        return current_descriptor_formatter().format_descriptor(mother, daughters, top)
@@ -5,21 +5,30 @@
 
 from __future__ import annotations
 
+import inspect
 import io
+import json
 import sys
 from pathlib import Path
 
 import pytest
 from lark import Token, Tree
+from lark.exceptions import UnexpectedInput
 
+import decaylanguage.dec.dec as dec_module
 from decaylanguage.dec.dec import (
     ChargeConjugateReplacement,
+    DecayAndCDecayWarning,
     DecayModelAliasReplacement,
     DecayModelParamValueReplacement,
     DecayNotFound,
     DecFileNotParsed,
     DecFileParser,
+    DecFileSyntaxWarning,
     DuplicateCDecayWarning,
+    DuplicateDecayWarning,
+    MissingCDecaySourceWarning,
+    _split_statements,
     get_branching_fraction,
     get_decay_mother_name,
     get_final_state_particle_names,
@@ -28,6 +37,7 @@ from decaylanguage.dec.dec import (
     get_model_parameters,
 )
 from decaylanguage.dec.enums import PhotosEnum
+from decaylanguage.utils import DescriptorFormatter
 
 DIR = Path(__file__).parent.resolve()
 
@@ -81,9 +91,13 @@ def test_double_parsing():
     # The second call to parse() issues the warning
     #   UserWarning: Input file being re-parsed ...
     #     warnings.warn("Input file being re-parsed ...")
+    lineno = inspect.currentframe().f_lineno + 2
     with pytest.warns(UserWarning, match="Input file being re-parsed ...") as record:
         p.parse()
     assert len(record) == 1
+    # The warning points at the call to parse()
+    assert record[0].filename == __file__
+    assert record[0].lineno == lineno
 
 
 def test_unknown_decfile():
@@ -573,6 +587,390 @@ End
     assert p.list_decay_mother_names() == ["D0", "anti-D0"]
 
 
+def test_parse_with_diagnostics_sink(recwarn):
+    p = DecFileParser(DIR / "../data/duplicate-decays.dec")
+    diagnostics = []
+    p.parse(diagnostics=diagnostics)
+
+    assert len(recwarn) == 0
+    assert p.number_of_decays == 2
+    assert [
+        (d.category, d.code, d.particles, d.line, d.column) for d in diagnostics
+    ] == [
+        (DuplicateDecayWarning, "DLW001", ("Sigma(1775)0",), 29, 7),
+        (DecayAndCDecayWarning, "DLW003", ("anti-Sigma(1775)0",), 40, 8),
+    ]
+
+    p = DecFileParser.from_string(
+        """Decay D0
+1.0 K- pi+ PHSP;
+Enddecay
+CDecay anti-D0
+CDecay anti-D0
+CDecay D+
+"""
+    )
+    diagnostics = []
+    p.parse(diagnostics=diagnostics)
+    assert [(d.code, d.particles, d.line) for d in diagnostics] == [
+        ("DLW002", ("anti-D0",), 5),
+        ("DLW004", ("D+",), 6),
+    ]
+    assert diagnostics[1].category is MissingCDecaySourceWarning
+
+    # Re-parsing without a sink warns again
+    with pytest.warns(UserWarning, match="re-parsed") as caught:
+        p.parse()
+    assert [w.category for w in caught] == [
+        UserWarning,
+        DuplicateCDecayWarning,
+        MissingCDecaySourceWarning,
+    ]
+
+
+def test_parse_with_recovery():
+    p = DecFileParser.from_string(
+        """Alias MyD0 D0
+Decay MyD0
+1.0 K- pi+ PHSP;
+Enddecay
+Decya D+
+Decay D+
+1.0 K- pi+ pi+ $ D_DALITZ;
+Enddecay
+Decay D_s+
+1.0 K+ K- pi+ PHSP;
+Decay D0
+1.0 K- pi+ PHSP;
+Enddecay
+Decay D0
+1.0 K- pi- pi+ pi+ PHSP;
+Enddecay
+"""
+    )
+    with pytest.raises(UnexpectedInput):
+        p.parse()
+
+    diagnostics = []
+    p.parse(diagnostics=diagnostics, recover=True)
+
+    # Every syntax error is reported and the valid statements are kept
+    assert [(d.code, d.line, d.column) for d in diagnostics] == [
+        ("DLP001", 5, 1),
+        ("DLP001", 7, 16),
+        ("DLP001", 10, 20),
+        ("DLW001", 14, 7),
+    ]
+    assert "line 7 col 16" in diagnostics[1].message
+    assert p.list_decay_mother_names() == ["MyD0", "D0"]
+    assert p.dict_aliases() == {"MyD0": "D0"}
+    span = p.decay_span("D0")
+    assert (span.line, span.end_line) == (11, 13)
+    assert p.source_index.line_of(span.start) == 11
+
+    lineno = inspect.currentframe().f_lineno + 2
+    with pytest.warns(DecFileSyntaxWarning, match="'Decya'") as record:
+        DecFileParser.from_string("Decya D+\n").parse(recover=True)
+    assert (record[0].filename, record[0].lineno) == (__file__, lineno)
+
+
+def test_parse_with_recovery_multiple_files(tmp_path):
+    a = tmp_path / "a.dec"
+    a.write_text(
+        "Decay D+\n1.0 K- pi+ pi+ PHSP;\nEnddecay\n\nDecay pi0\n1.0 gamma gamma PHSP;\n"
+    )
+    b = tmp_path / "b.dec"
+    b.write_text(
+        """Decay omega
+1.0 pi+ pi- pi0 PHSP;
+Enddecay
+Decay D-
+1.0 K+ pi- pi- PHSP;
+Enddecay
+
+
+
+Decya D0
+Decay D0
+1.0 K- pi+ PHSP;
+Enddecay
+Decay D_s+ 1.0 K+ K- pi+ ;
+Enddecay
+"""
+    )
+    p = DecFileParser(a, b)
+    diagnostics = []
+    p.parse(diagnostics=diagnostics, recover=True)
+
+    # Errors are located, and quoted in the messages, in the input files
+    assert [(d.file, d.line, d.column) for d in diagnostics] == [
+        (str(a), 6, 22),
+        (str(b), 10, 1),
+        (str(b), 14, 12),
+    ]
+    assert "'$END', '') at line 6, column 22." in diagnostics[0].message
+    assert "'Decya') at line 10, column 1." in diagnostics[1].message
+    assert "'1.0') at line 14, column 12." in diagnostics[2].message
+    assert p.list_decay_mother_names() == ["D+", "omega", "D-", "D0"]
+
+
+def test_split_statements():
+    text = """# Comment
+Define dm 0.507e12
+
+ModelAlias B0mix VSS_BMIX
+  dm;
+Decay B0  # comment
+0.5 D- pi+ PHSP;
+0.5 D- K+
+  PHSP;
+Enddecay
+CDecay anti-B0
+End
+"""
+    chunks = _split_statements(text)
+
+    assert "".join(chunk for _, chunk in chunks) == text
+    assert [(offset, chunk.split(None, 1)[0]) for offset, chunk in chunks] == [
+        (0, "#"),
+        (1, "Define"),
+        (3, "ModelAlias"),
+        (5, "Decay"),
+        (10, "CDecay"),
+        (11, "End"),
+    ]
+
+
+def test_source_spans():
+    files = [
+        DIR / "../data/test_Xicc2XicPiPi.dec",
+        DIR / "../data/test_Bc2BsPi_Bs2KK.dec",
+    ]
+    p = DecFileParser(*files)
+    with pytest.warns(UserWarning, match="anti-Xi_cc-sig"):
+        p.parse()
+
+    index = p.source_index
+    assert index.files == [str(f) for f in files]
+    span = p.decay_span("MyB_s0")
+    assert span[:3] == (str(files[1]), 17, 19)
+    assert p._dec_file[span.start : span.end].split() == [
+        "Decay",
+        "MyB_s0",
+        *files[1].read_text().splitlines()[17].split(),
+        "Enddecay",
+    ]
+    (mode,) = p.decay_mode_spans("MyB_s0")
+    assert mode[:3] == (str(files[1]), 18, 18)
+    assert index.source_line(mode.file, mode.line) == index.line_text(
+        index.line_of(mode.start)
+    )
+    assert p._dec_file[mode.start : mode.end].endswith("-0.6;")
+    # Charge-conjugate decays are located at the Decay block they are created from
+    assert p.decay_span("B_c-sig") == p.decay_span("B_c+sig")
+    assert index.locate(p.decay_span("MyXic+").start) == (str(files[0]), 11)
+    # The "End" line of the first file is not in the concatenated input
+    assert index.source_line(str(files[0]), 16) is None
+    assert index.locate_line(17) == (str(files[1]), 1)
+
+    with pytest.raises(DecayNotFound):
+        p.decay_span("D0")
+    assert DecFileParser().source_index is None
+
+
+def test_source_index_skips_filtered_lines():
+    p = DecFileParser.from_string(
+        """Decay D0
+1.0 K- pi+ PHSP;
+Enddecay
+End
+Decay D0
+1.0 K- pi+ PHSP;
+Enddecay
+Decay D+
+1.0 K- pi+ pi+ $ PHSP;
+Enddecay
+"""
+    )
+    diagnostics = []
+    p.parse(diagnostics=diagnostics, recover=True)
+
+    name = "<dec file input as a string>"
+    assert [(d.code, d.file, d.line) for d in diagnostics] == [
+        ("DLP001", name, 9),
+        ("DLW001", name, 5),
+    ]
+    assert p.source_index.source_line(name, 9) == "1.0 K- pi+ pi+ $ PHSP;"
+
+
+def test_layered_parser():
+    base = DecFileParser.from_string(
+        """Alias MyD0 D0
+Alias Myanti-D0 anti-D0
+ChargeConj MyD0 Myanti-D0
+Define dm 0.507e12
+ModelAlias MyModel VSS_BMIX dm;
+yesPhotos
+Decay D*+
+0.677 MyD0 pi+ VSS;
+0.323 D+ pi0 VSS;
+Enddecay
+CDecay D*-
+Decay MyD0
+1.0 K- pi+ PHSP;
+Enddecay
+CDecay Myanti-D0
+Decay Upsilon(4S)
+1.0 B0 anti-B0 MyModel;
+Enddecay
+"""
+    )
+    base.parse()
+    user = DecFileParser.from_string(
+        """Alias MyD+ D+
+Decay MyD0
+0.5 K- pi+ pi0 PHSP;
+0.5 K- K+ PHSP;
+Enddecay
+Decay B0
+1.0 K+ pi- VSS_BMIX dm;
+Enddecay
+Decay Upsilon(5S)
+1.0 B0 anti-B0 MyModel;
+Enddecay
+CopyDecay MyD+ D*+
+CDecay anti-B0
+""",
+        base=base,
+    )
+    user.parse()
+
+    # Decays of the user file override the ones of the base
+    assert user.list_decay_mother_names() == [
+        "D*+",
+        "Upsilon(4S)",
+        "D*-",
+        "Myanti-D0",
+        "MyD0",
+        "B0",
+        "Upsilon(5S)",
+        "MyD+",
+        "anti-B0",
+    ]
+    assert user.number_of_decays == 9
+    assert user.list_decay_modes("MyD0") == [["K-", "pi+", "pi0"], ["K-", "K+"]]
+    assert user.list_decay_modes("Myanti-D0") == [["K+", "pi-"]]
+    assert user.list_decay_modes("MyD+") == [["MyD0", "pi+"], ["D+", "pi0"]]
+    assert user.list_decay_modes("anti-B0") == [["K-", "pi+"]]
+    # Definitions of the base are used by the user file
+    assert user.build_decay_chains("Upsilon(5S)")["Upsilon(5S)"][0]["model_params"] == [
+        0.507e12
+    ]
+    assert user.build_decay_chains("B0")["B0"][0]["model_params"] == [0.507e12]
+    assert user.dict_aliases() == {
+        "MyD0": "D0",
+        "Myanti-D0": "anti-D0",
+        "MyD+": "D+",
+    }
+    assert user.dict_charge_conjugates() == {"MyD0": "Myanti-D0"}
+    assert user.dict_decays2copy() == {"MyD+": "D*+"}
+    assert user.list_charge_conjugate_decays() == ["D*-", "Myanti-D0", "anti-B0"]
+    assert user.global_photos_flag() == PhotosEnum.yes
+    # The base is not modified
+    assert base.list_decay_modes("MyD0") == [["K-", "pi+"]]
+    assert base.number_of_decays == 5
+    assert base.dict_aliases() == {"MyD0": "D0", "Myanti-D0": "anti-D0"}
+    # The merged tables are built once per parse, and returned as copies
+    aliases = user.dict_aliases()
+    assert aliases is not user.dict_aliases()
+    aliases["MyD0"] = "D+"
+    user.list_lineshapePW_definitions().append((["D0", "K-", "pi+"], 1))
+    assert user.dict_aliases()["MyD0"] == "D0"
+    assert user.list_lineshapePW_definitions() == []
+    other = DecFileParser.from_string("Alias MyB0 B0\n", base=base)
+    other.parse()
+    other.dict_charge_conjugates().clear()
+    assert other.dict_charge_conjugates() == {"MyD0": "Myanti-D0"}
+    assert user.dict_charge_conjugates() == {"MyD0": "Myanti-D0"}
+
+    # Decays are located in the file defining them
+    assert user.decay_span("MyD0").line == 2
+    assert base.decay_span("MyD0").line == 12
+    assert user.decay_span("D*+") == base.decay_span("D*+")
+    assert user.decay_mode_spans("Upsilon(4S)") == base.decay_mode_spans("Upsilon(4S)")
+
+
+def test_layered_parser_requires_parsed_base():
+    with pytest.raises(DecFileNotParsed):
+        DecFileParser.from_string("", base=DecFileParser.from_string(""))
+
+
+def test_from_bundled(tmp_path, monkeypatch):
+    monkeypatch.setattr(dec_module, "_SNAPSHOTS", {})
+    p = DecFileParser.from_bundled("LHCB", cache_dir=tmp_path)
+    (snapshot,) = tmp_path.glob("DECAY_LHCB-*.json")
+    assert p.list_decay_modes("D*+") == [["D0", "pi+"], ["D+", "pi0"], ["D+", "gamma"]]
+    assert p.decay_span("D*+").file.endswith("DECAY_LHCB.DEC")
+
+    # Loaded from the saved snapshot in a new session
+    monkeypatch.setattr(dec_module, "_SNAPSHOTS", {})
+    q = DecFileParser.from_bundled("lhcb", cache_dir=tmp_path)
+    assert list(tmp_path.iterdir()) == [snapshot]
+    assert q.list_decay_mother_names() == p.list_decay_mother_names()
+    assert q.dict_aliases() == p.dict_aliases()
+    # The tables and decays round-trip through JSON
+    assert q._base._tables == p._base._tables
+    assert q._base._decay("B0") == p._base._decay("B0")
+    assert q.build_decay_chains("D0", stable_particles=["K_S0", "pi0"]) == (
+        p.build_decay_chains("D0", stable_particles=["K_S0", "pi0"])
+    )
+
+    user = DecFileParser.from_string(
+        """Decay D*+
+1.0 D0 pi+ VSS;
+Enddecay
+""",
+        base=q,
+    )
+    user.parse()
+    assert user.list_decay_modes("D*+") == [["D0", "pi+"]]
+    assert user.list_decay_modes("D*-") == q.list_decay_modes("D*-")
+
+    with pytest.raises(ValueError, match="Unknown bundled decay file"):
+        DecFileParser.from_bundled("BABAR", cache_dir=tmp_path)
+
+
+def test_from_bundled_stale_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(dec_module, "_SNAPSHOTS", {})
+    p = DecFileParser.from_bundled("LHCB", cache_dir=tmp_path)
+    (snapshot,) = tmp_path.glob("DECAY_LHCB-*.json")
+
+    # A stored decay no longer decoding
+    state = json.loads(snapshot.read_text())
+    state["decays"]["D*+"] = '{"object": []}'
+    snapshot.write_text(json.dumps(state))
+    monkeypatch.setattr(dec_module, "_SNAPSHOTS", {})
+    q = DecFileParser.from_bundled("LHCB", cache_dir=tmp_path)
+    assert q.list_decay_modes("D*+") == p.list_decay_modes("D*+")
+    # The snapshot was replaced
+    assert json.loads(json.loads(snapshot.read_text())["decays"]["D*+"])["tuple"]
+
+    # A pickled snapshot is not loaded, the cache directory being shared
+    snapshot.write_bytes(b"cos\nsystem\n(S'exit 1'\ntR.")
+    monkeypatch.setattr(dec_module, "_SNAPSHOTS", {})
+    q = DecFileParser.from_bundled("LHCB", cache_dir=tmp_path)
+    assert q.list_decay_modes("D*+") == p.list_decay_modes("D*+")
+    assert list(tmp_path.iterdir()) == [snapshot]
+
+    # Snapshots are specific to the versions of the dependencies
+    key = dec_module._snapshot_key("DECAY_LHCB.DEC")
+    monkeypatch.setattr(dec_module, "lark_version", "0.0.0")
+    assert dec_module._snapshot_key("DECAY_LHCB.DEC") != key
+    monkeypatch.undo()
+    monkeypatch.setattr(dec_module, "particle_version", "0.0.0")
+    assert dec_module._snapshot_key("DECAY_LHCB.DEC") != key
+
+
 def test_list_decay_modes():
     p = DecFileParser(DIR / "../data/test_example_Dst.dec")
     p.parse()
@@ -1104,6 +1502,14 @@ def test_expand_decay_chains():
         all_decays = p.expand_decay_modes(particle)
         assert set(all_decays) == set(descriptors)
 
+    # Same ordering of the daughters as with the default patterns
+    formatter = DescriptorFormatter(
+        "{mother} => {daughters}", "({mother} => {daughters})"
+    )
+    assert set(p.expand_decay_modes("D*-", formatter=formatter)) == {
+        d.replace("->", "=>") for d in output["D*-"]
+    }
+
 
 def test_Lark_DecayModelAliasReplacement_Transformer():
     t = Tree(
@@ -5,15 +5,21 @@
 
 from __future__ import annotations
 
-import warnings
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from types import SimpleNamespace
+from typing import Any
 
+import lark
+import particle
 import pytest
 
 import decaylanguage.dec.validate as validate_module
 from decaylanguage.dec.dec import (
     DecayAndCDecayWarning,
+    DecFileDiagnostic,
     DuplicateCDecayWarning,
     DuplicateDecayWarning,
     MissingCDecaySourceWarning,
@@ -23,8 +29,9 @@ from decaylanguage.dec.dec import (
 from decaylanguage.dec.validate import (
     Diagnostic,
     _diagnostic_from_exception,
-    _diagnostic_from_warning,
+    _diagnostic_from_record,
     _print_diagnostics,
+    _Watcher,
     main,
     validate_files,
 )
@@ -33,7 +40,7 @@ DIR = Path(__file__).parent.resolve()
 
 
 @pytest.mark.parametrize(
-    ("category", "message", "code", "compact_message"),
+    ("category", "message", "particles", "code", "compact_message"),
     [
         (
             DuplicateDecayWarning,
@@ -42,6 +49,7 @@ DIR = Path(__file__).parent.resolve()
                 "with 'Decay': D0! All but the first occurrence(s) will be "
                 "discarded/removed ..."
             ),
+            ("D0",),
             "DLW001",
             "duplicate Decay block(s): D0; later definitions ignored",
         ),
@@ -52,6 +60,7 @@ DIR = Path(__file__).parent.resolve()
                 "following particle(s) not found: D0. Skipping creation of these "
                 "copied decay trees."
             ),
+            ("D0",),
             "DLW006",
             "missing Decay source for CopyDecay: D0",
         ),
@@ -61,6 +70,7 @@ DIR = Path(__file__).parent.resolve()
                 "The following particles are defined in the input .dec file with both "
                 "'Decay' and 'CDecay': D0! The 'CDecay' definition(s) will be ignored ..."
             ),
+            ("D0",),
             "DLW003",
             "both Decay and CDecay defined: D0; CDecay ignored",
         ),
@@ -71,6 +81,7 @@ DIR = Path(__file__).parent.resolve()
                 "with 'CDecay': D0! All but the first occurrence(s) will be "
                 "discarded/removed ..."
             ),
+            ("D0",),
             "DLW002",
             "duplicate CDecay statement(s): D0; later statements ignored",
         ),
@@ -81,6 +92,7 @@ DIR = Path(__file__).parent.resolve()
                 "particle(s) not found: D0. Skipping creation of these charge-conjugate "
                 "decay trees."
             ),
+            ("D0",),
             "DLW004",
             "missing Decay source for CDecay: D0",
         ),
@@ -90,23 +102,29 @@ DIR = Path(__file__).parent.resolve()
                 "Found 'CDecay' statement for self-conjugate particle pi0. This is a bug! "
                 "Skipping creation of charge-conjugate decay Tree."
             ),
+            ("pi0",),
             "DLW005",
             "CDecay targets self-conjugate particle: pi0",
         ),
         (
             UserWarning,
             "An unclassified parser warning.",
+            (),
             "DLW999",
             "An unclassified parser warning.",
         ),
     ],
 )
 def test_warning_categories_map_to_diagnostics(
-    category: type[Warning], message: str, code: str, compact_message: str
+    category: type[Warning],
+    message: str,
+    particles: tuple[str, ...],
+    code: str,
+    compact_message: str,
 ) -> None:
-    warning = warnings.WarningMessage(category(message), category, "test.dec", 1)
+    record = DecFileDiagnostic(category, message, particles)
 
-    diagnostic = _diagnostic_from_warning(Path("test.dec"), warning)
+    diagnostic = _diagnostic_from_record(Path("test.dec"), record, None)
 
     assert diagnostic.code == code
     assert diagnostic.message == compact_message
@@ -114,11 +132,9 @@ def test_warning_categories_map_to_diagnostics(
 
 def test_known_warning_with_unrecognized_message_is_not_rewritten() -> None:
     message = "A future version of this warning with different wording."
-    warning = warnings.WarningMessage(
-        DuplicateDecayWarning(message), DuplicateDecayWarning, "test.dec", 1
-    )
+    record = DecFileDiagnostic(DuplicateDecayWarning, message)
 
-    diagnostic = _diagnostic_from_warning(Path("test.dec"), warning)
+    diagnostic = _diagnostic_from_record(Path("test.dec"), record, None)
 
     assert diagnostic.code == "DLW001"
     assert diagnostic.message == message
@@ -250,6 +266,100 @@ def test_validate_files_reuses_additional_decay_model_generator() -> None:
     assert diagnostics == []
 
 
+def test_validate_files_in_parallel(tmp_path: Path) -> None:
+    broken = tmp_path / "broken.dec"
+    broken.write_text("Decay pi0\n1.0 gamma gamma PHSP;\n", encoding="utf_8")
+    paths = [
+        DIR / "../data/duplicate-decays.dec",
+        broken,
+        DIR / "../data",
+        tmp_path / "missing.dec",
+        DIR / "../data/duplicate-decays.dec",
+    ]
+
+    diagnostics = validate_files(paths, jobs=3)
+
+    assert diagnostics == validate_files(paths)
+    n = len(validate_files(paths[:1]))
+    assert {d.path for d in diagnostics[:n]} == {paths[0]}
+    assert diagnostics[n].path == broken
+    assert diagnostics[-n - 1].path == tmp_path / "missing.dec"
+    assert validate_files(paths, jobs=2, ignore=["DLW"]) == [
+        d for d in diagnostics if d.code == "DLP001"
+    ]
+
+    with pytest.raises(ValueError, match="jobs"):
+        validate_files(paths, jobs=-1)
+
+
+def test_validate_files_with_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    source = DIR / "../data/duplicate-decays.dec"
+    path = tmp_path / "decays.dec"
+    path.write_bytes(source.read_bytes())
+    cache_dir = tmp_path / "cache"
+
+    diagnostics = validate_files([path], cache_dir=cache_dir)
+    assert diagnostics == validate_files([path])
+    assert list(cache_dir.glob("*/*.json"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError(f"{args} should have been served from cache")
+
+    # Unchanged files are not validated again, and ignored codes still apply
+    with monkeypatch.context() as m:
+        m.setattr(validate_module, "_validate_file", fail)
+        assert validate_files([path], cache_dir=cache_dir) == diagnostics
+        assert validate_files([path], ignore=["DLW"], cache_dir=cache_dir) == []
+        # Entries do not depend on the file location
+        copy = tmp_path / "copy.dec"
+        copy.write_bytes(path.read_bytes())
+        assert [d.path for d in validate_files([copy], cache_dir=cache_dir)] == [
+            copy
+        ] * len(diagnostics)
+
+    path.write_text("Decay pi0\n1.0 gamma gamma PHSP;\nEnddecay\nEnd\n")
+    assert validate_files([path], cache_dir=cache_dir) == []
+    assert validate_files([path], cache_dir=cache_dir, jobs=2) == []
+
+    # Corrupt entries are ignored
+    for entry in cache_dir.glob("*/*.json"):
+        entry.write_text("{")
+    assert validate_files([source], cache_dir=cache_dir) == validate_files([source])
+
+    # Unwritable cache directories are skipped
+    unwritable = tmp_path / "file"
+    unwritable.touch()
+    assert validate_files([source], cache_dir=unwritable) == validate_files([source])
+    assert list(tmp_path.glob("**/*.tmp")) == []
+
+
+@pytest.mark.parametrize("module", [lark, particle])
+def test_result_cache_key_depends_on_dependency_versions(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, module: Any
+) -> None:
+    path = DIR / "../data/duplicate-decays.dec"
+    key = validate_module._ResultCache(tmp_path, [], False).key(path)
+    monkeypatch.setattr(module, "__version__", "0.0.0")
+    assert validate_module._ResultCache(tmp_path, [], False).key(path) != key
+
+
+def test_validate_files_is_thread_safe(recwarn: pytest.WarningsRecorder) -> None:
+    paths = [DIR / "../data/duplicate-decays.dec", DIR / "../data/test_example_Dst.dec"]
+    expected = validate_files(paths)
+    assert [(d.code, d.line, d.source_line) for d in expected] == [
+        ("DLW001", 29, "Decay Sigma(1775)0    # PDG 3216"),
+        ("DLW003", 40, "CDecay anti-Sigma(1775)0"),
+    ]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(validate_files, [paths] * 16))
+
+    assert all(result == expected for result in results)
+    assert len(recwarn) == 0
+
+
 def test_validate_files_reports_parse_errors(tmp_path: Path) -> None:
     path = tmp_path / "broken.dec"
     path.write_text(
@@ -266,6 +376,119 @@ def test_validate_files_reports_parse_errors(tmp_path: Path) -> None:
     assert diagnostics[0].line is not None
 
 
+def test_validate_files_reports_all_parse_errors(tmp_path: Path) -> None:
+    path = tmp_path / "broken.dec"
+    path.write_text(
+        """Decay pi0
+1.0 gamma gamma PHSP;
+Enddecay
+Decay pi0
+1.0 gamma gamma PHSP;
+Enddecay
+Decay D0
+1.0 K- pi+ PHSP
+Enddecay
+CDecay anti-D0
+Decay D+
+1.0 K- pi+ pi+ $;
+Enddecay
+""",
+        encoding="utf_8",
+    )
+
+    diagnostics = validate_files([path])
+
+    assert [(d.code, d.line, d.source_line) for d in diagnostics] == [
+        ("DLP001", 9, "Enddecay"),
+        ("DLP001", 12, "1.0 K- pi+ pi+ $;"),
+        ("DLW001", 4, "Decay pi0"),
+        ("DLW004", 10, "CDecay anti-D0"),
+    ]
+
+
+SEMANTIC_DEC = """Alias MyD0 D0
+Alias MyK*0 K*0
+Decay D0
+0.6 K- pi+ PHSP;
+0.3 K_S0 pi0 PHSP;
+Enddecay
+Decay D+
+1.0 K- pi- pi+ PHSP;
+Enddecay
+Decay MyD0
+1.0 K- pi+ mystery PHSP;
+Enddecay
+Decay pi0
+1.0 gamma gamma PHSP;
+Enddecay
+"""
+
+
+def test_validate_files_semantic_checks(tmp_path: Path) -> None:
+    path = tmp_path / "semantic.dec"
+    path.write_text(SEMANTIC_DEC, encoding="utf_8")
+
+    assert validate_files([path]) == []
+
+    diagnostics = validate_files([path], semantic=True)
+
+    assert [(d.code, d.line, d.source_line) for d in diagnostics] == [
+        ("DLS001", 3, "Decay D0"),
+        ("DLS005", 11, "1.0 K- pi+ mystery PHSP;"),
+        ("DLS002", 5, "0.3 K_S0 pi0 PHSP;"),
+        ("DLS004", 8, "1.0 K- pi- pi+ PHSP;"),
+        ("DLS003", 2, "Alias MyK*0 K*0"),
+    ]
+    assert "K_S0" in diagnostics[2].message
+    assert validate_files([path], ignore=("DLS",), semantic=True) == []
+
+
+def test_validate_files_semantic_checks_known_names(tmp_path: Path) -> None:
+    path = tmp_path / "known.dec"
+    path.write_text(
+        """Alias B0sig B0
+Alias anti-B0sig anti-B0
+ChargeConj B0sig anti-B0sig
+Alias MyX X_1(3872)
+Alias MyXsig MyX
+Particle Xnew 1.0 0.1
+Decay B0
+0.5 K+ pi- Xsd PHSP;
+0.5 K+ pi- Xnew PHSP;
+Enddecay
+Decay MyXsig
+1.0 pi+ pi- pi+ pi- PHSP;
+Enddecay
+""",
+        encoding="utf_8",
+    )
+
+    # Aliases used through ChargeConj or other aliases, names declared
+    # in the file and EvtGen names without PDG table entry are fine
+    assert validate_files([path], semantic=True) == []
+
+
+def test_validate_files_semantic_checks_pythia_names(tmp_path: Path) -> None:
+    path = tmp_path / "pythia.dec"
+    path.write_text(
+        """PythiaBothParam 9900441:new=Xcc
+PythiaBothParam 9900441:antiName=anti-Xcc
+PythiaAliasParam Check:event=Xoff
+Decay B0
+0.4 K+ pi- Xcc PHSP;
+0.3 K+ pi- anti-Xcc PHSP;
+0.3 K+ pi- Xoff PHSP;
+Enddecay
+""",
+        encoding="utf_8",
+    )
+
+    # Only the Pythia settings naming particles declare them
+    diagnostics = validate_files([path], semantic=True)
+    assert [(d.code, d.line) for d in diagnostics] == [("DLS005", 7)]
+    assert "Xoff" in diagnostics[0].message
+
+
 @pytest.mark.parametrize("message", ["", "\n \t"])
 def test_diagnostic_from_exception_accepts_empty_message(message: str) -> None:
     diagnostic = _diagnostic_from_exception(Path("broken.dec"), AssertionError(message))
@@ -419,6 +642,7 @@ def test_main_lists_diagnostics(capsys: pytest.CaptureFixture[str]) -> None:
     output = capsys.readouterr().out
     assert "DLP001 parse-error" in output
     assert "DLW999 parser-warning" in output
+    assert "DLS001 bf-sum" in output
 
 
 def test_main_rejects_missing_files_argument() -> None:
@@ -431,6 +655,166 @@ def test_main_rejects_negative_max_diagnostics() -> None:
         main(["--max-diagnostics=-1", "example.dec"])
 
 
+def test_main_validates_in_parallel(capsys: pytest.CaptureFixture[str]) -> None:
+    path = str(DIR / "../data/duplicate-decays.dec")
+    assert main(["--color=never", path]) == 1
+    sequential = capsys.readouterr().err.splitlines()
+
+    assert main(["--color=never", "--jobs=2", path, path]) == 1
+    parallel = capsys.readouterr().err.splitlines()
+    assert parallel[1:-1] == sequential[1:-1] * 2
+
+    with pytest.raises(SystemExit, match="--jobs must be non-negative"):
+        main(["--jobs=-1", path])
+
+
+def test_main_reports_semantic_diagnostics(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    path = tmp_path / "semantic.dec"
+    path.write_text(SEMANTIC_DEC, encoding="utf_8")
+
+    assert main(["--color=never", str(path)]) == 0
+    assert main(["--color=never", "--semantic", str(path)]) == 1
+    output = capsys.readouterr().err
+    assert "DLS004 charge-violation" in output
+
+
+def test_watcher_validates_changed_files(tmp_path: Path) -> None:
+    path = tmp_path / "watched.dec"
+    path.write_text(
+        """Decay pi0
+1.0 gamma gamma PHSP;
+Enddecay
+Decay pi0
+1.0 gamma gamma PHSP;
+Enddecay
+""",
+        encoding="utf_8",
+    )
+    watcher = _Watcher([tmp_path])
+
+    changed = watcher.poll()
+    assert [(d.code, d.line) for d in changed[path]] == [("DLW001", 4)]
+    assert watcher.poll() == {}
+
+    # Only the new statement is parsed, the others are reused
+    statements = watcher._statements[path]
+    pi0 = statements["Decay pi0\n1.0 gamma gamma PHSP;\nEnddecay\n"]
+    path.write_text("Alias MyD0 D0\n" + path.read_text(encoding="utf_8"))
+    changed = watcher.poll()
+    assert [(d.code, d.line) for d in changed[path]] == [("DLW001", 5)]
+    assert changed[path] == validate_files([path])
+    assert statements["Decay pi0\n1.0 gamma gamma PHSP;\nEnddecay\n"] is pi0
+    assert "Alias MyD0 D0\n" in statements
+
+    new_path = tmp_path / "new.dec"
+    new_path.write_text("Decay D0\n1.0 K- pi+ PHSP;\n", encoding="utf_8")
+    changed = watcher.poll()
+    assert list(changed) == [new_path]
+    assert [d.code for d in changed[new_path]] == ["DLP001"]
+
+    new_path.unlink()
+    assert watcher.poll() == {}
+    assert watcher.files == [path]
+    assert list(watcher._statements) == [path]
+
+
+def test_main_watches_files(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    def interrupt(interval: float) -> None:
+        assert interval == 0.1
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(validate_module.time, "sleep", interrupt)
+    path = str(DIR / "../data/duplicate-decays.dec")
+    assert main(["--color=never", "--watch", "--interval=0.1", path]) == 0
+
+    output = capsys.readouterr().err.splitlines()
+    assert "DLW001 duplicate-decay" in output[1]
+    assert output[-1].startswith("watch: validated 1 file(s) in ")
+    assert output[-1].endswith("watching 1 file(s), press Ctrl+C to stop")
+
+    with pytest.raises(SystemExit, match="--interval must be positive"):
+        main(["--watch", "--interval=0", path])
+
+
+def test_main_reports_cached_files(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    path = str(DIR / "../data/duplicate-decays.dec")
+    cache_dir = f"--cache-dir={tmp_path}"
+    assert main(["--color=never", cache_dir, path]) == 1
+    first = capsys.readouterr().err.splitlines()
+    assert first[-1] == "cache: 0 of 1 file(s) served from cache"
+
+    assert main(["--color=never", cache_dir, path]) == 1
+    second = capsys.readouterr().err.splitlines()
+    assert second[-1] == "cache: 1 of 1 file(s) served from cache"
+    assert second[:-1] == first[:-1]
+
+
+@pytest.mark.parametrize("fmt", ["json", "ndjson", "sarif"])
+def test_main_writes_machine_readable_output(
+    fmt: str, capsys: pytest.CaptureFixture[str]
+) -> None:
+    paths = [
+        str(DIR / "../data/duplicate-decays.dec"),
+        str(DIR / "../data/test_example_Dst.dec"),
+    ]
+    assert main([f"--format={fmt}", *paths]) == 1
+
+    output = capsys.readouterr().out
+    if fmt == "ndjson":
+        records = [json.loads(line) for line in output.splitlines()]
+    elif fmt == "json":
+        records = json.loads(output)
+    else:
+        log = json.loads(output)
+        assert log["version"] == "2.1.0"
+        (run,) = log["runs"]
+        assert [r["ruleId"] for r in run["results"]] == ["DLW001", "DLW003"]
+        assert run["results"][0]["locations"][0]["physicalLocation"]["region"] == {
+            "startLine": 29,
+            "startColumn": 7,
+        }
+        records = [artifact["properties"] for artifact in run["artifacts"]]
+        assert run["artifacts"][1]["location"]["uri"].endswith("test_example_Dst.dec")
+    assert [(r["decays"], r["modes"]) for r in records] == [(2, 16), (5, 12)]
+    assert all(r["time"] > 0 for r in records)
+    assert all(r["peak_memory"] is None and not r["cached"] for r in records)
+    if fmt != "sarif":
+        assert [r["path"] for r in records] == paths
+        assert [d["code"] for d in records[0]["diagnostics"]] == ["DLW001", "DLW003"]
+        assert records[0]["diagnostics"][0]["line"] == 29
+        assert records[1]["diagnostics"] == []
+
+
+def test_main_prints_slowest_files(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    missing = str(tmp_path / "missing.dec")
+    path = str(DIR / "../data/test_example_Dst.dec")
+    args = ["--color=never", "--format=ndjson", "--trace-memory"]
+    assert main([*args, path, missing]) == 1
+
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records[1]["decays"] is None
+    assert all(r["peak_memory"] > 0 for r in records)
+
+    assert main([*args, "--slowest=1", path, missing]) == 1
+    summary = capsys.readouterr().err.splitlines()
+    assert len(summary) == 2
+    assert summary[0] == "slowest 1 file(s):"
+    assert "test_example_Dst.dec (5 decays, 12 decay modes, peak memory" in summary[1]
+
+    with pytest.raises(SystemExit, match="--slowest must be non-negative"):
+        main(["--slowest=-1", path])
+    with pytest.raises(SystemExit, match="--watch only supports"):
+        main(["--watch", "--format=json", path])
+
+
 def test_display_path_handles_cross_drive_paths(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
@@ -442,3 +826,11 @@ def test_display_path_handles_cross_drive_paths(
     monkeypatch.setattr(validate_module.os.path, "relpath", raise_value_error)
 
     assert validate_module._display_path(path) == str(path)
+
+
+def test_result_writer_requires_write() -> None:
+    class IncompleteWriter(validate_module._ResultWriter):
+        pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        IncompleteWriter(io.StringIO())
@@ -0,0 +1,116 @@
+# Copyright (c) 2018-2026, Eduardo Rodrigues and Henry Schreiner.
+#
+# Distributed under the 3-clause BSD license, see accompanying file LICENSE
+# or https://github.com/scikit-hep/decaylanguage for details.
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from pytest import approx
+
+from decaylanguage.dec.dec import DecFileParser
+from decaylanguage.decay.collection import DecayChainCollection
+from decaylanguage.decay.decay import DecayChain, DecayMode, FrozenDaughters
+
+DIR = Path(__file__).parent.resolve()
+
+
+@pytest.fixture
+def chains():
+    dm1 = DecayMode(0.6770, "D0 pi+", model="VSS")
+    dm2 = DecayMode(0.0124, "K_S0 pi0", model="PHSP", study="toy")
+    dm3 = DecayMode(0.692, "pi+ pi-")
+    dm4 = DecayMode(0.98823, "gamma gamma")
+    return [
+        DecayChain("D*+", {"D*+": dm1, "D0": dm2, "K_S0": dm3, "pi0": dm4}),
+        DecayChain("D0", {"D0": dm2, "K_S0": dm3}),
+        DecayChain("pi0", {"pi0": dm4}),
+    ]
+
+
+def test_round_trip(chains):
+    coll = DecayChainCollection(chains)
+    assert len(coll) == 3
+    assert coll.mothers == ["D*+", "D0", "pi0"]
+    assert [dc.to_dict() for dc in coll] == [dc.to_dict() for dc in chains]
+    assert [dc.to_dict() for dc in coll.to_chains()] == [dc.to_dict() for dc in chains]
+    assert coll[-1].to_dict() == chains[-1].to_dict()
+    assert coll.to_descriptors() == [dc.to_string() for dc in chains]
+    with pytest.raises(IndexError):
+        _ = coll[3]
+
+
+def test_bf_and_visible_bf(chains):
+    coll = DecayChainCollection.from_chains(chains)
+    assert list(coll.bf) == [dc.bf for dc in chains]
+    assert list(coll.visible_bf) == approx([dc.visible_bf for dc in chains])
+
+
+def test_flatten(chains):
+    coll = DecayChainCollection(chains)
+    for stable in ((), ("pi0",), ("K_S0", "pi0")):
+        flat = coll.flatten(stable_particles=stable)
+        assert len(flat) == len(chains)
+        for fdc, dc in zip(flat, chains, strict=True):
+            expected = dc.flatten(stable_particles=stable)
+            assert fdc.bf == approx(expected.bf)
+            assert (
+                fdc.top_level_decay().daughters == expected.top_level_decay().daughters
+            )
+            assert fdc.top_level_decay().metadata == expected.top_level_decay().metadata
+    assert coll.final_states(["pi0"])[1] == FrozenDaughters("pi+ pi- pi0")
+
+
+def test_filter_and_slice(chains):
+    coll = DecayChainCollection(chains)
+    sub = coll.filter(bf < 0.5 for bf in coll.bf)
+    assert sub.mothers == ["D0"]
+    assert sub[0].to_dict() == chains[1].to_dict()
+    assert coll[1:].to_descriptors() == [dc.to_string() for dc in chains[1:]]
+    assert list(coll[::2].visible_bf) == approx(
+        [chains[0].visible_bf, chains[2].visible_bf]
+    )
+    with pytest.raises(ValueError, match="Mask length"):
+        coll.filter([True])
+
+
+def test_from_decay_chains_dict():
+    p = DecFileParser(DIR / "../data/test_example_Dst.dec")
+    p.parse()
+
+    coll = DecayChainCollection.from_decay_chains_dict(p.build_decay_chains("D*+"))
+    assert coll.to_descriptors() == p.expand_decay_modes("D*+")
+    assert set(coll.mothers) == {"D*+"}
+
+
+def test_from_decay_chains_dict_not_single_chain():
+    dc_dict = {
+        "eta": [
+            {
+                "bf": 0.3268,
+                "fs": [
+                    {
+                        "pi0": [
+                            {"bf": 0.98823, "fs": ["gamma", "gamma"]},
+                            {"bf": 0.01174, "fs": ["e+", "e-", "gamma"]},
+                        ]
+                    },
+                    {
+                        "pi0": [
+                            {"bf": 0.98823, "fs": ["gamma", "gamma"]},
+                            {"bf": 0.01174, "fs": ["e+", "e-", "gamma"]},
+                        ]
+                    },
+                ],
+            }
+        ]
+    }
+    coll = DecayChainCollection.from_decay_chains_dict(dc_dict)
+    assert len(coll) == 4
+    assert coll[0].visible_bf == approx(0.3268 * 0.98823**2)
+    with pytest.raises(RuntimeError):
+        _ = coll[1]
+    assert coll.final_states()[1] == FrozenDaughters("e+ e- gamma gamma gamma")
+    assert coll.visible_bf[1] == approx(0.3268 * 0.98823 * 0.01174)
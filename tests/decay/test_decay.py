@@ -6,15 +6,20 @@
 
 from __future__ import annotations
 
+from copy import deepcopy
+
 import pytest
 from particle import ParticleNotFound
 from pytest import approx
 
 from decaylanguage.decay.decay import (
+    _CHAIN_CACHE_SIZE,
     DaughtersDict,
     DecayChain,
     DecayMode,
+    FrozenDaughters,
     _build_decay_modes,
+    flatten_many,
 )
 
 
@@ -85,6 +90,39 @@ def test_DaughtersDict_charge_conjugate_pdg_names():
     assert dd.charge_conjugate(pdg_name=True) == {"K(S)0": 1, "pi-": 1}
 
 
+def test_FrozenDaughters_constructor_and_hash():
+    fd1 = FrozenDaughters("K+ K- K- pi0")
+    fd2 = FrozenDaughters(["pi0", "K-", "K+", "K-"])
+    fd3 = FrozenDaughters({"K-": 2, "pi0": 1, "K+": 1, "pi-": 0})
+    assert fd1 == fd2 == fd3
+    assert len({fd1, fd2, fd3}) == 1
+    assert fd1.items() == (("K+", 1), ("K-", 2), ("pi0", 1))
+    assert len(fd1) == 4
+    assert fd1["K-"] == 2
+    assert fd1["pi+"] == 0
+    assert "pi0" in fd1
+    assert fd1.to_string() == "K+ K- K- pi0"
+    assert fd1 == {"K+": 1, "K-": 2, "pi0": 1}
+
+
+def test_FrozenDaughters_add_sub():
+    fd1 = FrozenDaughters({"K+": 1, "K-": 2, "pi0": 3})
+    fd2 = FrozenDaughters({"K-": 1, "pi0": 1, "gamma": 1})
+    assert fd1 + fd2 == FrozenDaughters({"K+": 1, "K-": 3, "pi0": 4, "gamma": 1})
+    assert fd1 - fd2 == FrozenDaughters({"K+": 1, "K-": 1, "pi0": 2})
+    assert fd1 + DaughtersDict("pi0") == FrozenDaughters({"K+": 1, "K-": 2, "pi0": 4})
+
+
+def test_FrozenDaughters_DaughtersDict_round_trip():
+    dd = DaughtersDict("K+ K- pi0 pi0")
+    fd = dd.freeze()
+    assert isinstance(fd, FrozenDaughters)
+    assert fd == FrozenDaughters.from_daughters_dict(dd)
+    assert fd.to_daughters_dict() == dd
+    assert DaughtersDict(fd) == dd
+    assert fd.charge_conjugate() == dd.charge_conjugate().freeze()
+
+
 def test_DecayMode_constructor_default():
     dm = DecayMode()
     assert dm.bf == 0
@@ -158,6 +196,20 @@ def test_DecayMode_constructor_from_dict():
     assert str(dm) == "<DecayMode: daughters=gamma gamma, BF=0.98823>"
 
 
+def test_DecayMode_constructor_from_dict_no_copy():
+    params = [0.1, 0.2]
+    dm_dict = {"bf": 0.5, "fs": ["K+", "K-"], "model": "SVS", "model_params": params}
+    dm = DecayMode.from_dict(dm_dict, copy=False)
+    assert dm.metadata["model_params"] is params
+    assert dm_dict == {
+        "bf": 0.5,
+        "fs": ["K+", "K-"],
+        "model": "SVS",
+        "model_params": [0.1, 0.2],
+    }
+    assert DecayMode.from_dict(dm_dict).metadata["model_params"] is not params
+
+
 def test_DecayMode_constructor_from_dict_RuntimeError():
     with pytest.raises(RuntimeError):
         _ = DecayMode.from_dict({"bf": 0.98823, "model": "PHSP"})
@@ -333,6 +385,32 @@ def test_DecayChain_from_dict_roundtrip_repeated_subdecay():
     assert DecayChain.from_dict(dc_dict).to_dict() == dc_dict
 
 
+def test_DecayChain_from_dict_no_copy(dc2):
+    dc_dict = dc2.to_dict()
+    dc_dict_before = deepcopy(dc_dict)
+    dc = DecayChain.from_dict(dc_dict, copy=False)
+    # The input is never modified
+    assert dc_dict == dc_dict_before
+    assert dc.to_dict() == dc_dict
+    assert DecayChain.from_dict(dc_dict).to_dict() == dc.to_dict()
+
+
+def test_DecayChain_from_dict_conflicting_subdecays():
+    dc_dict = {
+        "eta": [
+            {
+                "bf": 1.0,
+                "fs": [
+                    {"pi0": [{"bf": 0.98823, "fs": ["gamma", "gamma"]}]},
+                    {"pi0": [{"bf": 0.01174, "fs": ["e+", "e-", "gamma"]}]},
+                ],
+            }
+        ]
+    }
+    with pytest.raises(RuntimeError):
+        _ = DecayChain.from_dict(dc_dict, copy=False)
+
+
 def test_DecayChain_constructor_from_dict_multiple_final_states():
     dc_dict = {
         "MyD-": [
@@ -476,6 +554,70 @@ def test_DecayChain_flatten_stable_particles_no_substring_match():
     assert dc_flatten.decays["D0"].daughters == DaughtersDict(["K_S0", "pi0"])
 
 
+def test_DecayChain_flatten_cache_invalidation():
+    dm1 = DecayMode(0.0124, "K_S0 pi0")
+    dm2 = DecayMode(0.692, "pi+ pi-")
+    dc = DecayChain("D0", {"D0": dm1, "K_S0": dm2})
+    assert dc.visible_bf == approx(0.0124 * 0.692)
+    # Repeated calls are served from the cache but return fresh objects
+    assert dc.flatten() is not dc.flatten()
+    dc.decays["pi0"] = DecayMode(0.98823, "gamma gamma")
+    assert dc.visible_bf == approx(0.0124 * 0.692 * 0.98823)
+    assert dc.flatten().decays["D0"].daughters == DaughtersDict("gamma gamma pi+ pi-")
+    dm2.bf = 0.5
+    assert dc.visible_bf == approx(0.0124 * 0.5 * 0.98823)
+    assert dc.flatten(stable_particles=["pi0"]).bf == approx(0.0124 * 0.5)
+
+
+def test_DecayChain_cache_in_place_changes():
+    dm1 = DecayMode(0.0124, "K_S0 pi0", model="PHSP")
+    dm2 = DecayMode(0.692, "pi+ pi-", model="VSS", model_params=[1.0])
+    dc = DecayChain("D0", {"D0": dm1, "K_S0": dm2})
+    other = DecayChain("D0", {"D0": dm1, "K_S0": DecayMode(0.692, "pi+ pi-")})
+    h, content = hash(dc), dc.content_hash()
+    assert dc.flatten().decays["D0"].daughters == DaughtersDict("pi+ pi- pi0")
+    # In-place changes to daughters and models invalidate the cached values
+    dm2.daughters["pi-"] = 0
+    dm2.daughters["pi0"] = 1
+    assert dc.flatten().decays["D0"].daughters == DaughtersDict("pi+ pi0 pi0")
+    dm2.metadata["model_params"].append(2.0)
+    assert dc.content_hash() != content
+    assert dc.canonical_form()[4][0][3] == (1.0, 2.0)
+    dm2.daughters.update({"pi-": 1, "pi0": -1})
+    dm2.metadata["model"] = ""
+    dm2.metadata["model_params"] = ""
+    assert dc == other
+    assert hash(dc) == hash(other) != h
+
+
+def test_DecayChain_cache_size():
+    dc = DecayChain("D0", {"D0": DecayMode(1.0, "K_S0 pi0")})
+    for i in range(100):
+        dc.flatten(stable_particles=[f"X{i}"])
+    assert len(dc._cache) == _CHAIN_CACHE_SIZE
+    # The least recently used entries are discarded first
+    assert ("flatten", frozenset(["X99"])) in dc._cache
+    assert ("flatten", frozenset(["X0"])) not in dc._cache
+
+
+def test_DecayChain_flatten_repeated_subdecays():
+    dm1 = DecayMode(1.0, "eta eta")
+    dm2 = DecayMode(0.3268, "pi0 pi0 pi0")
+    dm3 = DecayMode(0.98823, "gamma gamma")
+    dc = DecayChain("X", {"X": dm1, "eta": dm2, "pi0": dm3})
+    dc_flatten = dc.flatten()
+    assert dc_flatten.decays["X"].daughters == DaughtersDict({"gamma": 12})
+    assert dc_flatten.bf == approx(0.3268**2 * 0.98823**6)
+
+
+def test_flatten_many(dc, dc2):
+    flattened = flatten_many([dc, dc2], stable_particles=["pi0"])
+    assert [f.to_dict() for f in flattened] == [
+        dc.flatten(stable_particles=["pi0"]).to_dict(),
+        dc2.flatten(stable_particles=["pi0"]).to_dict(),
+    ]
+
+
 def test_DecayChain_string_repr(dc):
     assert str(dc) == "<DecayChain: D0 -> K_S0 pi0 (2 sub-decays), BF=0.0124>"
 
@@ -493,3 +635,66 @@ def test_build_decay_modes_RuntimeError(dc2):
     decay_modes = {}
     with pytest.raises(RuntimeError):
         _ = _build_decay_modes(decay_modes, bad_dc_of_mother_as_dict)
+
+
+def test_DecayChain_canonical_form_and_hash(monkeypatch):
+    dm1 = DecayMode(0.6770, "D0 pi+", model="VSS")
+    dm2 = DecayMode(0.0124, "K_S0 pi0", model="PHSP")
+    dm3 = DecayMode(0.692, "pi+ pi-")
+    dc1 = DecayChain("D*+", {"D*+": dm1, "D0": dm2, "K_S0": dm3})
+
+    # Same content, different daughter and sub-decay orders
+    dc2 = DecayChain(
+        "D*+",
+        {
+            "K_S0": DecayMode(0.692, "pi- pi+"),
+            "D0": DecayMode(0.0124, "pi0 K_S0", model="PHSP"),
+            "D*+": DecayMode(0.6770, "pi+ D0", model="VSS"),
+        },
+    )
+    assert dc1 == dc2
+    assert hash(dc1) == hash(dc2)
+    assert dc1.content_hash() == dc2.content_hash()
+    assert len({dc1, dc2}) == 1
+    assert dc1 != "D*+"
+
+    # Branching fractions are rounded to the requested significant digits
+    dc3 = DecayChain(
+        "D*+", {"D*+": dm1, "D0": dm2, "K_S0": DecayMode(0.69201, "pi+ pi-")}
+    )
+    assert dc1 != dc3
+    assert dc1.canonical_form(bf_digits=3) == dc3.canonical_form(bf_digits=3)
+    assert dc1.content_hash(bf_digits=3) == dc3.content_hash(bf_digits=3)
+
+    # Rounding is not a tolerance, and None requests an exact comparison
+    dc5 = DecayChain("K_S0", {"K_S0": DecayMode(0.123449, "pi+ pi-")})
+    dc6 = DecayChain("K_S0", {"K_S0": DecayMode(0.123451, "pi+ pi-")})
+    dc7 = DecayChain("K_S0", {"K_S0": DecayMode(0.123449000001, "pi+ pi-")})
+    assert dc5.canonical_form(bf_digits=4) != dc6.canonical_form(bf_digits=4)
+    assert dc5 == dc7
+    assert dc5.canonical_form(bf_digits=None) != dc7.canonical_form(bf_digits=None)
+    assert dc5.content_hash(bf_digits=None) != dc7.content_hash(bf_digits=None)
+
+    # Hashing follows the class default, as comparisons do
+    assert hash(dc5) == hash(dc7)
+    monkeypatch.setattr(DecayChain, "bf_digits", None)
+    assert dc5 != dc7
+    assert hash(dc5) != hash(dc7)
+    assert len({dc5, dc7}) == 2
+
+    # Models matter, other metadata does not
+    dc4 = DecayChain(
+        "D*+",
+        {"D*+": dm1, "D0": dm2, "K_S0": DecayMode(0.692, "pi+ pi-", model="PHSP")},
+    )
+    assert dc1 != dc4
+    dc5 = DecayChain(
+        "D*+", {"D*+": dm1, "D0": dm2, "K_S0": DecayMode(0.692, "pi+ pi-", study="toy")}
+    )
+    assert dc1 == dc5
+
+    # The cached canonical form follows modifications of the chain
+    h = dc2.content_hash()
+    dc2.decays["K_S0"] = DecayMode(0.5, "pi+ pi-")
+    assert dc2.content_hash() != h
+    assert dc1 != dc2
@@ -7,7 +7,14 @@ from __future__ import annotations
 
 import pytest
 
-from decaylanguage import DecayChain, DecayMode
+from decaylanguage import DaughtersDict, DecayChain, DecayMode
+from decaylanguage.decay import descriptor as descriptor_module
+from decaylanguage.decay.descriptor import (
+    DescriptorNode,
+    parse_descriptor,
+    parse_descriptors,
+)
+from decaylanguage.utils import DescriptorFormat
 
 dm1 = DecayMode(0.6770, "D0 pi+")  # D*+
 dm2 = DecayMode(0.0124, "K_S0 pi0")  # D0
@@ -45,3 +52,130 @@ dm9b = DecayMode(0.154, "pi+ pi- pi0")  #  phi
 def test_descriptor(dc: DecayChain, expected: str):
     descriptor = dc.to_string()
     assert descriptor == expected
+
+
+@pytest.mark.parametrize(
+    "descriptor",
+    [
+        "D0 -> (K_S0 -> pi+ pi-) (pi0 -> gamma gamma)",
+        "D*+ -> (D0 -> (K_S0 -> pi+ pi-) (pi0 -> gamma gamma)) pi+",
+        "B0 -> (D- -> K+ pi- pi-) (tau+ -> anti-nu_tau pi+ pi+ pi-) nu_tau",
+        "B_s0 -> (phi -> K+ K-) (phi' -> pi+ pi- pi0)",
+        "B0 -> (a_1(1260)+ -> (rho(770)0 -> pi+ pi-) pi+) (psi(2S) -> mu+ mu-) K(S)0",
+    ],
+)
+def test_parse_descriptor_round_trip(descriptor: str):
+    tree = parse_descriptor(descriptor)
+    assert tree.to_string() == descriptor
+    assert tree.to_decay_chain().to_string() == descriptor
+
+
+def test_parse_descriptor_tree():
+    tree = parse_descriptor("D*+ -> (D0 -> K- pi+) pi+")
+    assert tree == DescriptorNode("D*+", (DescriptorNode("D0", ("K-", "pi+")), "pi+"))
+
+    dc = tree.to_decay_chain()
+    assert dc.mother == "D*+"
+    assert set(dc.decays) == {"D*+", "D0"}
+    assert dc.decays["D0"].daughters == DaughtersDict("K- pi+")
+
+    with pytest.raises(RuntimeError):
+        parse_descriptor("B_s0 -> (phi -> K+ K-) (phi -> pi+ pi- pi0)").to_decay_chain()
+
+
+@pytest.mark.parametrize(
+    ("decay_pattern", "sub_decay_pattern", "descriptor"),
+    [
+        (
+            "{mother} --> {daughters}",
+            "[{mother} --> {daughters}]",
+            "D*+ --> [D0 --> [K_S0 --> pi+ pi-] [pi0 --> gamma gamma]] pi+",
+        ),
+        (
+            "{mother} => {daughters}",
+            "{mother} (=> {daughters})",
+            "D*+ => D0 (=> K_S0 (=> pi+ pi-) pi0 (=> gamma gamma)) pi+",
+        ),
+        (
+            "{mother}->{daughters}",
+            "[{mother}->{daughters}]",
+            "D*+->[D0->[K_S0->pi+ pi-] [pi0->gamma gamma]] pi+",
+        ),
+        (
+            "{mother} decays to {daughters}",
+            "({mother} decays to {daughters})",
+            "D*+ decays to (D0 decays to (K_S0 decays to pi+ pi-) (pi0 decays to gamma gamma)) pi+",
+        ),
+    ],
+)
+def test_parse_descriptor_format(decay_pattern, sub_decay_pattern, descriptor):
+    with DescriptorFormat(decay_pattern, sub_decay_pattern):
+        (tree,) = parse_descriptors([descriptor])
+        assert tree.to_string() == descriptor
+    assert tree.to_decay_chain() == DecayChain(
+        "D*+",
+        {
+            "D*+": DecayMode(0, "D0 pi+"),
+            "D0": DecayMode(0, "K_S0 pi0"),
+            "K_S0": DecayMode(0, "pi+ pi-"),
+            "pi0": DecayMode(0, "gamma gamma"),
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "descriptor",
+    [
+        "",
+        "D0",
+        "D0 ->",
+        "D0 K- pi+",
+        "D0 -> (K_S0 -> pi+ pi-",
+        "D0 -> (K_S0 pi+ pi-)",
+        "D0 -> K- pi+)",
+        "D0 -> () pi+",
+    ],
+)
+def test_parse_descriptor_invalid(descriptor):
+    with pytest.raises(ValueError, match="Invalid decay descriptor"):
+        parse_descriptor(descriptor)
+
+
+def test_parse_descriptors_bulk():
+    descriptors = ["D0 -> K- pi+", "D+ -> K- pi+ pi+", "D0 -> K- pi+"]
+    trees = parse_descriptors(descriptors)
+    assert [t.to_string() for t in trees] == descriptors
+    assert trees[0] is trees[2]
+
+
+@pytest.mark.parametrize(
+    "descriptor",
+    [
+        "D*+ -> (D0 -> K- pi+) pi+",
+        "B0 -> (a_1(1260)+ -> (rho(770)0 -> pi+ pi-) pi+) (psi(2S) -> mu+ mu-) K(S)0",
+        "B0 -> (K(S)0 -> pi+ pi-) K(S)0)",
+        "B0 -> K(S)0) pi+",
+        "D0 -> (X)0 pi+",
+        "D0 -> (K(S -> pi+ pi-) pi0",
+        "D0 -> ((K_S0 -> pi+ pi-)) pi0",
+        "D0 -> pi+)pi-",
+        "(D0 -> K- pi+)",
+    ],
+)
+def test_parse_descriptor_fast_path(descriptor):
+    # The word-by-word parsing of the usual patterns agrees with the general parser
+    fast = descriptor_module._compile_parser(
+        "{mother} -> {daughters}", "({mother} -> {daughters})"
+    )
+    general = descriptor_module._DescriptorParser(
+        "{mother} -> {daughters}", "({mother} -> {daughters})"
+    )
+    general._by_words = False
+
+    def parse(parser):
+        try:
+            return parser.parse(descriptor)
+        except ValueError as e:
+            return str(e)
+
+    assert parse(fast) == parse(general)
@@ -0,0 +1,52 @@
+# Copyright (c) 2018-2026, Eduardo Rodrigues and Henry Schreiner.
+#
+# Distributed under the 3-clause BSD license, see accompanying file LICENSE
+# or https://github.com/scikit-hep/decaylanguage for details.
+
+from __future__ import annotations
+
+import random
+
+import pytest
+from particle.converters import PDG2EvtGenNameMap
+
+from decaylanguage.decay.descriptor import parse_descriptors
+from decaylanguage.utils import DescriptorFormatter
+
+
+@pytest.fixture(scope="module")
+def descriptors():
+    """
+    100k distinct descriptors of random decay chains of particles with EvtGen names,
+    such as "K*(892)0", with two to four daughters and up to two levels of sub-decays.
+    """
+    names = sorted(set(PDG2EvtGenNameMap.values()))
+    formatter = DescriptorFormatter()
+    rng = random.Random(0)
+
+    def descriptor(mother, depth):
+        daughters = [
+            descriptor(rng.choice(names), depth + 1)
+            if depth < 2 and rng.random() < 0.2
+            else rng.choice(names)
+            for _ in range(rng.randint(2, 4))
+        ]
+        return formatter.format_descriptor(mother, " ".join(daughters), depth == 0)
+
+    unique: dict[str, None] = {}
+    while len(unique) < 100_000:
+        unique[descriptor(rng.choice(names), 0)] = None
+    return list(unique)
+
+
+@pytest.mark.benchmark
+def test_parse_descriptors_benchmark(descriptors, benchmark):
+    """
+    Bulk parsing of distinct descriptors, see the ``parse_descriptors`` docstring
+    for the rate achieved.
+    """
+    result = benchmark.pedantic(parse_descriptors, args=(descriptors,), rounds=3)
+    assert len(result) == len(descriptors)
+    assert [tree.mother for tree in result] == [
+        descriptor.split(" ", 1)[0] for descriptor in descriptors
+    ]
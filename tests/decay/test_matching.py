@@ -0,0 +1,110 @@
+# Copyright (c) 2018-2026, Eduardo Rodrigues and Henry Schreiner.
+#
+# Distributed under the 3-clause BSD license, see accompanying file LICENSE
+# or https://github.com/scikit-hep/decaylanguage for details.
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from pytest import approx
+
+from decaylanguage.dec.dec import DecFileParser
+from decaylanguage.decay.decay import DecayChain, DecayMode
+from decaylanguage.decay.matching import DecayPattern
+
+DIR = Path(__file__).parent.resolve()
+
+dm1 = DecayMode(0.6770, "D0 pi+")  # D*+
+dm2 = DecayMode(0.0124, "K_S0 pi0")  # D0
+dm3 = DecayMode(0.692, "pi+ pi-")  # K_S0
+dm4 = DecayMode(0.98823, "gamma gamma")  # pi0
+dc = DecayChain("D*+", {"D*+": dm1, "D0": dm2, "K_S0": dm3, "pi0": dm4})
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected"),
+    [
+        ("D*+ -> D0 pi+", True),
+        ("D*+ -> pi+ D0", True),
+        ("D*+ -> D0 pi+ pi0", False),
+        ("D*+ -> D0 ...", True),
+        ("D*+ -> ...", True),
+        ("D*+ -> D0 pi- ...", False),
+        ("D*+ -> (D0 -> K_S0 pi0) pi+", True),
+        ("D*+ -> (D0 -> (K_S0 -> pi+ pi-) (pi0 -> gamma gamma)) pi+", True),
+        ("D*+ -> (D0 -> (K_S0 -> pi0 pi0) ...) pi+", False),
+        ("D*+ -> (D0 -> (K_S0 -> ...) ...) ...", True),
+        ("D*- -> anti-D0 pi-", False),
+        ("[D*- -> (anti-D0 -> K_S0 ...) pi-]CC", True),
+        ("D0 -> K_S0 pi0", False),
+    ],
+)
+def test_matches(pattern, expected):
+    assert DecayPattern(pattern).matches(dc) is expected
+
+
+def test_match_details():
+    pattern = DecayPattern("[D*+ -> ^(D0 -> (K_S0 -> pi+ pi-) ...) ^pi+]CC")
+    assert pattern.mother == "D*+"
+    assert pattern.marked == ["D0", "pi+"]
+
+    match = pattern.match(dc)
+    assert match is not None
+    assert match.marked == ("D0", "pi+")
+    assert match.bf == approx(0.677 * 0.0124 * 0.692)
+    assert set(match.chain.decays) == {"D*+", "D0", "K_S0"}
+
+    cc = DecayChain(
+        "D*-",
+        {
+            "D*-": DecayMode(0.677, "anti-D0 pi-"),
+            "anti-D0": DecayMode(0.0124, "K_S0 pi0"),
+            "K_S0": dm3,
+        },
+    )
+    assert pattern.match(cc).marked == ("anti-D0", "pi-")
+
+
+def test_invalid_pattern():
+    with pytest.raises(ValueError, match="Invalid decay"):
+        DecayPattern("D0 -> (K_S0 -> pi+ pi-")
+    with pytest.raises(ValueError, match="cannot decay"):
+        DecayPattern("D0 -> (... -> pi+ pi-) pi0")
+
+
+def test_find():
+    p = DecFileParser(DIR / "../data/test_example_Dst.dec")
+    p.parse()
+
+    matches = DecayPattern("[D*+ -> D0 ...]CC").find(p)
+    assert [m.chain.to_string() for m in matches] == [
+        "D*+ -> D0 pi+",
+        "D*- -> anti-D0 pi-",
+    ]
+
+    matches = DecayPattern("D*+ -> ^(D+ -> K- pi+ pi+ (pi0 -> ...)) ...").find(p)
+    assert len(matches) == 8
+    assert {m.marked for m in matches} == {("D+",)}
+    assert sum(m.bf for m in matches) == approx(0.307 + 0.016, rel=1e-6)
+    for m in matches:
+        assert DecayPattern("D*+ -> (D+ -> K- pi+ pi+ (pi0 -> ...)) ...").matches(
+            m.chain
+        )
+
+    # Each pi0 decays independently, as long as it is the same decay mode
+    matches = DecayPattern("D*+ -> (D+ -> ...) (pi0 -> gamma gamma)").find(p)
+    assert len(matches) == 1
+    assert matches[0].bf == approx(0.307 * 0.988228297)
+
+    assert DecayPattern("D*+ -> D0 pi0").find(p) == []
+
+
+def test_find_with_aliases():
+    p = DecFileParser(DIR / "../data/test_Bc2BsPi_Bs2KK.dec")
+    p.parse()
+
+    matches = DecayPattern("[B_c+ -> ^(B_s0 -> K+ K-) pi+]CC").find(p)
+    assert [m.chain.mother for m in matches] == ["B_c+sig", "B_c-sig"]
+    assert [m.marked for m in matches] == [("B_s0",), ("anti-B_s0",)]
@@ -0,0 +1,102 @@
+# Copyright (c) 2018-2026, Eduardo Rodrigues and Henry Schreiner.
+#
+# Distributed under the 3-clause BSD license, see accompanying file LICENSE
+# or https://github.com/scikit-hep/decaylanguage for details.
+
+from __future__ import annotations
+
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+from decaylanguage.dec.dec import DecFileParser
+from decaylanguage.decay.decay import DecayChain, DecayMode
+from decaylanguage.decay.serialization import (
+    DecayChainReader,
+    DecayChainWriter,
+    dump_chains,
+    iter_chains,
+    load_chains,
+)
+
+DIR = Path(__file__).parent.resolve()
+
+
+@pytest.fixture
+def chains():
+    dm1 = DecayMode(0.6770, "D0 pi+", model="VSS")
+    dm2 = DecayMode(0.0124, "K_S0 pi0", model="PHSP", study="toy")
+    dm3 = DecayMode(0.692, "pi+ pi-")
+    dm4 = DecayMode(
+        0.98823, "gamma gamma", model="VUB", model_params=[1.0, "K", 0.1e-3]
+    )
+    return [
+        DecayChain("D*+", {"D*+": dm1, "D0": dm2, "K_S0": dm3, "pi0": dm4}),
+        DecayChain("D0", {"D0": dm2, "K_S0": dm3}),
+        DecayChain("pi0", {"pi0": dm4}),
+    ]
+
+
+@pytest.mark.parametrize("fmt", ["binary", "json"])
+def test_round_trip(chains, fmt):
+    buffer = BytesIO()
+    assert dump_chains(chains, buffer, format=fmt) == 3
+
+    buffer.seek(0)
+    with DecayChainReader(buffer) as reader:
+        assert reader.format == fmt
+        loaded = list(reader)
+    assert [dc.to_dict() for dc in loaded] == [dc.to_dict() for dc in chains]
+
+
+@pytest.mark.parametrize("fmt", ["binary", "json"])
+def test_round_trip_file(tmp_path, fmt):
+    p = DecFileParser(DIR / "../data/test_Bc2BsPi_Bs2KK.dec")
+    p.parse()
+    dc = DecayChain.from_dict(p.build_decay_chains("B_c+sig"))
+    path = tmp_path / f"chains.{fmt}"
+
+    with DecayChainWriter(path, format=fmt) as writer:
+        writer.write_many([dc] * 10)
+        assert writer.count == 10
+
+    loaded = list(iter_chains(path))
+    assert len(loaded) == 10
+    assert all(ldc.to_dict() == dc.to_dict() for ldc in loaded)
+
+
+def test_string_table_is_shared(chains):
+    binary = BytesIO()
+    dump_chains(chains * 100, binary)
+    single = BytesIO()
+    dump_chains(chains, single)
+    # The repeated chains only add the (fixed-size) records, not their strings
+    assert len(binary.getvalue()) < 100 * len(single.getvalue())
+
+    binary.seek(0)
+    loaded = load_chains(binary)
+    # Mutable metadata must not be shared between decoded decay modes
+    loaded[0].decays["pi0"].metadata["model_params"].append(2.0)
+    assert loaded[2].decays["pi0"].metadata["model_params"] == [1.0, "K", 0.1e-3]
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError, match="Unknown format"):
+        DecayChainWriter(BytesIO(), format="xml")
+    with pytest.raises(ValueError, match="not a serialized stream"):
+        DecayChainReader(BytesIO(b"Decay D0\n"))
+    with pytest.raises(ValueError, match="Unsupported serialization format version"):
+        DecayChainReader(
+            BytesIO(b'{"format": "decaylanguage-decay-chains", "version": 99}\n')
+        )
+
+
+def test_truncated_binary_stream(chains):
+    buffer = BytesIO()
+    dump_chains(chains[:1], buffer)
+    data = buffer.getvalue()
+    # Every truncation of the record, following the 6-byte file header, is detected
+    for end in range(7, len(data)):
+        with pytest.raises(ValueError, match="Truncated decay chain stream"):
+            load_chains(BytesIO(data[:end]))
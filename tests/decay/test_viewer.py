@@ -6,13 +6,23 @@
 
 from __future__ import annotations
 
+import hashlib
+import shutil
+import threading
 from pathlib import Path
 
+import graphviz
 import pytest
 
 from decaylanguage.dec.dec import DecFileParser
-from decaylanguage.decay.decay import DecayChain
-from decaylanguage.decay.viewer import DecayChainViewer
+from decaylanguage.decay import viewer
+from decaylanguage.decay.decay import DecayChain, DecayMode
+from decaylanguage.decay.viewer import (
+    DecayChainViewer,
+    RenderCache,
+    RenderCacheInfo,
+    render_decay_chains,
+)
 
 DIR = Path(__file__).parent.resolve()
 
@@ -225,3 +235,315 @@ def test_show_effective_bf_chain():
     assert "eff BF: 0.677" in graph_output_as_dot
     assert "eff BF: 0.3034" in graph_output_as_dot  # 0.307*0.988228297
     assert "style=invis" in graph_output_as_dot
+
+
+def test_dot_output():
+    # The DOT statements are written directly, exactly as graphviz would
+    dc = DecayChain(
+        "D0",
+        {
+            "D0": DecayMode(0.0124, "K_L0 K_S0"),
+            "K_S0": DecayMode(0.692, "e+ e-"),
+            "K_L0": DecayMode(1e-05, "e+ e-"),
+        },
+    )
+    dcv = DecayChainViewer(dc, show_effective_bf=True)
+    # The Digraph is only instantiated on demand
+    assert dcv._graph is None
+    ee = '<<TABLE BORDER="0" CELLSPACING="0" CELLPADDING="0" BGCOLOR="#eef3f8"><TR><TD BORDER="0" CELLPADDING="2">e<SUP>+</SUP></TD><TD BORDER="0" CELLPADDING="2">e<SUP>-</SUP></TD></TR></TABLE>>'
+    expected = [
+        "// Created by https://github.com/scikit-hep/decaylanguage",
+        "digraph DecayChainGraph {",
+        "\tgraph [rankdir=LR]",
+        "\tnode [fontname=Helvetica fontsize=11 shape=oval]",
+        '\tedge [fontcolor="#4c4c4c" fontsize=11]',
+        '\tmother [label=<<TABLE BORDER="0" CELLSPACING="0" BGCOLOR="#568dba"><TR><TD BORDER="1" CELLPADDING="5" PORT="p0">D<SUP>0</SUP></TD></TR></TABLE>> shape=none]',
+        '\tdec0 [label=<<TABLE BORDER="0" CELLSPACING="0" BGCOLOR="#9abad6"><TR><TD BORDER="1" CELLPADDING="5" PORT="p0">K<SUB>L</SUB><SUP>0</SUP></TD></TR><TR><TD BORDER="1" CELLPADDING="5" PORT="p1">K<SUB>S</SUB><SUP>0</SUP></TD></TR></TABLE>> shape=none]',
+        "\tmother -> dec0 [label=0.0124]",
+        f'\tdec1 [label={ee} fillcolor="#eef3f8" style=filled]',
+        '\tdec2 [label="eff BF: 1.24e-07" fontcolor="#4c4c4c" shape=none]',
+        "\tdec1 -> dec2 [style=invis]",
+        '\tdec0:p0 -> dec1 [label="1e-05"]',
+        f'\tdec3 [label={ee} fillcolor="#eef3f8" style=filled]',
+        '\tdec4 [label="eff BF: 0.008581" fontcolor="#4c4c4c" shape=none]',
+        "\tdec3 -> dec4 [style=invis]",
+        "\tdec0:p1 -> dec3 [label=0.692]",
+        "}",
+    ]
+    assert dcv.to_string().splitlines() == expected
+    assert dcv.graph is dcv.graph
+    assert dcv.graph.source == dcv.to_string()
+
+
+def test_deduplicate():
+    p = DecFileParser(DIR / "../data/test_example_Dst.dec")
+    p.parse()
+    chain = p.build_decay_chains("D*+")
+
+    full = DecayChainViewer(chain).to_string()
+    dedup = DecayChainViewer(chain, deduplicate=True).to_string()
+    # The pi0 and D+ decay tables are drawn once and linked to
+    assert full.count("-> ") > dedup.count("-> ")
+    assert dedup.count("[label=0.988228297]") == 1
+    assert full.count("[label=0.988228297]") == 3
+    assert "dec4:p3 -> dec5 [style=dashed]" in dedup
+    assert "dec2:p1 -> dec5 [style=dashed]" in dedup
+
+    # No shared sub-decays, no change
+    chain = p.build_decay_chains("D*+", stable_particles=["D+", "D0", "pi0"])
+    assert (
+        DecayChainViewer(chain, deduplicate=True).to_string()
+        == DecayChainViewer(chain).to_string()
+    )
+
+
+def test_level_of_detail():
+    p = DecFileParser(DIR / "../data/test_example_Dst.dec")
+    p.parse()
+    chain = p.build_decay_chains("D*+")
+
+    out = DecayChainViewer(chain, max_depth=1).to_string()
+    assert 'dec1 [label="1 decay mode"' in out
+    assert '[label="1 decay mode, 4 sub-decay modes"' in out
+    assert "[label=0.988228297]" not in out
+
+    out = DecayChainViewer(chain, max_depth=0).to_string()
+    assert 'dec0 [label="3 decay modes, 15 sub-decay modes"' in out
+    assert "mother -> dec0 [style=dashed]" in out
+
+    out = DecayChainViewer(chain, max_modes_per_node=2).to_string()
+    assert "mother -> dec0 [label=0.677]" in out
+    assert '[label="1 more decay mode"' in out
+    assert "[label=0.016 style=dashed]" in out
+    assert '[label="2 more decay modes"' in out
+
+    out = DecayChainViewer(chain, min_effective_bf=0.01).to_string()
+    assert "[label=0.016]" in out
+    assert "[label=0.011738247]" not in out
+    assert "[label=0.01177 style=dashed]" in out
+
+    with pytest.raises(ValueError, match="max_depth"):
+        DecayChainViewer(chain, max_depth=-1)
+    with pytest.raises(ValueError, match="max_modes_per_node"):
+        DecayChainViewer(chain, max_modes_per_node=0)
+
+
+def test_render_decay_chains(tmp_path, monkeypatch):
+    p = DecFileParser(DIR / "../data/test_example_Dst.dec")
+    p.parse()
+
+    rendered = []
+    lock = threading.Lock()
+
+    def fake_render_dot(source, engine, format, path):
+        with lock:
+            rendered.append(path.name)
+        path.write_text(f"{engine} {format}\n{source}")
+
+    monkeypatch.setattr(viewer, "_render_dot", fake_render_dot)
+
+    outputs = render_decay_chains(p, outdir=tmp_path, format="pdf", jobs=3)
+    assert list(outputs) == p.list_decay_mother_names()
+    assert outputs["D*+"] == tmp_path / "D_+.pdf"
+    assert sorted(rendered) == sorted(path.name for path in outputs.values())
+    assert outputs["D*+"].read_text() == (
+        "dot pdf\n" + DecayChainViewer(p.build_decay_chains("D*+")).to_string()
+    )
+
+    # Nothing changed, nothing rendered
+    rendered.clear()
+    assert render_decay_chains(p, outdir=tmp_path, format="pdf") == outputs
+    assert rendered == []
+
+    # Only changed or missing outputs are rendered again
+    outputs["D0"].unlink()
+    render_decay_chains(
+        p, ["D*+", "D0"], tmp_path, format="pdf", show_effective_bf=True
+    )
+    assert sorted(rendered) == ["D0.pdf", "D_+.pdf"]
+    rendered.clear()
+    render_decay_chains(p, ["D*+", "D0"], tmp_path, "png")
+    assert sorted(rendered) == ["D0.png", "D_+.png"]
+
+    # Names mapped to the same file name are told apart by a hash of the name
+    q = DecFileParser.from_string(
+        """Decay D*+
+1.0 D0 pi+ VSS;
+Enddecay
+Decay D_+
+1.0 D0 pi+ PHSP;
+Enddecay
+"""
+    )
+    q.parse()
+    outputs = render_decay_chains(q, ["D*+", "D_+"], tmp_path / "clash")
+    assert outputs == {
+        "D*+": tmp_path / "clash" / f"D_+_{hashlib.sha256(b'D*+').hexdigest()[:8]}.svg",
+        "D_+": tmp_path / "clash" / f"D_+_{hashlib.sha256(b'D_+').hexdigest()[:8]}.svg",
+    }
+    # File names do not depend on the order and subset of the mothers
+    assert render_decay_chains(q, ["D_+", "D*+"], tmp_path / "clash") == outputs
+    assert render_decay_chains(q, ["D_+"], tmp_path / "clash") == {
+        "D_+": outputs["D_+"]
+    }
+
+    with pytest.raises(ValueError, match="jobs"):
+        render_decay_chains(p, outdir=tmp_path, jobs=0)
+
+
+def test_render_decay_chains_failure(tmp_path, monkeypatch):
+    p = DecFileParser(DIR / "../data/test_example_Dst.dec")
+    p.parse()
+
+    def pipe_dot(source, *_):
+        if source.count("->") == 1:
+            raise graphviz.CalledProcessError(1, ["dot"])
+        return source.encode()
+
+    monkeypatch.setattr(viewer, "_pipe_dot", pipe_dot)
+    with pytest.raises(graphviz.CalledProcessError):
+        render_decay_chains(p, ["D0", "D*+", "pi0"], tmp_path, jobs=2)
+    # The renderings that succeeded are recorded, failed ones leave no file behind
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        viewer._RENDER_MANIFEST,
+        "D_+.svg",
+        "pi0.svg",
+    ]
+
+    rendered = []
+    monkeypatch.setattr(
+        viewer,
+        "_render_dot",
+        lambda *args: rendered.append(args[-1].name),
+    )
+    render_decay_chains(p, ["D0", "D*+", "pi0"], tmp_path)
+    assert rendered == ["D0.svg"]
+
+
+@pytest.mark.skipif(shutil.which("dot") is None, reason="Graphviz not installed")
+def test_render_decay_chains_svg(tmp_path):
+    p = DecFileParser(DIR / "../data/test_example_Dst.dec")
+    p.parse()
+
+    outputs = render_decay_chains(p, ["D*+", "D0"], tmp_path, jobs=2)
+    assert outputs["D0"].read_text().startswith("<?xml")
+
+
+@pytest.fixture
+def fake_pipe_dot(monkeypatch):
+    calls = []
+
+    def pipe_dot(source, engine, format, *args):
+        assert engine in ("dot", "neato")
+        assert args == (None, None)
+        calls.append(format)
+        return f"<{format}>{len(source)}</{format}>".encode()
+
+    monkeypatch.setattr(viewer, "_pipe_dot", pipe_dot)
+    return calls
+
+
+def test_pipe_dot(monkeypatch):
+    calls = []
+
+    # Renderer and formatter are keyword-only, as recommended by graphviz
+    def pipe(engine, format, data, *, renderer=None, formatter=None):
+        calls.append((engine, format, data, renderer, formatter))
+        return b"<svg/>"
+
+    monkeypatch.setattr(graphviz, "pipe", pipe)
+    assert viewer._pipe_dot("digraph { a -> b }", "dot", "svg") == b"<svg/>"
+    assert viewer._pipe_dot("digraph {}", "neato", "png", "cairo", "gd") == b"<svg/>"
+    assert calls == [
+        ("dot", "svg", b"digraph { a -> b }", None, None),
+        ("neato", "png", b"digraph {}", "cairo", "gd"),
+    ]
+
+
+def test_render_cache(tmp_path, fake_pipe_dot):
+    cache = RenderCache(maxsize=2, directory=tmp_path / "cache")
+    assert cache.render("digraph { a -> b }") == b"<svg>18</svg>"
+    assert cache.render("digraph { a -> b }") == b"<svg>18</svg>"
+    assert cache.render("digraph { a -> b }", format="png") == b"<png>18</png>"
+    assert fake_pipe_dot == ["svg", "png"]
+    assert cache.cache_info() == RenderCacheInfo(1, 0, 2, 2, 2)
+
+    # Least recently used rendering evicted from memory, still on disk
+    cache.render("digraph { a -> c }")
+    cache.render("digraph { a -> b }", format="png")
+    cache.render("digraph { a -> b }")
+    assert fake_pipe_dot == ["svg", "png", "svg"]
+    assert cache.cache_info() == RenderCacheInfo(2, 1, 3, 2, 2)
+
+    # The on-disk cache persists across cache instances
+    unrelated = tmp_path / "cache" / "DECAY_LHCB.snapshot"
+    unrelated.write_bytes(b"x" * 100)
+    cache = RenderCache(directory=tmp_path / "cache", max_disk_bytes=30)
+    assert cache.render("digraph { a -> c }") == b"<svg>18</svg>"
+    assert cache.cache_info() == RenderCacheInfo(0, 1, 0, 1, 64)
+    # The least recently used files are removed beyond the size limit
+    cache.render("digraph { a -> d }", engine="neato")
+    assert len(list((tmp_path / "cache").iterdir())) == 3
+
+    # Files not written by the cache are neither pruned nor cleared
+    cache.clear(disk=True)
+    assert cache.cache_info() == RenderCacheInfo(0, 0, 0, 0, 64)
+    assert list((tmp_path / "cache").iterdir()) == [unrelated]
+
+    with pytest.raises(ValueError, match="maxsize"):
+        RenderCache(maxsize=-1)
+
+
+def test_render_cache_unwritable_directory(tmp_path, fake_pipe_dot):
+    # A file in place of the cache directory
+    directory = tmp_path / "cache"
+    directory.touch()
+    cache = RenderCache(directory=directory, max_disk_bytes=10)
+    assert cache.render("digraph { a -> b }") == b"<svg>18</svg>"
+    assert cache.render("digraph { a -> b }") == b"<svg>18</svg>"
+    assert cache.cache_info() == RenderCacheInfo(1, 0, 1, 1, 64)
+    assert fake_pipe_dot == ["svg"]
+    assert list(tmp_path.iterdir()) == [directory]
+
+
+def test_repr_mimebundle(monkeypatch, fake_pipe_dot):
+    monkeypatch.setattr(DecayChainViewer, "render_cache", RenderCache())
+    p = DecFileParser(DIR / "../data/test_example_Dst.dec")
+    p.parse()
+    dcv = DecayChainViewer(p.build_decay_chains("D*+"))
+
+    bundle = dcv._repr_mimebundle_()
+    assert list(bundle) == ["image/svg+xml"]
+    assert isinstance(bundle["image/svg+xml"], str)
+    # Displaying again the same chain needs no rendering
+    assert DecayChainViewer(p.build_decay_chains("D*+"))._repr_mimebundle_() == bundle
+    assert fake_pipe_dot == ["svg"]
+
+    bundle = dcv._repr_mimebundle_(
+        include=["image/svg+xml", "image/png"], exclude=["image/svg+xml"]
+    )
+    assert bundle == {"image/png": f"<png>{len(dcv.to_string())}</png>".encode()}
+    assert DecayChainViewer.render_cache.cache_info().hits == 1
+
+    assert dcv._repr_mimebundle_(include=[]) == {}
+    assert dcv._repr_mimebundle_(include=["text/plain"]) == {}
+    assert list(dcv._repr_mimebundle_(include=["image/svg+xml", "image/jpeg"])) == [
+        "image/jpeg",
+        "image/svg+xml",
+    ]
+    assert fake_pipe_dot == ["svg", "png", "jpeg"]
+
+
+def test_repr_mimebundle_jupyter_format(monkeypatch, fake_pipe_dot):
+    monkeypatch.setattr(DecayChainViewer, "render_cache", RenderCache())
+    p = DecFileParser(DIR / "../data/test_example_Dst.dec")
+    p.parse()
+    dcv = DecayChainViewer(p.build_decay_chains("D*+"))
+
+    old_format = graphviz.set_jupyter_format("png")
+    try:
+        bundle = dcv._repr_mimebundle_()
+    finally:
+        graphviz.set_jupyter_format(old_format)
+    assert list(bundle) == ["image/png"]
+    assert fake_pipe_dot == ["png"]
@@ -0,0 +1,34 @@
+# Copyright (c) 2018-2026, Eduardo Rodrigues and Henry Schreiner.
+#
+# Distributed under the 3-clause BSD license, see accompanying file LICENSE
+# or https://github.com/scikit-hep/decaylanguage for details.
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from decaylanguage.dec.dec import DecFileParser
+from decaylanguage.decay.viewer import DecayChainViewer
+
+DIR = Path(__file__).parent.resolve()
+
+
+@pytest.fixture
+def belle2_decay_chain():
+    p = DecFileParser(DIR / "../../src/decaylanguage/data/DECAY_BELLE2.DEC")
+    p.parse()
+    return p.build_decay_chains("D_s*+")
+
+
+def viewer_to_string_benchmark(chain):
+    return DecayChainViewer(chain, show_effective_bf=True).to_string()
+
+
+@pytest.mark.benchmark
+def test_viewer_to_string_benchmark(belle2_decay_chain, benchmark):
+    result = benchmark.pedantic(
+        viewer_to_string_benchmark, args=(belle2_decay_chain,), rounds=3
+    )
+    assert result.startswith("// Created by")
@@ -5,8 +5,37 @@
 
 from __future__ import annotations
 
+import subprocess
+import sys
+
+import pytest
+
 import decaylanguage
+from decaylanguage.dec.dec import DecFileParser
+from decaylanguage.decay.viewer import DecayChainViewer
 
 
 def test_main():
     assert decaylanguage is not None
+
+
+def test_lazy_attributes():
+    assert decaylanguage.DecFileParser is DecFileParser
+    assert decaylanguage.decay.DecayChainViewer is DecayChainViewer
+    assert decaylanguage.dec.known_decay_models
+    with pytest.raises(AttributeError, match="has no attribute 'DecayChainView'"):
+        decaylanguage.DecayChainView  # noqa: B018
+
+
+def test_lazy_imports():
+    # In a new interpreter, since the modules are imported by other tests
+    code = """
+import sys
+from decaylanguage import DecayChain, DecayMode
+DecayChain("D0", {"D0": DecayMode(1.0, "K- pi+")}).to_string()
+print(*sorted({"graphviz", "lark", "particle"} & set(sys.modules)))
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ""
@@ -0,0 +1,78 @@
+# Copyright (c) 2018-2026, Eduardo Rodrigues and Henry Schreiner.
+#
+# Distributed under the 3-clause BSD license, see accompanying file LICENSE
+# or https://github.com/scikit-hep/decaylanguage for details.
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+
+def top_level_import_times(statement):
+    """
+    Cumulative import times in microseconds of the modules imported at top level
+    by the statement in a new interpreter, as reported by ``python -X importtime``.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines()[1:]:
+        # "import time: self [us] | cumulative | imported package", indented if nested
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def import_time(statement):
+    """
+    Total import time in microseconds of the statement, not counting the modules
+    imported at the interpreter startup. Modules imported on first use, by the lazy
+    attributes of the package, are reported at top level.
+    """
+    startup = top_level_import_times("pass")
+    times = top_level_import_times(statement)
+    return sum(t for name, t in times.items() if name not in startup)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import decaylanguage",
+        "from decaylanguage import DecayMode",
+        "from decaylanguage import DecFileParser",
+    ],
+)
+def test_import_benchmark(statement, benchmark):
+    total = benchmark.pedantic(import_time, args=(statement,), rounds=5)
+    benchmark.extra_info["importtime_us"] = total
+    assert total > 0
+
+
+def run_cli(args):
+    """Run the command-line interface in a new interpreter."""
+    return subprocess.run(
+        [sys.executable, "-m", "decaylanguage", *args],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "args",
+    [["--help"], ["convert", "--help"], ["validate", "--help"]],
+    ids=" ".join,
+)
+def test_cli_startup_benchmark(args, benchmark):
+    result = benchmark.pedantic(run_cli, args=(args,), rounds=5)
+    assert result.stdout.startswith("usage: decaylanguage")
@@ -0,0 +1,99 @@
+# Copyright (c) 2018-2026, Eduardo Rodrigues and Henry Schreiner.
+#
+# Distributed under the 3-clause BSD license, see accompanying file LICENSE
+# or https://github.com/scikit-hep/decaylanguage for details.
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import decaylanguage.modeling.ampgen2goofit as ampgen2goofit_module
+from decaylanguage.__main__ import main
+
+DIR = Path(__file__).parent.resolve()
+
+MODEL = str(DIR / "../models/DtoKpipipi_v2.txt")
+
+
+def test_convert(monkeypatch):
+    # The conversion itself is tested in test_convert.py
+    calls = []
+    for generator in ("ampgen2goofit", "ampgen2goofitpy"):
+        monkeypatch.setattr(
+            ampgen2goofit_module,
+            generator,
+            lambda filename, generator=generator: calls.append((generator, filename)),
+        )
+    assert main(["convert", "-G", "goofit", MODEL]) == 0
+    assert main(["convert", "--generator=goofitpy", MODEL]) == 0
+    # Former command line, without subcommand
+    assert main(["-G", "goofit", MODEL]) == 0
+    assert main([MODEL, "-G", "goofitpy"]) == 0
+    assert main([MODEL, "--generator=goofit"]) == 0
+    assert calls == [
+        ("ampgen2goofit", MODEL),
+        ("ampgen2goofitpy", MODEL),
+        ("ampgen2goofit", MODEL),
+        ("ampgen2goofitpy", MODEL),
+        ("ampgen2goofit", MODEL),
+    ]
+
+
+def test_validate(capsys):
+    path = str(DIR / "data/duplicate-decays.dec")
+    assert main(["validate", "--color=never", path]) == 1
+    assert "DLW001" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        main(["validate", "--help"])
+    assert capsys.readouterr().out.startswith("usage: decaylanguage validate")
+
+
+def test_invalid_arguments(capsys):
+    with pytest.raises(SystemExit):
+        main([])
+    with pytest.raises(SystemExit):
+        main([MODEL])
+    assert "required: -G/--generator" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        main(["convert", "-G", "goofit", MODEL, "other.txt"])
+    assert "unrecognized arguments: other.txt" in capsys.readouterr().err
+
+
+def test_help_imports():
+    # The help does not import any subcommand dependencies
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "decaylanguage", "--help"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.startswith("usage: decaylanguage")
+    imported = {line.split("|")[2].strip() for line in result.stderr.splitlines()}
+    assert not imported & {"lark", "numpy", "pandas", "particle", "plumbum"}
+
+
+def test_validate_help_imports():
+    # The validation help does not import the parser nor the particle tables
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-m",
+            "decaylanguage",
+            "validate",
+            "--help",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.startswith("usage: decaylanguage validate")
+    imported = {line.split("|")[2].strip() for line in result.stderr.splitlines()}
+    assert "decaylanguage.dec.validate" in imported
+    assert not imported & {"hepunits", "lark", "particle"}
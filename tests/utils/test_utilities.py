@@ -5,12 +5,20 @@
 
 from __future__ import annotations
 
+import asyncio
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
 from decaylanguage import DecayChain, DecayMode
-from decaylanguage.utils import DescriptorFormat, filter_lines, split
+from decaylanguage.utils import (
+    DescriptorFormat,
+    DescriptorFormatter,
+    current_descriptor_formatter,
+    filter_lines,
+    split,
+)
 
 
 @pytest.mark.parametrize(
@@ -94,3 +102,190 @@ def test_set_descriptor_pattern(
     with DescriptorFormat(decay_pattern, sub_decay_pattern):
         descriptor = dc.to_string()
         assert descriptor == expected
+
+
+def test_descriptor_formatter():
+    dc = DecayChain("D*+", {"D*+": dm1, "D0": dm2, "K_S0": dm3, "pi0": dm4})
+    formatter = DescriptorFormatter(
+        "{mother} --> {daughters}", "[{mother} --> {daughters}]"
+    )
+    expected = "D*+ --> [D0 --> [K_S0 --> pi+ pi-] [pi0 --> gamma gamma]] pi+"
+    assert dc.to_string(formatter) == expected
+    # An explicit formatter takes precedence over that of the context
+    with DescriptorFormat("{mother} => {daughters}", "{mother} (=> {daughters})"):
+        assert dc.to_string(formatter) == expected
+    assert formatter == DescriptorFormatter(
+        "{mother} --> {daughters}", "[{mother} --> {daughters}]"
+    )
+    assert current_descriptor_formatter() == DescriptorFormatter()
+
+    # Patterns with format specs fall back on str.format
+    assert (
+        DescriptorFormatter("{mother!s:>4} -> {daughters}").format_descriptor(
+            "D0", "K- pi+"
+        )
+        == "  D0 -> K- pi+"
+    )
+    assert (
+        DescriptorFormatter("{daughters} <- {mother}").format_descriptor("D0", "K- pi+")
+        == "K- pi+ <- D0"
+    )
+    # Escaped braces
+    formatter = DescriptorFormatter(
+        "{{{mother}}} -> {daughters}", "({mother} -> {{{daughters}}})"
+    )
+    assert formatter.format_descriptor("D0", "K- pi+") == "{D0} -> K- pi+"
+    assert formatter.format_descriptor("D0", "K- pi+", top=False) == "(D0 -> {K- pi+})"
+    assert (
+        DescriptorFormatter("{{x}} {daughters} {{}} <- {mother}}}").format_descriptor(
+            "D0", "K- pi+"
+        )
+        == "{x} K- pi+ {} <- D0}"
+    )
+
+    with pytest.raises(ValueError, match="wildcards"):
+        DescriptorFormatter("{mother} -> {products}")
+    with pytest.raises(ValueError, match="wildcards"):
+        DescriptorFormat("{mother} -> {daughters}", "({mother})")
+
+
+def test_descriptor_format_is_context_local():
+    dc = DecayChain("D*+", {"D*+": dm1, "D0": dm2, "K_S0": dm3, "pi0": dm4})
+    patterns = [
+        ("{mother} -> {daughters}", "({mother} -> {daughters})"),
+        ("{mother} --> {daughters}", "[{mother} --> {daughters}]"),
+        ("{mother} => {daughters}", "{mother} (=> {daughters})"),
+    ]
+    expected = [DescriptorFormatter(*p).format_descriptor("D*+", "X") for p in patterns]
+
+    def describe(i: int) -> list[str]:
+        with DescriptorFormat(*patterns[i % 3]):
+            return [dc.to_string().split(" ")[1] for _ in range(50)]
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(describe, range(30)))
+    for i, arrows in enumerate(results):
+        assert set(arrows) == {expected[i % 3].split(" ")[1]}
+
+    async def describe_async(i: int) -> set[str]:
+        with DescriptorFormat(*patterns[i % 3]):
+            arrows = set()
+            for _ in range(5):
+                await asyncio.sleep(0)
+                arrows.add(dc.to_string().split(" ")[1])
+            return arrows
+
+    async def describe_all() -> list[set[str]]:
+        return await asyncio.gather(*(describe_async(i) for i in range(9)))
+
+    for i, arrows in enumerate(asyncio.run(describe_all())):
+        assert arrows == {expected[i % 3].split(" ")[1]}
+
+    assert dc.to_string().split(" ")[1] == "->"
+
+
+def test_descriptor_format_shared_instance():
+    dc = DecayChain("D0", {"D0": dm2, "K_S0": dm3})
+    shared = DescriptorFormat("{mother} => {daughters}", "[{mother} => {daughters}]")
+    assert shared.config == DescriptorFormat.config
+
+    async def describe() -> str:
+        # Blocks of the tasks entered and exited in interleaved order
+        with shared:
+            await asyncio.sleep(0)
+            return dc.to_string()
+
+    async def describe_all() -> list[str]:
+        return await asyncio.gather(*(describe() for _ in range(4)))
+
+    assert asyncio.run(describe_all()) == ["D0 => [K_S0 => pi+ pi-] pi0"] * 4
+    with shared, shared:
+        assert dc.to_string() == "D0 => [K_S0 => pi+ pi-] pi0"
+    assert dc.to_string() == "D0 -> (K_S0 -> pi+ pi-) pi0"
+
+
+def test_descriptor_format_set_config():
+    dc = DecayChain("D0", {"D0": dm2, "K_S0": dm3})
+    with DescriptorFormat("{mother} -> {daughters}", "({mother} -> {daughters})"):
+        DescriptorFormat.set_config(
+            "{mother} => {daughters}", "[{mother} => {daughters}]"
+        )
+        assert dc.to_string() == "D0 => [K_S0 => pi+ pi-] pi0"
+    # Only the patterns of the block were changed
+    assert dc.to_string() == "D0 -> (K_S0 -> pi+ pi-) pi0"
+
+    # Nested blocks restore the patterns of the enclosing block on exit
+    with DescriptorFormat("{mother} --> {daughters}", "[{mother} --> {daughters}]"):
+        with DescriptorFormat("{mother} -> {daughters}", "({mother} -> {daughters})"):
+            DescriptorFormat.set_config(
+                "{mother} => {daughters}", "[{mother} => {daughters}]"
+            )
+            assert dc.to_string() == "D0 => [K_S0 => pi+ pi-] pi0"
+        assert dc.to_string() == "D0 --> [K_S0 --> pi+ pi-] pi0"
+    assert dc.to_string() == "D0 -> (K_S0 -> pi+ pi-) pi0"
+
+    old = dict(DescriptorFormat.config)
+    try:
+        DescriptorFormat.set_config(
+            "{mother} => {daughters}", "[{mother} => {daughters}]"
+        )
+        assert dc.to_string() == "D0 => [K_S0 => pi+ pi-] pi0"
+    finally:
+        DescriptorFormat.set_config(**old)
+    assert dc.to_string() == "D0 -> (K_S0 -> pi+ pi-) pi0"
+
+
+def test_descriptor_format_config_assignment():
+    dc = DecayChain("D0", {"D0": dm2, "K_S0": dm3})
+    old = DescriptorFormat.config
+    assert old == {
+        "decay_pattern": "{mother} -> {daughters}",
+        "sub_decay_pattern": "({mother} -> {daughters})",
+    }
+    try:
+        DescriptorFormat.config = {
+            "decay_pattern": "{mother} => {daughters}",
+            "sub_decay_pattern": "[{mother} => {daughters}]",
+        }
+        assert DescriptorFormat.config["decay_pattern"] == "{mother} => {daughters}"
+        assert dc.to_string() == "D0 => [K_S0 => pi+ pi-] pi0"
+    finally:
+        DescriptorFormat.config = old
+    assert dc.to_string() == "D0 -> (K_S0 -> pi+ pi-) pi0"
+
+    # The patterns can be changed in place
+    try:
+        DescriptorFormat.config["decay_pattern"] = "{mother} => {daughters}"
+        assert dc.to_string() == "D0 => (K_S0 -> pi+ pi-) pi0"
+    finally:
+        DescriptorFormat.config = old
+    assert dc.to_string() == "D0 -> (K_S0 -> pi+ pi-) pi0"
+
+    # The patterns in use within a block, which are changed only within the block
+    with DescriptorFormat("{mother} --> {daughters}", "[{mother} --> {daughters}]"):
+        config = DescriptorFormat.config
+        assert config == {
+            "decay_pattern": "{mother} --> {daughters}",
+            "sub_decay_pattern": "[{mother} --> {daughters}]",
+        }
+        config["sub_decay_pattern"] = "<{mother} --> {daughters}>"
+        assert config["sub_decay_pattern"] == "<{mother} --> {daughters}>"
+        assert dc.to_string() == "D0 --> <K_S0 --> pi+ pi-> pi0"
+        DescriptorFormat.config = old
+        assert dc.to_string() == "D0 -> (K_S0 -> pi+ pi-) pi0"
+    assert DescriptorFormat.config == old
+    assert dc.to_string() == "D0 -> (K_S0 -> pi+ pi-) pi0"
+
+    with pytest.raises(ValueError, match="wildcards"):
+        DescriptorFormat.config["decay_pattern"] = "{mother}"
+    with pytest.raises(KeyError):
+        DescriptorFormat.config["pattern"] = "{mother} -> {daughters}"
+    with pytest.raises(TypeError):
+        del DescriptorFormat.config["decay_pattern"]
+    assert DescriptorFormat.config == old
+
+    with pytest.raises(ValueError, match="wildcards"):
+        DescriptorFormat.config = {
+            "decay_pattern": "{mother}",
+            "sub_decay_pattern": "({mother} -> {daughters})",
+        }